@@ -22,6 +22,7 @@ from .models import (
 from .orchestrator import (
     analyze_finances,
     fetch_all_financial_data,
+    stream_analysis,
     slice_financial_meaning,
     slice_wasteful_subscriptions,
     slice_budget_overruns,
@@ -51,6 +52,7 @@ __all__ = [
     # Multi-agent orchestrator
     "analyze_finances",
     "fetch_all_financial_data",
+    "stream_analysis",
     "CaptainAnalysis",
     "SpecialistDeps",
     # Slice functions
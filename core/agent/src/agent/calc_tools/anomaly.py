@@ -1,5 +1,7 @@
 """Transaction anomaly scoring tools."""
 
+from shared.streaming_stats import robust_z_score, z_score
+
 
 def calculate_anomaly_score(
     amount: float, category_avg: float, category_stddev: float
@@ -8,9 +10,18 @@ def calculate_anomaly_score(
 
     Returns 10.0 if stddev is 0 and amount differs from average.
     """
-    if category_stddev == 0:
-        return 0.0 if amount == category_avg else 10.0
-    return round(abs(amount - category_avg) / category_stddev, 2)
+    return z_score(amount, category_avg, category_stddev)
+
+
+def calculate_robust_anomaly_score(
+    amount: float, category_median: float, category_mad: float
+) -> float:
+    """Modified z-score for transaction amount vs category median and MAD.
+
+    Unlike the mean, the median and MAD barely move for a single outlier.
+    Returns 10.0 if MAD is 0 and amount differs from the median.
+    """
+    return robust_z_score(amount, category_median, category_mad)
 
 
 def calculate_merchant_novelty(
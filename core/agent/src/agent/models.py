@@ -7,6 +7,7 @@ from typing import Literal
 
 from pydantic import BaseModel, Field
 
+from shared.frame import TransactionFrame
 from shared.models import BudgetReport, FinancialSnapshot, Transaction, VisaControlRule
 
 
@@ -179,6 +180,14 @@ class EnemyCruiserAnalysis(BaseModel):
 
 # --- Combined Output ---
 
+class SpecialistOutcome(BaseModel):
+    """How one specialist's result was produced."""
+    status: Literal["ok", "timeout", "error", "fallback"] = Field(description="ok: model (or cached) result; timeout/error: the run failed and the fallback was served; fallback: no request budget was left to run it.")
+    elapsed_ms: float = Field(default=0.0, description="Wall time spent on the specialist.")
+    hedged: bool = Field(default=False, description="A second request was started after the first ran past the p95 latency.")
+    error: str | None = Field(default=None, description="Exception type and message for error outcomes.")
+
+
 class CaptainAnalysis(BaseModel):
     """Complete analysis returned to frontend. One object, 7 specialist results."""
     financial_meaning: FinancialMeaningOutput = Field(description="Cold boot briefing — greeting, verdict, and health status.")
@@ -192,6 +201,10 @@ class CaptainAnalysis(BaseModel):
         default=None,
         description="VTC enforcement result with rules, action, and API response"
     )
+    specialist_outcomes: dict[str, SpecialistOutcome] = Field(
+        default_factory=dict,
+        description="Per-specialist outcome metadata, keyed by analysis field name."
+    )
 
 
 @dataclass
@@ -200,3 +213,8 @@ class PreFetchedData:
     snapshot: FinancialSnapshot
     budget: BudgetReport
     transactions: list[Transaction]
+    frame: TransactionFrame | None = None  # Built from transactions if omitted
+
+    def __post_init__(self):
+        if self.frame is None:
+            self.frame = TransactionFrame(self.transactions)
@@ -9,13 +9,21 @@ results into a single CaptainAnalysis response.
 import asyncio
 import json
 import os
+import time
+import weakref
+from typing import AsyncIterator
 
 from aws_lambda_powertools.logging import Logger
 from datetime import datetime, timedelta, timezone
+from pydantic import BaseModel
+from pydantic_core import to_json
 
 from shared.budget_engine import calculate as calculate_budget
+from shared.frame import NO_DATE, TransactionFrame
 from shared.models import FinancialSnapshot, Transaction
-from shared.nessie_service import NessieService
+from shared.nessie_service import AsyncNessieService
+from shared.streaming_stats import SpendingProfile
+from shared.ttl_cache import TTLCache
 
 from .models import (
     AsteroidAnalysis,
@@ -27,6 +35,7 @@ from .models import (
     PreFetchedData,
     SolarFlareAnalysis,
     SpecialistDeps,
+    SpecialistOutcome,
     WormholeAnalysis,
 )
 from .specialists import (
@@ -35,7 +44,7 @@ from .specialists import (
     financial_meaning_agent,
     fraud_detection_agent,
     missed_rewards_agent,
-    safe_run_specialist,
+    run_specialist_with_outcome,
     upcoming_bills_agent,
     wasteful_subscriptions_agent,
 )
@@ -45,31 +54,107 @@ logger = Logger(service="Orchestrator")
 # Default data source
 DATA_SOURCE = os.getenv("DATA_SOURCE", "mock")
 
-
-async def fetch_all_financial_data(user_id: str) -> PreFetchedData:
-    """Fetch all financial data once from Nessie or mock."""
-    if DATA_SOURCE == "nessie":
-        api_key = os.getenv("NESSIE_API_KEY", "")
-        nessie = NessieService(api_key=api_key)
-        snapshot = nessie.build_snapshot()
-    else:
-        from shared.mocks import get_mock_snapshot
-        snapshot = get_mock_snapshot()
-
-    budget = calculate_budget(snapshot)
-
+# Default time budget for one analysis (data fetch + specialists), seconds
+ANALYSIS_BUDGET_S = float(os.getenv("ANALYSIS_BUDGET_S", "50"))
+
+# Nessie history per user, so repeat analyses merge only new purchases
+_sync_states = TTLCache(max_entries=256, ttl_seconds=3600)
+
+# One pooled Nessie client per event loop (httpx.AsyncClient is loop-bound)
+_nessie_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+# Per-loop, per-user locks: a sync updates its state's aggregates in place
+_sync_locks: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def _get_nessie_client() -> AsyncNessieService:
+    """Pooled Nessie client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _nessie_clients.get(loop)
+    if client is None:
+        client = AsyncNessieService(api_key=os.getenv("NESSIE_API_KEY", ""))
+        _nessie_clients[loop] = client
+    return client
+
+
+async def close_nessie_client() -> None:
+    """Close the running loop's pooled Nessie client, if any."""
+    client = _nessie_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def _sync_lock(user_id: str) -> asyncio.Lock:
+    locks = _sync_locks.setdefault(asyncio.get_running_loop(), {})
+    return locks.setdefault(user_id, asyncio.Lock())
+
+
+async def _fetch_nessie_snapshot(user_id: str) -> FinancialSnapshot:
+    """Incrementally sync the user's snapshot on the pooled client."""
+    async with _sync_lock(user_id):
+        state = _sync_states.get(user_id)
+        if state is not None:
+            # Merge into copies of the in-place aggregates, so a cancelled
+            # sync leaves the cached state untouched
+            state = state.model_copy(update={
+                "recurrence": state.recurrence.model_copy(deep=True),
+                "budget": state.budget.model_copy(deep=True),
+            })
+        snapshot, new_state = await _get_nessie_client().sync_snapshot(state)
+        _sync_states.set(user_id, new_state)
+    return snapshot
+
+
+def _prepare_data(snapshot: FinancialSnapshot) -> PreFetchedData:
+    """Build the frame and budget shared by every slice (CPU-bound)."""
+    frame = TransactionFrame.from_snapshot(snapshot)
+    budget = calculate_budget(snapshot, frame=frame)
+    # Build the columns the slices filter on here, once, rather than in
+    # each slice's worker thread
+    frame.is_recurring, frame.next_expected_us, frame.date_us  # noqa: B018
     return PreFetchedData(
         snapshot=snapshot,
         budget=budget,
         transactions=snapshot.recent_transactions,
+        frame=frame,
     )
 
 
-def serialize_default(obj):
-    """JSON serializer for datetime objects."""
-    if isinstance(obj, datetime):
-        return obj.isoformat()
-    raise TypeError(f"Type {type(obj)} not serializable")
+def _load_mock_data() -> PreFetchedData:
+    from shared.mocks import get_mock_snapshot
+    return _prepare_data(get_mock_snapshot())
+
+
+async def fetch_all_financial_data(
+    user_id: str, deadline: float | None = None
+) -> PreFetchedData:
+    """
+    Fetch all financial data once from Nessie or mock.
+
+    Network I/O runs on the event loop; parsing, normalization and the
+    budget run in worker threads, so concurrent requests keep being
+    served. Cancelling the awaiting task abandons the fetch; with a
+    time.monotonic() deadline, so does running past it (TimeoutError).
+    """
+    timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+    try:
+        async with asyncio.timeout(timeout):
+            if DATA_SOURCE == "nessie":
+                snapshot = await _fetch_nessie_snapshot(user_id)
+                return await asyncio.to_thread(_prepare_data, snapshot)
+            return await asyncio.to_thread(_load_mock_data)
+    except TimeoutError:
+        logger.warning("Financial data fetch ran past the deadline", user_id=user_id)
+        raise
+
+
+def dump_slice(payload: dict) -> str:
+    """
+    Serialize a slice payload that may contain Pydantic models.
+
+    pydantic-core writes models straight to JSON, avoiding a per-row
+    model_dump() into dicts followed by json.dumps().
+    """
+    return to_json(payload).decode()
 
 
 def slice_financial_meaning(data: PreFetchedData) -> str:
@@ -90,73 +175,66 @@ def slice_financial_meaning(data: PreFetchedData) -> str:
 
 def slice_wasteful_subscriptions(data: PreFetchedData) -> str:
     """Slice data for Wasteful Subscriptions specialist."""
-    recurring = [
-        t.model_dump(mode="json") for t in data.transactions
-        if t.is_recurring and t.bucket != "income"
-    ]
-    return json.dumps({"recurring_transactions": recurring}, default=serialize_default)
+    frame = data.frame
+    recurring = frame.rows(frame.is_recurring & ~frame.bucket_mask("income"))
+    return dump_slice({"recurring_transactions": recurring})
 
 
 def slice_budget_overruns(data: PreFetchedData) -> str:
     """Slice data for Budget Overruns specialist."""
-    return json.dumps({
-        "budget_report": data.budget.model_dump(mode="json"),
-        "recent_transactions": [
-            t.model_dump(mode="json") for t in data.transactions
-            if t.bucket in ("needs", "wants") and t.date >= datetime.now(timezone.utc) - timedelta(days=30)
-        ],
-    }, default=serialize_default)
+    frame = data.frame
+    cutoff = datetime.now(timezone.utc) - timedelta(days=30)
+    return dump_slice({
+        "budget_report": data.budget,
+        "recent_transactions": frame.rows(
+            frame.bucket_mask("needs", "wants") & frame.since_mask(cutoff)
+        ),
+    })
 
 
 def slice_upcoming_bills(data: PreFetchedData) -> str:
     """Slice data for Upcoming Bills specialist."""
-    recurring_with_dates = [
-        t.model_dump(mode="json") for t in data.transactions
-        if t.is_recurring and t.next_expected_date is not None
-    ]
-    accounts = [a.model_dump(mode="json") for a in data.snapshot.accounts]
-    return json.dumps({
+    frame = data.frame
+    recurring_with_dates = frame.rows(
+        frame.is_recurring & (frame.next_expected_us != NO_DATE)
+    )
+    return dump_slice({
         "recurring_transactions": recurring_with_dates,
-        "accounts": accounts,
-    }, default=serialize_default)
+        "accounts": data.snapshot.accounts,
+    })
 
 
 def slice_debt_spirals(data: PreFetchedData) -> str:
     """Slice data for Debt Spirals specialist."""
-    credit_cards = [
-        a.model_dump(mode="json") for a in data.snapshot.accounts
-        if a.type == "credit_card"
-    ]
-    loan_transactions = [
-        t.model_dump(mode="json") for t in data.transactions
-        if t.category in ("loan_payment", "minimum_cc_payment")
-    ]
-    return json.dumps({
+    credit_cards = [a for a in data.snapshot.accounts if a.type == "credit_card"]
+    loan_transactions = data.frame.rows(
+        data.frame.category_mask("loan_payment", "minimum_cc_payment")
+    )
+    return dump_slice({
         "credit_card_accounts": credit_cards,
         "loan_transactions": loan_transactions,
         "credit_card_impact": data.budget.credit_card_impact,
-    }, default=serialize_default)
+    })
 
 
 def slice_missed_rewards(data: PreFetchedData) -> str:
     """Slice data for Missed Rewards specialist."""
-    recent_30 = [
-        t.model_dump(mode="json") for t in data.transactions
-        if t.bucket in ("needs", "wants") and t.date >= datetime.now(timezone.utc) - timedelta(days=30)
-    ]
-    accounts = [a.model_dump(mode="json") for a in data.snapshot.accounts]
-    return json.dumps({
+    frame = data.frame
+    cutoff = datetime.now(timezone.utc) - timedelta(days=30)
+    recent_30 = frame.rows(frame.bucket_mask("needs", "wants") & frame.since_mask(cutoff))
+    return dump_slice({
         "recent_transactions": recent_30,
-        "accounts": accounts,
-    }, default=serialize_default)
+        "accounts": data.snapshot.accounts,
+    })
 
 
 def slice_fraud_detection(data: PreFetchedData) -> str:
     """Slice data for Fraud Detection specialist."""
-    all_txns = [t.model_dump(mode="json") for t in data.transactions]
-    return json.dumps({
-        "transactions": all_txns,
-    }, default=serialize_default)
+    return dump_slice({
+        "transactions": data.transactions,
+        # Same numbers the asteroid detector scores spikes against
+        "category_stats": SpendingProfile.from_frame(data.frame).summaries(),
+    })
 
 
 # Fallback values when a specialist fails
@@ -191,70 +269,60 @@ FD_FALLBACK = EnemyCruiserAnalysis(
 )
 
 
-async def analyze_finances(user_id: str = "demo_user") -> CaptainAnalysis:
-    """One-shot analysis: fetch data, dispatch 7 specialists, return combined result."""
-
-    # 1. Fetch all data once
-    data = await fetch_all_financial_data(user_id)
-    logger.info("Financial data fetched", user_id=user_id)
-
-    # 2. Build specialist deps with sliced data
-    def make_deps(slice_fn) -> SpecialistDeps:
-        return SpecialistDeps(user_id=user_id, financial_data=slice_fn(data))
-
-    # 3. Dispatch all 7 in parallel
-    fm, ws, bo, ub, ds, mr, fd = await asyncio.gather(
-        safe_run_specialist(
-            financial_meaning_agent,
-            make_deps(slice_financial_meaning),
-            FM_FALLBACK,
-        ),
-        safe_run_specialist(
-            wasteful_subscriptions_agent,
-            make_deps(slice_wasteful_subscriptions),
-            WS_FALLBACK,
-        ),
-        safe_run_specialist(
-            budget_overruns_agent,
-            make_deps(slice_budget_overruns),
-            BO_FALLBACK,
-        ),
-        safe_run_specialist(
-            upcoming_bills_agent,
-            make_deps(slice_upcoming_bills),
-            UB_FALLBACK,
-        ),
-        safe_run_specialist(
-            debt_spirals_agent,
-            make_deps(slice_debt_spirals),
-            DS_FALLBACK,
-        ),
-        safe_run_specialist(
-            missed_rewards_agent,
-            make_deps(slice_missed_rewards),
-            MR_FALLBACK,
-        ),
-        safe_run_specialist(
-            fraud_detection_agent,
-            make_deps(slice_fraud_detection),
-            FD_FALLBACK,
-        ),
-    )
-
-    logger.info("All specialists completed", user_id=user_id)
+# CaptainAnalysis field -> (agent, slice function, fallback)
+SPECIALIST_PLAN = {
+    "financial_meaning": (financial_meaning_agent, slice_financial_meaning, FM_FALLBACK),
+    "wasteful_subscriptions": (wasteful_subscriptions_agent, slice_wasteful_subscriptions, WS_FALLBACK),
+    "budget_overruns": (budget_overruns_agent, slice_budget_overruns, BO_FALLBACK),
+    "upcoming_bills": (upcoming_bills_agent, slice_upcoming_bills, UB_FALLBACK),
+    "debt_spirals": (debt_spirals_agent, slice_debt_spirals, DS_FALLBACK),
+    "missed_rewards": (missed_rewards_agent, slice_missed_rewards, MR_FALLBACK),
+    "fraud_alerts": (fraud_detection_agent, slice_fraud_detection, FD_FALLBACK),
+}
+
+
+async def build_slice(slice_fn, data: PreFetchedData) -> str:
+    """Run a slice function in a worker thread (filtering and JSON are CPU-bound)."""
+    return await asyncio.to_thread(slice_fn, data)
+
+
+async def _run_planned(
+    field: str, agent, slice_fn, data: PreFetchedData, user_id: str, fallback, deadline: float | None
+) -> tuple[str, BaseModel, SpecialistOutcome]:
+    deps = SpecialistDeps(user_id=user_id, financial_data=await build_slice(slice_fn, data))
+    output, outcome = await run_specialist_with_outcome(agent, deps, fallback, deadline=deadline)
+    return field, output, outcome
+
+
+def request_deadline(budget_s: float | None = None) -> float:
+    """time.monotonic() deadline for a request budget (default ANALYSIS_BUDGET_S)."""
+    return time.monotonic() + (ANALYSIS_BUDGET_S if budget_s is None else budget_s)
+
+
+async def iter_specialists(
+    data: PreFetchedData, user_id: str, deadline: float | None = None
+) -> AsyncIterator[tuple[str, BaseModel, SpecialistOutcome]]:
+    """
+    Run all 7 specialists in parallel, yielding (field, output, outcome) as
+    each finishes. Every specialist stops at the shared deadline; closing
+    the iterator early cancels the ones still running.
+    """
+    tasks = [
+        asyncio.create_task(_run_planned(
+            field, agent, slice_fn, data, user_id, fallback, deadline
+        ))
+        for field, (agent, slice_fn, fallback) in SPECIALIST_PLAN.items()
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
 
-    # 4. Combine into CaptainAnalysis
-    analysis = CaptainAnalysis(
-        financial_meaning=fm,
-        wasteful_subscriptions=ws,
-        budget_overruns=bo,
-        upcoming_bills=ub,
-        debt_spirals=ds,
-        missed_rewards=mr,
-        fraud_alerts=fd,
-    )
 
-    # 5. VTC Enforcement (NEW)
+async def apply_vtc_enforcement(analysis: CaptainAnalysis, user_id: str) -> None:
+    """Attach the VTC enforcement result when enforcement is enabled."""
     vtc_enabled = os.getenv("VTC_ENFORCEMENT_ENABLED", "false").lower() == "true"
     if vtc_enabled:
         try:
@@ -275,4 +343,73 @@ async def analyze_finances(user_id: str = "demo_user") -> CaptainAnalysis:
         except Exception:
             logger.exception("VTC enforcement failed (non-fatal)")
 
+
+async def analyze_finances(
+    user_id: str = "demo_user", budget_s: float | None = None
+) -> CaptainAnalysis:
+    """
+    One-shot analysis: fetch data, dispatch 7 specialists, return combined result.
+
+    budget_s bounds the data fetch and specialists together (default
+    ANALYSIS_BUDGET_S): a fetch still running at the deadline raises
+    TimeoutError, and specialists still running are served as fallbacks,
+    as recorded in specialist_outcomes.
+    """
+    deadline = request_deadline(budget_s)
+
+    # 1. Fetch all data once
+    data = await fetch_all_financial_data(user_id, deadline)
+    logger.info("Financial data fetched", user_id=user_id)
+
+    # 2. Dispatch all 7 in parallel
+    results, outcomes = {}, {}
+    async for field, output, outcome in iter_specialists(data, user_id, deadline):
+        results[field] = output
+        outcomes[field] = outcome
+    logger.info("All specialists completed", user_id=user_id)
+
+    # 3. Combine into CaptainAnalysis, then VTC enforcement
+    analysis = CaptainAnalysis(**results, specialist_outcomes=outcomes)
+    await apply_vtc_enforcement(analysis, user_id)
     return analysis
+
+
+async def stream_analysis(
+    user_id: str = "demo_user", budget_s: float | None = None
+) -> AsyncIterator[dict]:
+    """
+    Progressive analysis events, in completion order.
+
+    One {"type": "specialist", "specialist": field, "result": ...,
+    "outcome": ...} event per specialist as soon as it finishes, then a
+    final {"type": "analysis", "result": ...} carrying the combined
+    CaptainAnalysis (vtc_enforcement and specialist_outcomes included).
+    Field names match CaptainAnalysis.
+    """
+    deadline = request_deadline(budget_s)
+    data = await fetch_all_financial_data(user_id, deadline)
+    logger.info("Financial data fetched", user_id=user_id)
+
+    results, outcomes = {}, {}
+    async for field, output, outcome in iter_specialists(data, user_id, deadline):
+        results[field] = output
+        outcomes[field] = outcome
+        yield {
+            "type": "specialist",
+            "specialist": field,
+            "result": output.model_dump(mode="json"),
+            "outcome": outcome.model_dump(mode="json"),
+        }
+    logger.info("All specialists completed", user_id=user_id)
+
+    analysis = CaptainAnalysis(**results, specialist_outcomes=outcomes)
+    await apply_vtc_enforcement(analysis, user_id)
+    yield {"type": "analysis", "result": analysis.model_dump(mode="json")}
+
+
+def format_event(event: dict, sse: bool = False) -> str:
+    """Encode a stream_analysis() event as an NDJSON line or an SSE message."""
+    payload = dump_slice(event)
+    if sse:
+        return f"event: {event['type']}\ndata: {payload}\n\n"
+    return payload + "\n"
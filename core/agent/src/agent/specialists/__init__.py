@@ -7,7 +7,7 @@ from .upcoming_bills import upcoming_bills_agent
 from .debt_spirals import debt_spirals_agent
 from .missed_rewards import missed_rewards_agent
 from .fraud_detection import fraud_detection_agent
-from .base import run_specialist, safe_run_specialist
+from .base import run_specialist, run_specialist_with_outcome, safe_run_specialist
 
 __all__ = [
     "financial_meaning_agent",
@@ -18,5 +18,6 @@ __all__ = [
     "missed_rewards_agent",
     "fraud_detection_agent",
     "run_specialist",
+    "run_specialist_with_outcome",
     "safe_run_specialist",
 ]
@@ -3,19 +3,41 @@ Specialist agent factory and runner.
 
 Every specialist agent is created via create_specialist() and executed
 via run_specialist(). The factory handles model config, data injection,
-and output typing. The runner handles execution and error fallback.
+and output typing, and registers the specialist's prompt version. The
+runner serves repeat inputs from the result cache (see cache.py) and
+handles execution and error fallback.
+
+run_specialist_with_outcome() is deadline-aware: each specialist gets its
+own timeout, capped by whatever is left of the request's deadline, and a
+second (hedged) request can be started once the first runs past that
+specialist's observed p95 latency. It reports a SpecialistOutcome next to
+the output.
+
+All specialists share one Bedrock model wrapped in the process-wide
+limiter (see limiter.py); SPECIALIST_FAKE_MODEL=true swaps Bedrock for the
+local fake model (fake_model.py) for load testing.
 """
 
+import asyncio
+import hashlib
+import json
 import os
-from typing import TypeVar
+import time
+from collections import deque
+from typing import NamedTuple, TypeVar
 
 import boto3
+from aws_lambda_powertools.logging import Logger
+from botocore.config import Config
 from pydantic import BaseModel
 from pydantic_ai import Agent, RunContext, Tool, ToolOutput
 from pydantic_ai.models.bedrock import BedrockConverseModel
 from pydantic_ai.providers.bedrock import BedrockProvider
 
-from ..models import SpecialistDeps
+from ..models import SpecialistDeps, SpecialistOutcome
+from . import cache, limiter
+
+logger = Logger(service="Specialists")
 
 # Shared Bedrock client and Haiku model for all specialists
 AWS_REGION = os.environ.get("AWS_REGION", "us-east-1")
@@ -23,14 +45,64 @@ HAIKU_MODEL_ID = os.environ.get(
     "HAIKU_MODEL_ID", "us.anthropic.claude-3-5-haiku-20241022-v1:0"
 )
 
-_bedrock_client = boto3.client("bedrock-runtime", region_name=AWS_REGION)
-haiku_model = BedrockConverseModel(
-    HAIKU_MODEL_ID,
-    provider=BedrockProvider(bedrock_client=_bedrock_client),
+# Throttles and transient errors surface immediately; the limiter owns
+# backoff and retries (see LimitedModel.request)
+_bedrock_client = boto3.client(
+    "bedrock-runtime",
+    region_name=AWS_REGION,
+    config=Config(retries={"mode": "standard", "max_attempts": 1}),
 )
 
+if os.environ.get("SPECIALIST_FAKE_MODEL", "false").lower() == "true":
+    from .fake_model import FakeBedrockModel
+    _specialist_model = FakeBedrockModel()
+else:
+    _specialist_model = BedrockConverseModel(
+        HAIKU_MODEL_ID,
+        provider=BedrockProvider(bedrock_client=_bedrock_client),
+    )
+haiku_model = limiter.LimitedModel(_specialist_model)
+
+# Per-specialist timeout, capped by the request deadline
+SPECIALIST_TIMEOUT_S = float(os.environ.get("SPECIALIST_TIMEOUT_S", "25"))
+
+# Hedge a second request once one runs past the specialist's p95 latency
+SPECIALIST_HEDGE_ENABLED = os.environ.get("SPECIALIST_HEDGE_ENABLED", "false").lower() == "true"
+HEDGE_MIN_SAMPLES = 20
+LATENCY_WINDOW = 100
+
 TOutput = TypeVar("TOutput", bound=BaseModel)
 
+# Specialist name -> recent model-call latencies in seconds (cache hits excluded)
+_latencies: dict[str, deque[float]] = {}
+
+
+class SpecialistInfo(NamedTuple):
+    """What a specialist's result depends on besides its data slice."""
+
+    name: str
+    prompt_version: str  # Hash of system prompt, tools and output schema
+    model_id: str
+    output_type: type[BaseModel]
+
+
+# Specialist name -> info, filled by create_specialist()
+SPECIALISTS: dict[str, SpecialistInfo] = {}
+
+
+def _prompt_version(
+    system_prompt: str, output_type: type[BaseModel], tools: list[Tool]
+) -> str:
+    definition = json.dumps(
+        {
+            "system_prompt": system_prompt,
+            "output_schema": output_type.model_json_schema(),
+            "tools": sorted(tool.name for tool in tools),
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(definition.encode()).hexdigest()[:12]
+
 
 def create_specialist(
     name: str,
@@ -46,12 +118,22 @@ def create_specialist(
         output_type: Pydantic model for structured output.
         tools: Optional list of calculation tools.
     """
+    tools = tools or []
     agent = Agent[SpecialistDeps, TOutput](
+        name=name,
         model=haiku_model,
         system_prompt=system_prompt,
         output_type=ToolOutput(output_type),
         deps_type=SpecialistDeps,
-        tools=tools or [],
+        tools=tools,
+    )
+    SPECIALISTS[name] = SpecialistInfo(
+        name=name,
+        prompt_version=_prompt_version(system_prompt, output_type, tools),
+        # The model actually serving requests, so fake-model results never
+        # share cache keys with Bedrock ones
+        model_id=_specialist_model.model_name,
+        output_type=output_type,
     )
 
     @agent.instructions
@@ -61,22 +143,124 @@ def create_specialist(
     return agent
 
 
+def p95_latency(name: str) -> float | None:
+    """p95 of recent model-call latencies, once enough have been seen."""
+    samples = _latencies.get(name)
+    if not samples or len(samples) < HEDGE_MIN_SAMPLES:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+
+
 async def run_specialist(
     agent: Agent[SpecialistDeps, TOutput],
     deps: SpecialistDeps,
 ) -> TOutput:
-    """Run a specialist and extract its typed output."""
+    """Run a specialist and extract its typed output, via the result cache."""
+    info = SPECIALISTS[agent.name]
+    key = cache.result_key(
+        info.name, info.prompt_version, info.model_id, deps.financial_data
+    )
+    cached = await cache.get(deps.user_id, key)
+    if cached is not None:
+        return info.output_type.model_validate(cached)
+
+    start = time.monotonic()
+    limiter.set_priority(info.name)
     result = await agent.run("Analyze the provided financial data.", deps=deps)
+    _latencies.setdefault(info.name, deque(maxlen=LATENCY_WINDOW)).append(
+        time.monotonic() - start
+    )
+    await cache.put(deps.user_id, key, result.output.model_dump(mode="json"))
     return result.output
 
 
+async def _run_hedged(
+    agent: Agent[SpecialistDeps, TOutput],
+    deps: SpecialistDeps,
+    hedge_after: float | None,
+    attempts: list[asyncio.Task],
+) -> TOutput:
+    """
+    Run, starting a second attempt after hedge_after seconds; first success wins.
+
+    Every attempt started is appended to attempts, so the caller can tell
+    whether the hedge went out even when the run is cut short.
+    """
+    attempts.append(asyncio.create_task(run_specialist(agent, deps)))
+    pending = set(attempts)
+    try:
+        if hedge_after is not None:
+            done, _ = await asyncio.wait(pending, timeout=hedge_after)
+            if not done:
+                attempts.append(asyncio.create_task(run_specialist(agent, deps)))
+                pending.add(attempts[-1])
+                logger.info("Hedging slow specialist", specialist=agent.name)
+        error: BaseException | None = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def run_specialist_with_outcome(
+    agent: Agent[SpecialistDeps, TOutput],
+    deps: SpecialistDeps,
+    fallback: TOutput,
+    deadline: float | None = None,
+    timeout: float = SPECIALIST_TIMEOUT_S,
+    hedge: bool = SPECIALIST_HEDGE_ENABLED,
+) -> tuple[TOutput, SpecialistOutcome]:
+    """
+    Run a specialist within its timeout and the request deadline.
+
+    deadline is a time.monotonic() value shared by every specialist of a
+    request. Failures and timeouts are logged and served as the fallback.
+    """
+    start = time.monotonic()
+    if deadline is not None:
+        timeout = min(timeout, deadline - start)
+    if timeout <= 0:
+        logger.warning("No request budget left for specialist", specialist=agent.name)
+        return fallback, SpecialistOutcome(status="fallback")
+
+    hedge_after = p95_latency(agent.name) if hedge else None
+    if hedge_after is not None and hedge_after >= timeout:
+        hedge_after = None
+
+    def elapsed_ms() -> float:
+        return round((time.monotonic() - start) * 1000, 1)
+
+    attempts: list[asyncio.Task] = []
+    try:
+        async with asyncio.timeout(timeout):
+            output = await _run_hedged(agent, deps, hedge_after, attempts)
+    except TimeoutError:
+        logger.warning("Specialist timed out", specialist=agent.name, timeout_s=round(timeout, 2))
+        return fallback, SpecialistOutcome(
+            status="timeout", elapsed_ms=elapsed_ms(), hedged=len(attempts) > 1
+        )
+    except Exception as e:
+        logger.exception("Specialist failed", specialist=agent.name)
+        return fallback, SpecialistOutcome(
+            status="error", elapsed_ms=elapsed_ms(), error=f"{type(e).__name__}: {e}",
+            hedged=len(attempts) > 1,
+        )
+    return output, SpecialistOutcome(status="ok", elapsed_ms=elapsed_ms(), hedged=len(attempts) > 1)
+
+
 async def safe_run_specialist(
     agent: Agent[SpecialistDeps, TOutput],
     deps: SpecialistDeps,
     fallback: TOutput,
+    deadline: float | None = None,
 ) -> TOutput:
-    """Run specialist with fallback on failure."""
-    try:
-        return await run_specialist(agent, deps)
-    except Exception:
-        return fallback
+    """Run specialist with fallback on failure, timeout or a spent deadline."""
+    output, _ = await run_specialist_with_outcome(agent, deps, fallback, deadline=deadline)
+    return output
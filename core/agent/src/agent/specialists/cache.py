@@ -0,0 +1,101 @@
+"""
+Content-addressed cache for specialist results.
+
+A result is keyed on the specialist name, its prompt version, the model ID
+and a SHA-256 of the sliced financial data, so a specialist whose slice
+has not changed since the last analysis is served without a model call.
+
+Two tiers:
+- L1: a per-container TTLCache (LRU), shared by every user since the key
+  is content-addressed.
+- L2: an optional persistent store (the captain Lambda configures the
+  DynamoDB DataTableClient) whose rows expire via a TTL attribute.
+
+Store failures are logged and treated as misses; only successful runs are
+cached, never fallbacks.
+"""
+
+import asyncio
+import hashlib
+import os
+from typing import Protocol
+
+from aws_lambda_powertools.logging import Logger
+from shared.ttl_cache import TTLCache
+
+logger = Logger(service="SpecialistCache")
+
+SPECIALIST_CACHE_ENABLED = os.environ.get("SPECIALIST_CACHE_ENABLED", "true").lower() == "true"
+SPECIALIST_CACHE_TTL_SECONDS = int(os.environ.get("SPECIALIST_CACHE_TTL_SECONDS", "86400"))
+SPECIALIST_CACHE_MAX_ENTRIES = int(os.environ.get("SPECIALIST_CACHE_MAX_ENTRIES", "512"))
+
+
+class ResultStore(Protocol):
+    """Persistent tier (implemented by database.DataTableClient)."""
+
+    def get_specialist_result(self, user_id: str, key: str) -> dict | None: ...
+
+    def save_specialist_result(
+        self, user_id: str, key: str, data: dict, ttl_seconds: int
+    ) -> None: ...
+
+
+# Module-level so it survives across invocations in a warm container
+_l1 = TTLCache(
+    max_entries=SPECIALIST_CACHE_MAX_ENTRIES, ttl_seconds=SPECIALIST_CACHE_TTL_SECONDS
+)
+_store: ResultStore | None = None
+
+
+def configure_store(store: ResultStore | None) -> None:
+    """Set (or clear) the persistent tier."""
+    global _store
+    _store = store
+
+
+def result_key(name: str, prompt_version: str, model_id: str, financial_data: str) -> str:
+    digest = hashlib.sha256(financial_data.encode()).hexdigest()
+    return f"{name}#{prompt_version}#{model_id}#{digest}"
+
+
+async def get(user_id: str, key: str) -> dict | None:
+    """Cached result data for a key, checking L1 then the store."""
+    if not SPECIALIST_CACHE_ENABLED:
+        return None
+    data = _l1.get(key)
+    if data is not None:
+        return data
+    if _store is None:
+        return None
+    try:
+        data = await asyncio.to_thread(_store.get_specialist_result, user_id, key)
+    except Exception as e:
+        logger.warning("Specialist cache read failed", key=key, error=str(e))
+        return None
+    if data is not None:
+        _l1.set(key, data)
+    return data
+
+
+async def put(user_id: str, key: str, data: dict) -> None:
+    """Cache a successful result in both tiers."""
+    if not SPECIALIST_CACHE_ENABLED:
+        return
+    _l1.set(key, data)
+    if _store is None:
+        return
+    try:
+        await asyncio.to_thread(
+            _store.save_specialist_result, user_id, key, data, SPECIALIST_CACHE_TTL_SECONDS
+        )
+    except Exception as e:
+        logger.warning("Specialist cache write failed", key=key, error=str(e))
+
+
+def clear() -> None:
+    """Drop L1 entries (the store keeps its rows until they expire)."""
+    _l1.clear()
+
+
+def stats() -> dict[str, int]:
+    return _l1.stats()
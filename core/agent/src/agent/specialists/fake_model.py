@@ -0,0 +1,91 @@
+"""
+Local stand-in for Bedrock, for load testing the specialist limiter.
+
+FakeBedrockModel answers with schema-valid structured output (pydantic-ai's
+TestModel, tools not called) after a random latency, and enforces its own
+per-minute request and token quotas the way Bedrock does: a request over
+quota, or beyond the concurrency cap, fails with a 429
+ThrottlingException. Token reservations are settled against the
+reported usage (TestModel's estimate), as Bedrock does.
+
+Enable it for the specialists with SPECIALIST_FAKE_MODEL=true; see
+scripts/load_test_specialists.py.
+"""
+
+import asyncio
+import os
+import random
+import time
+
+from pydantic_ai.exceptions import ModelHTTPError
+from pydantic_ai.messages import ModelMessage, ModelResponse
+from pydantic_ai.models import ModelRequestParameters
+from pydantic_ai.models.test import TestModel
+from pydantic_ai.models.wrapper import WrapperModel
+from pydantic_ai.settings import ModelSettings
+
+from .limiter import TokenBucket, estimate_tokens
+
+FAKE_RPM = float(os.environ.get("FAKE_BEDROCK_RPM", "120"))
+FAKE_TPM = float(os.environ.get("FAKE_BEDROCK_TPM", "200000"))
+FAKE_MAX_CONCURRENCY = int(os.environ.get("FAKE_BEDROCK_MAX_CONCURRENCY", "10"))
+FAKE_LATENCY_S = (0.4, 1.5)
+
+
+class FakeBedrockModel(WrapperModel):
+    """TestModel behind Bedrock-like latency, quotas and throttling."""
+
+    def __init__(
+        self,
+        rpm: float = FAKE_RPM,
+        tpm: float = FAKE_TPM,
+        max_concurrency: int = FAKE_MAX_CONCURRENCY,
+        latency_s: tuple[float, float] = FAKE_LATENCY_S,
+    ):
+        super().__init__(TestModel(call_tools=[]))
+        self.requests = TokenBucket(rpm, time.monotonic)
+        self.tokens = TokenBucket(tpm, time.monotonic)
+        self.max_concurrency = max_concurrency
+        self.latency_s = latency_s
+        self.in_flight = 0
+        self.calls = 0
+        self.throttles = 0
+
+    @property
+    def model_name(self) -> str:
+        return "fake-bedrock"
+
+    def _throttle(self) -> ModelHTTPError:
+        self.throttles += 1
+        return ModelHTTPError(
+            status_code=429,
+            model_name=self.model_name,
+            body={"Error": {"Code": "ThrottlingException", "Message": "Too many requests"}},
+        )
+
+    async def request(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+    ) -> ModelResponse:
+        self.calls += 1
+        tokens = estimate_tokens(messages, model_settings)
+        if (
+            self.in_flight >= self.max_concurrency
+            or self.requests.wait_time(1) > 0
+            or self.tokens.wait_time(tokens) > 0
+        ):
+            raise self._throttle()
+        self.requests.take(1)
+        self.tokens.take(tokens)
+        self.in_flight += 1
+        try:
+            await asyncio.sleep(random.uniform(*self.latency_s))
+            response = await self.wrapped.request(messages, model_settings, model_request_parameters)
+        finally:
+            self.in_flight -= 1
+        # Like Bedrock, settle the reservation against actual usage
+        used = response.usage.input_tokens + response.usage.output_tokens
+        self.tokens.take(used - tokens)
+        return response
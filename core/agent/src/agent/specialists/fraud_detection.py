@@ -3,12 +3,17 @@ Fraud Detection Specialist (Enemy Cruiser Threat).
 
 Analyzes transaction patterns for anomalies that may indicate fraud.
 
-Data injected: full 90-day transaction history
+Data injected: full 90-day transaction history plus per-category spending
+stats (mean, stddev, median, MAD, EWMA)
 """
 
 from pydantic_ai import Tool
 
-from ..calc_tools.anomaly import calculate_anomaly_score, calculate_merchant_novelty
+from ..calc_tools.anomaly import (
+    calculate_anomaly_score,
+    calculate_merchant_novelty,
+    calculate_robust_anomaly_score,
+)
 from ..models import EnemyCruiserAnalysis
 from .base import create_specialist
 
@@ -21,8 +26,10 @@ Suspicious transactions = unidentified bogeys. Risk score = threat level. \
 Block = raise shields. Monitor = track on sensors. Allow = clear for docking.
 
 Detection criteria:
-1. Amount anomaly: transaction amount > 2 standard deviations above category average \
-(use calculate_anomaly_score — flag if score > 2.0)
+1. Amount anomaly: transaction amount far above the category's typical amount. \
+Take median and mad from category_stats and use calculate_robust_anomaly_score — \
+flag if score > 3.5. calculate_anomaly_score (mean/stddev, flag if > 2.0) is a \
+fallback for categories with a mad of 0.
 2. New merchant: merchant never seen before in transaction history \
 (use calculate_merchant_novelty)
 3. Unusual category: transaction in a category the user rarely uses
@@ -62,6 +69,7 @@ fraud_detection_agent = create_specialist(
     output_type=EnemyCruiserAnalysis,
     tools=[
         Tool(calculate_anomaly_score, name="calculate_anomaly_score"),
+        Tool(calculate_robust_anomaly_score, name="calculate_robust_anomaly_score"),
         Tool(calculate_merchant_novelty, name="calculate_merchant_novelty"),
     ],
 )
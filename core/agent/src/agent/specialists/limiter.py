@@ -0,0 +1,301 @@
+"""
+Process-wide rate limiter for specialist model calls.
+
+Every specialist model request (each turn of an agent run, tool turns
+included) goes through one AdaptiveLimiter:
+
+- Two token buckets hold requests and tokens per minute (BEDROCK_RPM,
+  BEDROCK_TPM). A request reserves an estimate of its tokens up front and
+  the difference is settled from the reported usage afterwards.
+- An AIMD concurrency limit grows by 1/limit per completed call and
+  halves on a throttling error, between 1 and BEDROCK_MAX_CONCURRENCY.
+  Failed and cancelled calls (errors, timeouts, losing hedges) leave it
+  unchanged.
+- Waiters are served strictly by priority, then arrival; the priority
+  comes from the calling specialist (fraud detection first, see
+  SPECIALIST_PRIORITY).
+- Throttled calls are retried up to MAX_THROTTLE_RETRIES times, and
+  transient failures (5xx, connection errors) up to MAX_TRANSIENT_RETRIES
+  times, after a full-jitter exponential backoff.
+
+LimitedModel wraps a pydantic-ai model with the limiter. Waiters are
+asyncio futures, so the limiter serves one event loop at a time (the
+captain Lambda and the local server each run one).
+"""
+
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import time
+from contextvars import ContextVar
+from typing import Callable, Literal
+
+from aws_lambda_powertools.logging import Logger
+from botocore.exceptions import BotoCoreError, ClientError
+from pydantic_ai.exceptions import ModelAPIError, ModelHTTPError
+from pydantic_ai.messages import ModelMessage, ModelMessagesTypeAdapter, ModelResponse
+from pydantic_ai.models import ModelRequestParameters
+from pydantic_ai.models.wrapper import WrapperModel
+from pydantic_ai.settings import ModelSettings
+
+logger = Logger(service="BedrockLimiter")
+
+BEDROCK_RPM = float(os.environ.get("BEDROCK_RPM", "200"))
+BEDROCK_TPM = float(os.environ.get("BEDROCK_TPM", "400000"))
+BEDROCK_MAX_CONCURRENCY = int(os.environ.get("BEDROCK_MAX_CONCURRENCY", "16"))
+
+MAX_THROTTLE_RETRIES = int(os.environ.get("BEDROCK_MAX_THROTTLE_RETRIES", "4"))
+MAX_TRANSIENT_RETRIES = int(os.environ.get("BEDROCK_MAX_TRANSIENT_RETRIES", "2"))
+BACKOFF_BASE_S = 0.5
+BACKOFF_MAX_S = 8.0
+
+# Output tokens reserved per request when the settings give no max_tokens
+DEFAULT_OUTPUT_TOKENS = 1024
+CHARS_PER_TOKEN = 4
+
+THROTTLE_CODES = {"ThrottlingException", "TooManyRequestsException", "ServiceQuotaExceededException"}
+
+# Lower runs first
+SPECIALIST_PRIORITY = {
+    "fraud_detection": 0,
+    "financial_meaning": 1,
+    "upcoming_bills": 2,
+}
+DEFAULT_PRIORITY = 3
+
+# How a granted request ended, as reported to AdaptiveLimiter.release()
+Outcome = Literal["completed", "throttled", "failed", "cancelled"]
+
+_priority: ContextVar[int] = ContextVar("specialist_priority", default=DEFAULT_PRIORITY)
+
+
+def set_priority(name: str):
+    """Set the priority of model calls made from the current context."""
+    return _priority.set(SPECIALIST_PRIORITY.get(name, DEFAULT_PRIORITY))
+
+
+def is_throttle(exc: BaseException) -> bool:
+    """Whether an error is Bedrock (or the fake model) throttling us."""
+    if isinstance(exc, ModelHTTPError):
+        if exc.status_code == 429:
+            return True
+        body = exc.body if isinstance(exc.body, dict) else {}
+        return body.get("Error", {}).get("Code") in THROTTLE_CODES
+    if isinstance(exc, ClientError):
+        return exc.response.get("Error", {}).get("Code") in THROTTLE_CODES
+    cause = exc.__cause__
+    return cause is not None and is_throttle(cause)
+
+
+def is_transient(exc: BaseException) -> bool:
+    """Whether an error is a server-side or transport failure worth retrying."""
+    if isinstance(exc, ModelHTTPError):
+        return exc.status_code >= 500
+    if isinstance(exc, ModelAPIError):  # Connection errors and timeouts
+        return True
+    if isinstance(exc, ClientError):
+        return exc.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0) >= 500
+    if isinstance(exc, (BotoCoreError, ConnectionError)):
+        return True
+    cause = exc.__cause__
+    return cause is not None and is_transient(cause)
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff for the given retry (0-based)."""
+    return random.uniform(0, min(BACKOFF_MAX_S, BACKOFF_BASE_S * 2 ** attempt))
+
+
+class TokenBucket:
+    """Continuously refilled bucket; capacity is one minute's allowance."""
+
+    def __init__(self, per_minute: float, clock: Callable[[], float]):
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.tokens = per_minute
+        self._clock = clock
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until amount (capped at capacity) is available."""
+        self._refill()
+        missing = min(amount, self.capacity) - self.tokens
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount: float) -> None:
+        """Debit amount (credit when negative, up to capacity)."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+
+class AdaptiveLimiter:
+    """Token buckets plus an AIMD concurrency limit, with a priority queue."""
+
+    def __init__(
+        self,
+        rpm: float = BEDROCK_RPM,
+        tpm: float = BEDROCK_TPM,
+        max_concurrency: int = BEDROCK_MAX_CONCURRENCY,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if rpm <= 0 or tpm <= 0 or max_concurrency < 1:
+            raise ValueError(f"Invalid limits: rpm={rpm} tpm={tpm} max_concurrency={max_concurrency}")
+        self.requests = TokenBucket(rpm, clock)
+        self.tokens = TokenBucket(tpm, clock)
+        self.max_concurrency = max_concurrency
+        self.limit = float(max_concurrency)
+        self.in_flight = 0
+        self._waiters: list[tuple[int, int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+        self._timer_loop: asyncio.AbstractEventLoop | None = None
+        self.granted = 0
+        self.throttled = 0
+        self.failed = 0
+        self.cancelled = 0
+
+    async def acquire(self, priority: int, tokens: int) -> None:
+        """Wait for a slot and reserve one request plus `tokens` tokens."""
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), tokens, future))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just as we were cancelled: hand the slot and
+                # the unused reservation back
+                self.release(-tokens, "cancelled")
+            else:
+                self._dispatch()
+            raise
+
+    def release(self, token_correction: int, outcome: Outcome = "completed") -> None:
+        """
+        Return a slot. token_correction is actual minus reserved tokens.
+
+        A throttled call halves the concurrency limit and a completed one
+        grows it. A failed call (any other error) or a cancelled one (timed
+        out, or a losing hedge) says nothing about spare capacity, so the
+        limit is left alone.
+        """
+        self.in_flight -= 1
+        self.tokens.take(token_correction)
+        if outcome == "throttled":
+            self.throttled += 1
+            self.limit = max(1.0, self.limit / 2)
+            logger.warning("Bedrock throttled, backing off", concurrency_limit=round(self.limit, 2))
+        elif outcome == "failed":
+            self.failed += 1
+        elif outcome == "cancelled":
+            self.cancelled += 1
+        else:
+            self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Grant waiting requests, highest priority first, while limits allow."""
+        while self._waiters:
+            _, _, tokens, future = self._waiters[0]
+            if future.done():  # Cancelled while waiting
+                heapq.heappop(self._waiters)
+                continue
+            if self.in_flight >= int(self.limit):
+                return
+            wait = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+            if wait > 0:
+                self._schedule(wait)
+                return
+            heapq.heappop(self._waiters)
+            self.requests.take(1)
+            self.tokens.take(tokens)
+            self.in_flight += 1
+            self.granted += 1
+            future.set_result(None)
+
+    def _schedule(self, delay: float) -> None:
+        loop = asyncio.get_running_loop()
+        if self._timer is not None and not self._timer.cancelled():
+            if self._timer_loop is loop and self._timer.when() <= loop.time() + delay:
+                return
+            self._timer.cancel()
+        self._timer = loop.call_later(delay, self._on_timer)
+        self._timer_loop = loop
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._dispatch()
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "concurrency_limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "waiting": sum(1 for w in self._waiters if not w[3].done()),
+            "granted": self.granted,
+            "throttled": self.throttled,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+        }
+
+
+# Module-level so every specialist in the process shares it
+LIMITER = AdaptiveLimiter()
+
+
+def estimate_tokens(messages: list[ModelMessage], model_settings: ModelSettings | None) -> int:
+    """Input tokens from the serialized messages plus the output allowance."""
+    input_tokens = len(ModelMessagesTypeAdapter.dump_json(messages)) // CHARS_PER_TOKEN
+    output_tokens = (model_settings or {}).get("max_tokens") or DEFAULT_OUTPUT_TOKENS
+    return input_tokens + output_tokens
+
+
+class LimitedModel(WrapperModel):
+    """Model whose requests go through the process-wide limiter."""
+
+    def __init__(self, wrapped, limiter: AdaptiveLimiter | None = None):
+        super().__init__(wrapped)
+        self._limiter = limiter
+
+    @property
+    def limiter(self) -> AdaptiveLimiter:
+        return self._limiter or LIMITER
+
+    async def request(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+    ) -> ModelResponse:
+        estimate = estimate_tokens(messages, model_settings)
+        attempt = 0
+        while True:
+            await self.limiter.acquire(_priority.get(), estimate)
+            try:
+                response = await self.wrapped.request(messages, model_settings, model_request_parameters)
+            except Exception as e:
+                throttled = is_throttle(e)
+                self.limiter.release(0, "throttled" if throttled else "failed")
+                if throttled:
+                    retries = MAX_THROTTLE_RETRIES
+                elif is_transient(e):
+                    retries = MAX_TRANSIENT_RETRIES
+                else:
+                    raise
+                if attempt >= retries:
+                    raise
+                await asyncio.sleep(backoff_delay(attempt))
+                attempt += 1
+                continue
+            except BaseException:
+                self.limiter.release(0, "cancelled")
+                raise
+            used = response.usage.input_tokens + response.usage.output_tokens
+            self.limiter.release(used - estimate if used else 0)
+            return response
@@ -7,7 +7,11 @@ from agent.calc_tools.rewards import (
     calculate_annual_opportunity_cost,
     calculate_reward_value,
 )
-from agent.calc_tools.anomaly import calculate_anomaly_score, calculate_merchant_novelty
+from agent.calc_tools.anomaly import (
+    calculate_anomaly_score,
+    calculate_merchant_novelty,
+    calculate_robust_anomaly_score,
+)
 
 
 # --- Budget tools ---
@@ -81,6 +85,14 @@ def test_anomaly_score_zero_stddev_exact_match():
     score = calculate_anomaly_score(50.0, 50.0, 0.0)
     assert score == 0.0
 
+def test_robust_anomaly_score_ignores_outlier_baseline():
+    # Median/MAD of [40, 45, 50, 55, 900]: one huge purchase barely moves them
+    assert calculate_robust_anomaly_score(900.0, 50.0, 5.0) == 114.67
+
+def test_robust_anomaly_score_zero_mad():
+    assert calculate_robust_anomaly_score(50.0, 50.0, 0.0) == 0.0
+    assert calculate_robust_anomaly_score(75.0, 50.0, 0.0) == 10.0
+
 def test_merchant_novelty_new():
     assert calculate_merchant_novelty("Unknown Shop", ["Walmart", "Target"]) is True
 
@@ -0,0 +1,185 @@
+"""Tests for the specialist model limiter."""
+
+import asyncio
+
+import pytest
+from pydantic_ai.exceptions import ModelAPIError, ModelHTTPError
+
+from agent.specialists import limiter
+from agent.specialists.limiter import AdaptiveLimiter, TokenBucket, is_throttle, is_transient
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bucket_refills_per_minute():
+    clock = Clock()
+    bucket = TokenBucket(60, clock)
+    bucket.take(60)
+    assert bucket.wait_time(1) == 1.0
+    clock.now = 30
+    assert bucket.tokens == 0 and bucket.wait_time(30) == 0.0
+
+def test_bucket_credit_is_capped():
+    bucket = TokenBucket(60, Clock())
+    bucket.take(-100)
+    assert bucket.tokens == 60
+
+def test_aimd_halves_on_throttle_and_grows_on_success():
+    lim = AdaptiveLimiter(rpm=1000, tpm=10**6, max_concurrency=8)
+    lim.in_flight = 2
+    lim.release(0, "throttled")
+    assert lim.limit == 4.0
+    lim.release(0)
+    assert lim.limit == 4.25
+
+def test_cancelled_call_leaves_limit_alone():
+    lim = AdaptiveLimiter(rpm=1000, tpm=10**6, max_concurrency=8)
+    lim.limit = 4.0
+    lim.in_flight = 1
+    lim.release(0, "cancelled")
+    assert lim.limit == 4.0 and lim.in_flight == 0 and lim.cancelled == 1
+
+def test_failed_call_leaves_limit_alone(monkeypatch):
+    from pydantic_ai.models.test import TestModel
+
+    from agent.models import SpecialistDeps
+    from agent.specialists import debt_spirals_agent
+
+    class Invalid(TestModel):
+        async def request(self, *args, **kwargs):
+            raise ModelHTTPError(status_code=400, model_name="m", body={"Error": {"Code": "ValidationException"}})
+
+    lim = AdaptiveLimiter(rpm=1000, tpm=10**6, max_concurrency=8)
+    lim.limit = 4.0
+    model = limiter.LimitedModel(Invalid(call_tools=[]), limiter=lim)
+    with debt_spirals_agent.override(model=model), pytest.raises(ModelHTTPError):
+        asyncio.run(debt_spirals_agent.run("scan", deps=SpecialistDeps(user_id="u1", financial_data="{}")))
+    assert lim.limit == 4.0 and lim.failed == 1 and lim.in_flight == 0
+
+def test_timed_out_request_is_released_as_cancelled():
+    from pydantic_ai.models.test import TestModel
+
+    from agent.models import SpecialistDeps
+    from agent.specialists import debt_spirals_agent
+
+    class Stalled(TestModel):
+        async def request(self, *args, **kwargs):
+            await asyncio.sleep(10)
+
+    lim = AdaptiveLimiter(rpm=1000, tpm=10**6, max_concurrency=4)
+    lim.limit = 2.0
+    model = limiter.LimitedModel(Stalled(call_tools=[]), limiter=lim)
+
+    async def run():
+        with debt_spirals_agent.override(model=model):
+            await asyncio.wait_for(
+                debt_spirals_agent.run("scan", deps=SpecialistDeps(user_id="u1", financial_data="{}")), 0.05
+            )
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(run())
+    assert lim.limit == 2.0 and lim.cancelled == 1 and lim.in_flight == 0
+
+def test_waiters_served_by_priority():
+    async def scenario():
+        lim = AdaptiveLimiter(rpm=1000, tpm=10**6, max_concurrency=1)
+        await lim.acquire(3, 10)  # Holds the only slot
+        order = []
+
+        async def waiter(priority, name):
+            await lim.acquire(priority, 10)
+            order.append(name)
+            lim.release(0)
+
+        tasks = [
+            asyncio.create_task(waiter(3, "budget")),
+            asyncio.create_task(waiter(0, "fraud")),
+            asyncio.create_task(waiter(1, "meaning")),
+        ]
+        await asyncio.sleep(0)
+        lim.release(0)
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(scenario()) == ["fraud", "meaning", "budget"]
+
+def test_cancelled_waiter_is_skipped():
+    async def scenario():
+        lim = AdaptiveLimiter(rpm=1000, tpm=10**6, max_concurrency=1)
+        await lim.acquire(0, 10)
+        stuck = asyncio.create_task(lim.acquire(0, 10))
+        await asyncio.sleep(0)
+        stuck.cancel()
+        await asyncio.gather(stuck, return_exceptions=True)
+        lim.release(0)
+        await asyncio.wait_for(lim.acquire(0, 10), timeout=1)
+        return lim.in_flight
+
+    assert asyncio.run(scenario()) == 1
+
+def test_throttle_detection():
+    assert is_throttle(ModelHTTPError(status_code=429, model_name="m"))
+    assert is_throttle(ModelHTTPError(
+        status_code=400, model_name="m", body={"Error": {"Code": "ThrottlingException"}}
+    ))
+    assert not is_throttle(ModelHTTPError(status_code=500, model_name="m"))
+    assert not is_throttle(ValueError("bad"))
+
+def test_transient_detection():
+    assert is_transient(ModelHTTPError(status_code=503, model_name="m"))
+    assert is_transient(ModelAPIError(model_name="m", message="connection reset"))
+    assert not is_transient(ModelHTTPError(status_code=400, model_name="m"))
+    assert not is_transient(ValueError("bad"))
+
+def test_throttled_request_is_retried(monkeypatch):
+    from pydantic_ai.models.test import TestModel
+
+    from agent.models import SpecialistDeps
+    from agent.specialists import debt_spirals_agent
+
+    monkeypatch.setattr(limiter, "backoff_delay", lambda attempt: 0)
+
+    class Flaky(TestModel):
+        attempts = 0
+
+        async def request(self, *args, **kwargs):
+            Flaky.attempts += 1
+            if Flaky.attempts == 1:
+                raise ModelHTTPError(status_code=429, model_name="m")
+            return await super().request(*args, **kwargs)
+
+    lim = AdaptiveLimiter(rpm=1000, tpm=10**6, max_concurrency=4)
+    model = limiter.LimitedModel(Flaky(call_tools=[]), limiter=lim)
+    with debt_spirals_agent.override(model=model):
+        asyncio.run(debt_spirals_agent.run("scan", deps=SpecialistDeps(user_id="u1", financial_data="{}")))
+    assert Flaky.attempts == 2
+    assert lim.throttled == 1 and lim.in_flight == 0
+
+def test_transient_error_is_retried_without_growing_limit(monkeypatch):
+    from pydantic_ai.models.test import TestModel
+
+    from agent.models import SpecialistDeps
+    from agent.specialists import debt_spirals_agent
+
+    monkeypatch.setattr(limiter, "backoff_delay", lambda attempt: 0)
+
+    class Unavailable(TestModel):
+        attempts = 0
+
+        async def request(self, *args, **kwargs):
+            Unavailable.attempts += 1
+            raise ModelHTTPError(status_code=503, model_name="m")
+
+    lim = AdaptiveLimiter(rpm=1000, tpm=10**6, max_concurrency=8)
+    lim.limit = 4.0
+    model = limiter.LimitedModel(Unavailable(call_tools=[]), limiter=lim)
+    with debt_spirals_agent.override(model=model), pytest.raises(ModelHTTPError):
+        asyncio.run(debt_spirals_agent.run("scan", deps=SpecialistDeps(user_id="u1", financial_data="{}")))
+    assert Unavailable.attempts == limiter.MAX_TRANSIENT_RETRIES + 1
+    assert lim.limit == 4.0 and lim.failed == Unavailable.attempts and lim.in_flight == 0
@@ -0,0 +1,13 @@
+"""The shared merchant tables must agree with the VTC category map."""
+
+from agent.vtc.constants import ALL_MCT_TYPES, CATEGORY_TO_MCT
+from shared.merchants import MCC_CATEGORIES, MCC_RANGES
+
+
+def test_mcc_mcts_are_valid_and_match_category_map():
+    rows = list(MCC_CATEGORIES.values()) + [(c, m) for _, _, c, m in MCC_RANGES]
+    for category, mct in rows:
+        if mct is not None:
+            assert mct in ALL_MCT_TYPES, mct
+        if category in CATEGORY_TO_MCT:
+            assert mct == CATEGORY_TO_MCT[category], category
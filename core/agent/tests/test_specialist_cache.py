@@ -0,0 +1,66 @@
+"""Tests for the specialist result cache."""
+
+import asyncio
+
+from pydantic_ai.models.test import TestModel
+
+from agent.models import SpecialistDeps
+from agent.specialists import base, cache, debt_spirals_agent, run_specialist
+from agent.specialists.base import SPECIALISTS
+
+
+class FakeStore:
+    def __init__(self):
+        self.rows = {}
+
+    def get_specialist_result(self, user_id, key):
+        return self.rows.get((user_id, key))
+
+    def save_specialist_result(self, user_id, key, data, ttl_seconds):
+        self.rows[(user_id, key)] = data
+
+
+def _run(deps, model):
+    with debt_spirals_agent.override(model=model):
+        return asyncio.run(run_specialist(debt_spirals_agent, deps))
+
+
+def test_result_key_changes_with_any_input():
+    base = cache.result_key("debt_spirals", "v1", "model", "{}")
+    assert base == cache.result_key("debt_spirals", "v1", "model", "{}")
+    assert base != cache.result_key("debt_spirals", "v2", "model", "{}")
+    assert base != cache.result_key("debt_spirals", "v1", "other", "{}")
+    assert base != cache.result_key("debt_spirals", "v1", "model", "{ }")
+
+def test_specialists_register_prompt_versions():
+    info = SPECIALISTS["debt_spirals"]
+    assert len(info.prompt_version) == 12
+    assert len({s.prompt_version for s in SPECIALISTS.values()}) == len(SPECIALISTS)
+    assert info.model_id == base._specialist_model.model_name
+
+def test_repeat_slice_skips_model_call():
+    cache.clear()
+    store = FakeStore()
+    cache.configure_store(store)
+    try:
+        model = TestModel(call_tools=[])
+        deps = SpecialistDeps(user_id="u1", financial_data='{"debts": []}')
+        first = _run(deps, model)
+        assert len(store.rows) == 1
+
+        model.last_model_request_parameters = None
+        assert _run(deps, model) == first
+        assert model.last_model_request_parameters is None
+
+        # Cold container: served from the persistent tier
+        cache.clear()
+        assert _run(deps, model) == first
+        assert model.last_model_request_parameters is None
+
+        # A changed slice misses
+        _run(SpecialistDeps(user_id="u1", financial_data='{"debts": [1]}'), model)
+        assert model.last_model_request_parameters is not None
+        assert len(store.rows) == 2
+    finally:
+        cache.configure_store(None)
+        cache.clear()
@@ -0,0 +1,85 @@
+"""Tests for the deadline-aware specialist runner."""
+
+import asyncio
+import time
+from collections import deque
+
+from agent.models import BlackHoleAnalysis, SpecialistDeps
+from agent.specialists import base, debt_spirals_agent
+
+DEPS = SpecialistDeps(user_id="u1", financial_data="{}")
+FALLBACK = BlackHoleAnalysis(debts=[], total_debt=0.0, total_monthly_interest=0.0, urgency="stable", verdict="offline")
+RESULT = FALLBACK.model_copy(update={"verdict": "clear"})
+
+
+def _run(monkeypatch, fake, **kwargs):
+    monkeypatch.setattr(base, "run_specialist", fake)
+    return asyncio.run(base.run_specialist_with_outcome(debt_spirals_agent, DEPS, FALLBACK, **kwargs))
+
+
+def test_ok_outcome(monkeypatch):
+    async def fake(agent, deps):
+        return RESULT
+    output, outcome = _run(monkeypatch, fake)
+    assert output == RESULT
+    assert outcome.status == "ok" and not outcome.hedged
+
+def test_timeout_serves_fallback(monkeypatch):
+    async def fake(agent, deps):
+        await asyncio.sleep(1)
+        return RESULT
+    output, outcome = _run(monkeypatch, fake, timeout=0.05)
+    assert output == FALLBACK
+    assert outcome.status == "timeout"
+    assert outcome.elapsed_ms < 500
+
+def test_error_is_reported(monkeypatch):
+    async def fake(agent, deps):
+        raise RuntimeError("throttled")
+    output, outcome = _run(monkeypatch, fake)
+    assert output == FALLBACK
+    assert outcome.status == "error"
+    assert outcome.error == "RuntimeError: throttled"
+
+def test_spent_deadline_skips_the_call(monkeypatch):
+    calls = []
+    async def fake(agent, deps):
+        calls.append(1)
+        return RESULT
+    output, outcome = _run(monkeypatch, fake, deadline=time.monotonic() - 1)
+    assert output == FALLBACK and outcome.status == "fallback"
+    assert not calls
+
+def test_deadline_caps_the_timeout(monkeypatch):
+    async def fake(agent, deps):
+        await asyncio.sleep(1)
+        return RESULT
+    _, outcome = _run(monkeypatch, fake, deadline=time.monotonic() + 0.05, timeout=10)
+    assert outcome.status == "timeout"
+
+def test_hedge_past_p95_wins(monkeypatch):
+    monkeypatch.setitem(base._latencies, "debt_spirals", deque([0.02] * base.HEDGE_MIN_SAMPLES))
+    calls = []
+    async def fake(agent, deps):
+        calls.append(1)
+        # First request stalls, the hedged one answers quickly
+        await asyncio.sleep(1 if len(calls) == 1 else 0.01)
+        return RESULT
+    output, outcome = _run(monkeypatch, fake, timeout=0.5, hedge=True)
+    assert output == RESULT
+    assert outcome.status == "ok" and outcome.hedged
+    assert len(calls) == 2
+
+def test_timeout_reports_whether_the_hedge_started(monkeypatch):
+    async def fake(agent, deps):
+        await asyncio.sleep(1)
+        return RESULT
+    # p95 is known but the timeout fires before it elapses
+    monkeypatch.setitem(base._latencies, "debt_spirals", deque([0.2] * base.HEDGE_MIN_SAMPLES))
+    _, outcome = _run(monkeypatch, fake, timeout=0.05, hedge=True)
+    assert outcome.status == "timeout" and not outcome.hedged
+    monkeypatch.setitem(base._latencies, "debt_spirals", deque([0.01] * base.HEDGE_MIN_SAMPLES))
+    _, outcome = _run(monkeypatch, fake, timeout=0.1, hedge=True)
+    assert outcome.status == "timeout" and outcome.hedged
+def test_no_hedge_without_enough_samples():
+    assert base.p95_latency("never_ran") is None
@@ -0,0 +1,91 @@
+"""Tests for progressive analysis streaming."""
+
+import asyncio
+import json
+import threading
+import time
+from contextlib import ExitStack
+
+from pydantic_ai.models.test import TestModel
+
+from agent import orchestrator
+from agent.models import CaptainAnalysis
+from agent.specialists import cache
+
+
+async def _collect():
+    return [event async for event in orchestrator.stream_analysis("u1")]
+
+
+def test_stream_emits_each_specialist_then_analysis(monkeypatch):
+    monkeypatch.setattr(cache, "SPECIALIST_CACHE_ENABLED", False)
+    with ExitStack() as stack:
+        for agent, _, _ in orchestrator.SPECIALIST_PLAN.values():
+            stack.enter_context(agent.override(model=TestModel(call_tools=[])))
+        events = asyncio.run(_collect())
+
+    specialist_events = [e for e in events if e["type"] == "specialist"]
+    assert {e["specialist"] for e in specialist_events} == set(orchestrator.SPECIALIST_PLAN)
+    assert events[-1]["type"] == "analysis"
+    analysis = CaptainAnalysis.model_validate(events[-1]["result"])
+    for event in specialist_events:
+        assert getattr(analysis, event["specialist"]).model_dump(mode="json") == event["result"]
+
+def test_format_event_ndjson_and_sse():
+    event = {"type": "specialist", "specialist": "debt_spirals", "result": {}}
+    line = orchestrator.format_event(event)
+    assert line.endswith("\n") and json.loads(line) == event
+    message = orchestrator.format_event(event, sse=True)
+    assert message.startswith("event: specialist\ndata: ") and message.endswith("\n\n")
+
+def test_fetch_stops_at_the_deadline(monkeypatch):
+    monkeypatch.setattr(orchestrator, "_load_mock_data", lambda: time.sleep(0.5))
+
+    async def fetch():
+        start = time.monotonic()
+        try:
+            await orchestrator.fetch_all_financial_data("u1", deadline=start + 0.05)
+        except TimeoutError:
+            return time.monotonic() - start
+
+    elapsed = asyncio.run(fetch())
+    assert elapsed is not None and elapsed < 0.4
+
+def test_slices_are_built_off_the_event_loop(monkeypatch):
+    monkeypatch.setattr(cache, "SPECIALIST_CACHE_ENABLED", False)
+    threads = []
+
+    def slow_slice(data):
+        threads.append(threading.current_thread())
+        time.sleep(0.2)
+        return "{}"
+
+    plan = {
+        field: (agent, slow_slice, fallback)
+        for field, (agent, _, fallback) in orchestrator.SPECIALIST_PLAN.items()
+    }
+    monkeypatch.setattr(orchestrator, "SPECIALIST_PLAN", plan)
+
+    async def run():
+        data = await orchestrator.fetch_all_financial_data("u1")
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        tick = asyncio.create_task(ticker())
+        with ExitStack() as stack:
+            for agent, _, _ in plan.values():
+                stack.enter_context(agent.override(model=TestModel(call_tools=[])))
+            results = [r async for r in orchestrator.iter_specialists(data, "u1")]
+        tick.cancel()
+        return results, ticks
+
+    results, ticks = asyncio.run(run())
+    assert len(results) == len(plan)
+    assert threading.main_thread() not in threads
+    # The loop kept running while the slices slept
+    assert ticks >= 5
@@ -1,5 +1,7 @@
 import os
-from typing import Any
+import time
+from itertools import islice
+from typing import Any, Iterator
 
 import boto3
 from aws_lambda_powertools.logging import Logger
@@ -8,6 +10,10 @@ from botocore.exceptions import ClientError
 
 logger = Logger(service="DynamoDBClient")
 
+# BatchGetItem's per-request key limit
+BATCH_GET_MAX_KEYS = 100
+BATCH_GET_RETRY_BASE_S = 0.05
+
 class DynamoDBClient:
     """Base DynamoDB client with common operations."""
 
@@ -23,19 +29,53 @@ class DynamoDBClient:
         self.table = self.dynamodb.Table(table_name)
         self.table_name = table_name
 
-    def put_item(self, item: dict[str, Any]) -> bool:
+    def put_item(
+        self,
+        item: dict[str, Any],
+        condition_expression: str | None = None,
+        expression_attribute_values: dict[str, Any] | None = None,
+    ) -> bool:
         """
         Put an item into the table.
 
         Args:
             item: Item data with PK, SK, and attributes
+            condition_expression: Optional condition the existing item must meet
+            expression_attribute_values: Values referenced by the condition
 
         Returns:
             True if successful
+
+        Raises:
+            ClientError: ConditionalCheckFailedException if the condition fails
         """
+        put_kwargs: dict[str, Any] = {'Item': item}
+        if condition_expression:
+            put_kwargs['ConditionExpression'] = condition_expression
+        if expression_attribute_values:
+            put_kwargs['ExpressionAttributeValues'] = expression_attribute_values
+
         try:
-            self.table.put_item(Item=item)
+            self.table.put_item(**put_kwargs)
             return True
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                logger.error(f"Error putting item in {self.table_name}", e)
+            raise
+
+    def replace_item(self, item: dict[str, Any]) -> dict[str, Any] | None:
+        """
+        Put an item and return the item it replaced.
+
+        Args:
+            item: Item data with PK, SK, and attributes
+
+        Returns:
+            Previous item data (ReturnValues=ALL_OLD) or None if there was none
+        """
+        try:
+            response = self.table.put_item(Item=item, ReturnValues='ALL_OLD')
+            return response.get('Attributes')
         except ClientError as e:
             logger.error(f"Error putting item in {self.table_name}", e)
             raise
@@ -58,6 +98,39 @@ class DynamoDBClient:
             logger.error(f"Error getting item from {self.table_name}", e)
             raise
 
+    def batch_get_items(self, keys: list[tuple[str, str]]) -> list[dict[str, Any]]:
+        """
+        Get several items by PK and SK with BatchGetItem.
+
+        Requests at most BATCH_GET_MAX_KEYS keys at a time and re-requests
+        unprocessed keys (throttling or the 16 MB response cap), with
+        exponential backoff, until all are read.
+
+        Args:
+            keys: (PK, SK) pairs
+
+        Returns:
+            Items found, in no particular order
+        """
+        items: list[dict[str, Any]] = []
+        pending = [{'PK': pk, 'SK': sk} for pk, sk in dict.fromkeys(keys)]
+        while pending:
+            request = {self.table_name: {'Keys': pending[:BATCH_GET_MAX_KEYS]}}
+            pending = pending[BATCH_GET_MAX_KEYS:]
+            attempt = 0
+            while request:
+                if attempt:
+                    time.sleep(min(1.0, BATCH_GET_RETRY_BASE_S * 2 ** attempt))
+                try:
+                    response = self.dynamodb.batch_get_item(RequestItems=request)
+                except ClientError as e:
+                    logger.error(f"Error batch getting items from {self.table_name}", e)
+                    raise
+                items.extend(response.get('Responses', {}).get(self.table_name, []))
+                request = response.get('UnprocessedKeys') or None
+                attempt += 1
+        return items
+
     def delete_item(self, pk: str, sk: str) -> bool:
         """
         Delete an item by PK and SK.
@@ -76,13 +149,103 @@ class DynamoDBClient:
             logger.error(f"Error deleting item from {self.table_name}", e)
             raise
 
+    def _iter_pages(self, query_kwargs: dict[str, Any]) -> Iterator[dict[str, Any]]:
+        """
+        Yield items from a Query, fetching the next page only when needed.
+
+        Follows LastEvaluatedKey until the result set is exhausted or the
+        caller stops iterating.
+        """
+        query_kwargs = dict(query_kwargs)
+        while True:
+            try:
+                response = self.table.query(**query_kwargs)
+            except ClientError as e:
+                logger.error(f"Error querying {self.table_name}", e)
+                raise
+
+            yield from response.get('Items', [])
+
+            last_key = response.get('LastEvaluatedKey')
+            if not last_key:
+                return
+            query_kwargs['ExclusiveStartKey'] = last_key
+
+    @staticmethod
+    def _apply_read_options(
+        query_kwargs: dict[str, Any],
+        filter_expression: ComparisonCondition | None,
+        page_size: int | None,
+        projection_expression: str | None,
+        expression_attribute_names: dict[str, str] | None,
+    ) -> dict[str, Any]:
+        """Add optional filter, page size and projection to query kwargs."""
+        if filter_expression:
+            query_kwargs['FilterExpression'] = filter_expression
+
+        if page_size:
+            query_kwargs['Limit'] = page_size
+
+        if projection_expression:
+            query_kwargs['ProjectionExpression'] = projection_expression
+
+        if expression_attribute_names:
+            query_kwargs['ExpressionAttributeNames'] = expression_attribute_names
+
+        return query_kwargs
+
+    def iter_query(
+        self,
+        pk: str,
+        sk_prefix: str | None = None,
+        filter_expression: ComparisonCondition | None = None,
+        page_size: int | None = None,
+        scan_index_forward: bool = True,
+        projection_expression: str | None = None,
+        expression_attribute_names: dict[str, str] | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Lazily iterate items by PK with optional SK prefix, across all pages.
+
+        Args:
+            pk: Partition key value
+            sk_prefix: Optional SK prefix for begins_with query
+            filter_expression: Optional filter expression
+            page_size: Items evaluated per DynamoDB request (Limit)
+            scan_index_forward: True for ascending, False for descending
+            projection_expression: Optional attributes to return
+                (e.g. "SK, #d"; reserved words like data/ttl need aliases)
+            expression_attribute_names: Aliases used in the projection
+
+        Yields:
+            Items, one page fetched at a time
+        """
+        key_condition = Key('PK').eq(pk)
+
+        if sk_prefix:
+            key_condition = key_condition & Key('SK').begins_with(sk_prefix)
+
+        query_kwargs = self._apply_read_options(
+            {
+                'KeyConditionExpression': key_condition,
+                'ScanIndexForward': scan_index_forward
+            },
+            filter_expression,
+            page_size,
+            projection_expression,
+            expression_attribute_names,
+        )
+        return self._iter_pages(query_kwargs)
+
     def query(
         self,
         pk: str,
         sk_prefix: str | None = None,
         filter_expression: ComparisonCondition | None = None,
         limit: int | None = None,
-        scan_index_forward: bool = True
+        scan_index_forward: bool = True,
+        projection_expression: str | None = None,
+        expression_attribute_names: dict[str, str] | None = None,
     ) -> list[dict[str, Any]]:
         """
         Query items by PK with optional SK prefix.
@@ -93,34 +256,65 @@ class DynamoDBClient:
             filter_expression: Optional filter expression
             limit: Maximum number of items to return
             scan_index_forward: True for ascending, False for descending
+            projection_expression: Optional attributes to return
+            expression_attribute_names: Aliases used in the projection
 
         Returns:
-            List of items
+            List of items (all pages, up to limit)
         """
-        try:
-            key_condition = Key('PK').eq(pk)
-
-            if sk_prefix:
-                key_condition = key_condition & Key('SK').begins_with(sk_prefix)
-
-            query_kwargs = {
-                'KeyConditionExpression': key_condition,
-                'ScanIndexForward': scan_index_forward
-            }
-
-            if filter_expression:
-                query_kwargs['FilterExpression'] = filter_expression
+        items = self.iter_query(
+            pk,
+            sk_prefix=sk_prefix,
+            filter_expression=filter_expression,
+            page_size=limit,
+            scan_index_forward=scan_index_forward,
+            projection_expression=projection_expression,
+            expression_attribute_names=expression_attribute_names,
+        )
+        return list(islice(items, limit))
+
+    def iter_query_index(
+            self,
+            index_name: str,
+            key_condition_expression: ComparisonCondition | None = None,
+            filter_expression: ComparisonCondition | None = None,
+            page_size: int | None = None,
+            scan_index_forward: bool = True,
+            projection_expression: str | None = None,
+            expression_attribute_names: dict[str, str] | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Lazily iterate items from a secondary index, across all pages.
 
-            if limit:
-                query_kwargs['Limit'] = limit
+        Args:
+            index_name: Name of the secondary index
+            key_condition_expression: Optional key condition expression for the query
+            filter_expression: Optional filter expression
+            page_size: Items evaluated per DynamoDB request (Limit)
+            scan_index_forward: True for ascending, False for descending
+            projection_expression: Optional attributes to return
+            expression_attribute_names: Aliases used in the projection
 
-            response = self.table.query(**query_kwargs)
-            return response.get('Items', [])
+        Yields:
+            Items, one page fetched at a time
+        """
+        query_kwargs = {
+            'IndexName': index_name,
+            'ScanIndexForward': scan_index_forward
+        }
+
+        if key_condition_expression:
+            query_kwargs['KeyConditionExpression'] = key_condition_expression
+
+        query_kwargs = self._apply_read_options(
+            query_kwargs,
+            filter_expression,
+            page_size,
+            projection_expression,
+            expression_attribute_names,
+        )
+        return self._iter_pages(query_kwargs)
 
-        except ClientError as e:
-            logger.error(f"Error querying {self.table_name}", e)
-            raise
-    
     def query_index(
             self,
             index_name: str,
@@ -128,6 +322,8 @@ class DynamoDBClient:
             filter_expression: ComparisonCondition | None = None,
             limit: int | None = None,
             scan_index_forward: bool = True,
+            projection_expression: str | None = None,
+            expression_attribute_names: dict[str, str] | None = None,
     ) -> list[dict[str, Any]]:
         """
         Query items using a secondary index.
@@ -138,31 +334,22 @@ class DynamoDBClient:
             filter_expression: Optional filter expression
             limit: Optional maximum number of items to return
             scan_index_forward: True for ascending, False for descending
+            projection_expression: Optional attributes to return
+            expression_attribute_names: Aliases used in the projection
 
         Returns:
-            List of items
+            List of items (all pages, up to limit)
         """
-        try:
-            query_kwargs = {
-                'IndexName': index_name,
-                'ScanIndexForward': scan_index_forward
-            }
-
-            if key_condition_expression:
-                query_kwargs['KeyConditionExpression'] = key_condition_expression
-            
-            if filter_expression:
-                query_kwargs['FilterExpression'] = filter_expression
-
-            if limit:
-                query_kwargs['Limit'] = limit
-
-            response = self.table.query(**query_kwargs)
-            return response.get('Items', [])
-
-        except ClientError as e:
-            logger.error(f"Error querying {self.table_name}", e)
-            raise    
+        items = self.iter_query_index(
+            index_name,
+            key_condition_expression=key_condition_expression,
+            filter_expression=filter_expression,
+            page_size=limit,
+            scan_index_forward=scan_index_forward,
+            projection_expression=projection_expression,
+            expression_attribute_names=expression_attribute_names,
+        )
+        return list(islice(items, limit))
 
     def update_item(
         self,
@@ -0,0 +1,73 @@
+"""
+Binary codecs for cached payloads stored in DynamoDB.
+
+Encoded values are a single version byte followed by the codec body and
+are stored as a Binary attribute. Rows written before codecs existed hold a
+plain JSON string and are still decoded transparently.
+
+Registered codecs:
+- 0x01: compact JSON compressed with zlib
+"""
+
+import json
+import zlib
+from dataclasses import dataclass
+from typing import Any, Callable
+
+
+@dataclass(frozen=True)
+class Codec:
+    """Encoder/decoder pair identified by its version byte."""
+
+    version: int
+    encode: Callable[[Any], bytes]
+    decode: Callable[[bytes], Any]
+
+
+_CODECS: dict[int, Codec] = {}
+
+
+def register_codec(codec: Codec) -> None:
+    """Register a codec under its version byte."""
+    if not 0 < codec.version < 256:
+        raise ValueError(f"Codec version must fit in one byte: {codec.version}")
+    _CODECS[codec.version] = codec
+
+
+def _zlib_json_encode(payload: Any) -> bytes:
+    text = json.dumps(payload, default=str, separators=(",", ":"))
+    return zlib.compress(text.encode("utf-8"), level=6)
+
+
+def _zlib_json_decode(body: bytes) -> Any:
+    return json.loads(zlib.decompress(body).decode("utf-8"))
+
+
+ZLIB_JSON = Codec(version=1, encode=_zlib_json_encode, decode=_zlib_json_decode)
+register_codec(ZLIB_JSON)
+
+DEFAULT_CODEC = ZLIB_JSON
+
+
+def encode(payload: Any, codec: Codec = DEFAULT_CODEC) -> bytes:
+    """Encode a payload as version byte + codec body."""
+    return bytes([codec.version]) + codec.encode(payload)
+
+
+def decode(value: Any) -> Any:
+    """
+    Decode a stored value.
+
+    Accepts legacy JSON strings, raw bytes, or boto3 Binary wrappers.
+    """
+    if isinstance(value, str):
+        return json.loads(value)
+
+    raw = bytes(value)
+    if not raw:
+        raise ValueError("Cannot decode empty payload")
+
+    codec = _CODECS.get(raw[0])
+    if codec is None:
+        raise ValueError(f"Unknown codec version: {raw[0]}")
+    return codec.decode(raw[1:])
@@ -2,29 +2,199 @@
 DynamoDB client for caching financial data: snapshots, budgets, and asteroid states.
 
 Reuses the Users table with new SK patterns:
-- SNAPSHOT#latest: Cached FinancialSnapshot (TTL: 5 min)
+- SNAPSHOT#latest: Cached FinancialSnapshot (fresh 5 min, servable stale for
+  SNAPSHOT_STALE_GRACE_SECONDS more while a refresh runs)
 - BUDGET#latest: Cached BudgetReport (TTL: 5 min)
 - ASTEROID#{id}: Persisted asteroid action states
+- SYNC#nessie: Nessie high-water marks and sync aggregates (no TTL)
+- SYNC#nessie#MONTH#{YYYY-MM}: One month of merged purchase history (no TTL)
+- DETECTOR#asteroids: Incremental asteroid detector state (no TTL)
+- ROLLUP#{YYYY-MM}: Per-month income/spending rollups (no TTL)
+- LOCK#{name}: Short-lived refresh leases (TTL: lease length)
+- SPECIALIST#{key}: Cached specialist results, content-addressed
+  (TTL: SPECIALIST_CACHE_TTL_SECONDS in the agent package)
+
+Cache rows carry fresh_until (end of freshness) and ttl (when DynamoDB may
+delete the row); they differ only for rows with a stale grace window.
+
+Snapshot, budget, sync and detector payloads are stored as a versioned binary blob
+(see codec.py). Blobs larger than MAX_CHUNK_BYTES are split into
+{SK}#CHUNK#{write_id}#{n} rows; the head row records the chunk count and
+write_id so readers never mix chunks from different writes.
+
+Snapshot, budget and asteroid-state reads are fronted by a per-container L1
+TTLCache shared by all DataTableClient instances. Entries expire with the
+row's freshness and writes from the same container update or invalidate
+them.
 """
 
 import json
 import os
 import time
+import uuid
+from itertools import islice
+from typing import Any, Iterator
 
 from aws_lambda_powertools.logging import Logger
+from botocore.exceptions import ClientError
+from shared.ttl_cache import TTLCache
 
+from . import codec
 from .base_client import DynamoDBClient
+from .models.user_bundle import UserBundle
 
 logger = Logger(service="DataTableClient")
 
 CACHE_TTL_SECONDS = 300  # 5 minutes
 
+# How long past freshness a snapshot may still be served while refreshing
+SNAPSHOT_STALE_GRACE_SECONDS = int(os.environ.get("SNAPSHOT_STALE_GRACE_SECONDS", "900"))
+
+REFRESH_LOCK_SECONDS = 60
+
+# Headroom under DynamoDB's 400 KB item limit for keys and attributes
+MAX_CHUNK_BYTES = 350_000
+
+CHUNK_MARKER = "#CHUNK#"
+
+SYNC_SK = "SYNC#nessie"
+SYNC_MONTH_SK = "SYNC#nessie#MONTH#"
+
+L1_CACHE_MAX_ENTRIES = int(os.environ.get("L1_CACHE_MAX_ENTRIES", "256"))
+
+# Module-level so it survives across invocations in a warm container
+_l1_cache = TTLCache(max_entries=L1_CACHE_MAX_ENTRIES, ttl_seconds=CACHE_TTL_SECONDS)
+
+_MISSING = object()
+
 
 class DataTableClient(DynamoDBClient):
     """Client for caching financial data in Users table."""
 
     def __init__(self):
         super().__init__(table_name=os.environ["USERS_TABLE_NAME"])
+        self.l1 = _l1_cache
+
+    # =========================================================================
+    # Encoded payload storage
+    # =========================================================================
+
+    @staticmethod
+    def _chunk_keys(sk: str, head: dict) -> list[str]:
+        """SKs of the chunk rows a head row references (none if unchunked)."""
+        if "chunks" not in head:
+            return []
+        return [
+            f"{sk}{CHUNK_MARKER}{head['chunk_id']}#{n:04d}"
+            for n in range(int(head["chunks"]))
+        ]
+
+    def _put_data(
+        self, pk: str, sk: str, payload: Any, attributes: dict[str, Any]
+    ) -> dict | None:
+        """
+        Encode a payload and store it, chunking it if it's too large.
+
+        Returns the replaced head row, if there was one.
+        """
+        blob = codec.encode(payload)
+        if len(blob) <= MAX_CHUNK_BYTES:
+            head = {"PK": pk, "SK": sk, "data": blob, **attributes}
+        else:
+            write_id = uuid.uuid4().hex[:12]
+            chunks = [
+                blob[i:i + MAX_CHUNK_BYTES]
+                for i in range(0, len(blob), MAX_CHUNK_BYTES)
+            ]
+            head = {"PK": pk, "SK": sk, "chunks": len(chunks), "chunk_id": write_id, **attributes}
+            chunk_attributes = {k: v for k, v in attributes.items() if k == "ttl"}
+            written: list[str] = []
+            try:
+                for chunk_sk, chunk in zip(self._chunk_keys(sk, head), chunks):
+                    self.put_item({"PK": pk, "SK": chunk_sk, "data": chunk, **chunk_attributes})
+                    written.append(chunk_sk)
+            except Exception:
+                # Nothing references a partial chunk set; don't leave it behind
+                for chunk_sk in written:
+                    self.delete_item(pk, chunk_sk)
+                raise
+            logger.info("Stored chunked payload", sk=sk, chunks=len(chunks), size=len(blob))
+
+        # Head row last, so readers only see complete chunk sets
+        previous = self.replace_item(head)
+
+        # Chunks of rows with a TTL expire with them; others are pruned from
+        # the replaced head, without another read
+        if "ttl" not in attributes and previous:
+            for chunk_sk in self._chunk_keys(sk, previous):
+                self.delete_item(pk, chunk_sk)
+        return previous
+
+    def _decode_data(
+        self, item: dict, chunk_rows: dict[str, Any] | None = None
+    ) -> Any:
+        """
+        Decode a row's payload, reassembling chunks if needed.
+
+        chunk_rows maps chunk SK -> data for chunks already read (e.g. by a
+        BatchGetItem); otherwise the chunks are queried.
+        """
+        if "chunks" not in item:
+            return codec.decode(item["data"])
+
+        prefix = f"{item['SK']}{CHUNK_MARKER}{item['chunk_id']}#"
+        if chunk_rows is not None:
+            parts = {sk: data for sk, data in chunk_rows.items() if sk.startswith(prefix)}
+        else:
+            parts = {}
+        if len(parts) != int(item["chunks"]):
+            parts = {
+                row["SK"]: row["data"]
+                for row in self.iter_query(item["PK"], sk_prefix=prefix)
+            }
+        if len(parts) != int(item["chunks"]):
+            raise ValueError(f"Incomplete chunk set for {item['SK']}")
+
+        return codec.decode(b"".join(bytes(parts[sk]) for sk in sorted(parts)))
+
+    def _cached_read(self, user_id: str, sk: str) -> dict | None:
+        """Read a TTL'd cache row through the L1 cache."""
+        key = (user_id, sk)
+        data = self.l1.get(key)
+        if data is not None:
+            return data
+
+        item = self.get_item(f"USER#{user_id}", sk)
+        data = self._fresh_data(item)
+        if data is not None:
+            self.l1.set(key, data, expires_at=self._fresh_until(item))
+        return data
+
+    def _cached_write(
+        self, user_id: str, sk: str, data: dict, grace_seconds: int = 0
+    ) -> None:
+        """Write a TTL'd cache row to DynamoDB and the L1 cache."""
+        fresh_until = int(time.time()) + CACHE_TTL_SECONDS
+        self._put_data(
+            f"USER#{user_id}",
+            sk,
+            data,
+            {"fresh_until": fresh_until, "ttl": fresh_until + grace_seconds},
+        )
+        self.l1.set((user_id, sk), data, expires_at=fresh_until)
+
+    @staticmethod
+    def _fresh_until(item: dict) -> int:
+        """End of a cache row's freshness (rows predating fresh_until use ttl)."""
+        return int(item.get("fresh_until", item.get("ttl", 0)))
+
+    def _fresh_data(
+        self, item: dict | None, chunk_rows: dict[str, Any] | None = None
+    ) -> dict | None:
+        """Decode a cache row's data if it is still fresh."""
+        if item and self._fresh_until(item) > int(time.time()):
+            return self._decode_data(item, chunk_rows)
+        return None
 
     # =========================================================================
     # Snapshot caching
@@ -32,21 +202,39 @@ class DataTableClient(DynamoDBClient):
 
     def get_cached_snapshot(self, user_id: str) -> dict | None:
         """Get cached snapshot if TTL hasn't expired."""
-        pk = f"USER#{user_id}"
-        sk = "SNAPSHOT#latest"
-        item = self.get_item(pk, sk)
-        if item and item.get("ttl", 0) > int(time.time()):
-            return json.loads(item["data"])
-        return None
+        return self._cached_read(user_id, "SNAPSHOT#latest")
+
+    def get_snapshot_allow_stale(self, user_id: str) -> tuple[dict | None, bool]:
+        """
+        Get the cached snapshot even if it is past freshness.
+
+        Returns (snapshot, is_stale). Stale rows are returned until their
+        grace window ends; (None, False) means there is nothing to serve.
+        """
+        cached = self.l1.get((user_id, "SNAPSHOT#latest"))
+        if cached is not None:
+            return cached, False
+
+        item = self.get_item(f"USER#{user_id}", "SNAPSHOT#latest")
+        now = int(time.time())
+        if not item or int(item.get("ttl", 0)) <= now:
+            return None, False
+
+        data = self._decode_data(item)
+        fresh_until = self._fresh_until(item)
+        if fresh_until > now:
+            self.l1.set((user_id, "SNAPSHOT#latest"), data, expires_at=fresh_until)
+            return data, False
+        return data, True
 
     def cache_snapshot(self, user_id: str, snapshot_dict: dict) -> None:
-        """Cache snapshot with 5-minute TTL."""
-        self.put_item({
-            "PK": f"USER#{user_id}",
-            "SK": "SNAPSHOT#latest",
-            "data": json.dumps(snapshot_dict, default=str),
-            "ttl": int(time.time()) + CACHE_TTL_SECONDS,
-        })
+        """Cache snapshot with 5-minute freshness plus the stale grace window."""
+        self._cached_write(
+            user_id,
+            "SNAPSHOT#latest",
+            snapshot_dict,
+            grace_seconds=SNAPSHOT_STALE_GRACE_SECONDS,
+        )
 
     # =========================================================================
     # Budget caching
@@ -54,22 +242,172 @@ class DataTableClient(DynamoDBClient):
 
     def get_cached_budget(self, user_id: str) -> dict | None:
         """Get cached budget if TTL hasn't expired."""
+        return self._cached_read(user_id, "BUDGET#latest")
+
+    def cache_budget(self, user_id: str, budget_dict: dict) -> None:
+        """Cache budget report with 5-minute TTL."""
+        self._cached_write(user_id, "BUDGET#latest", budget_dict)
+
+    # =========================================================================
+    # Refresh locks
+    # =========================================================================
+
+    def acquire_refresh_lock(
+        self, user_id: str, name: str, lease_seconds: int = REFRESH_LOCK_SECONDS
+    ) -> bool:
+        """
+        Take a per-user refresh lease; False if another worker holds it.
+
+        The lease expires on its own, so a crashed refresh can't wedge the
+        lock for longer than lease_seconds.
+        """
+        now = int(time.time())
+        try:
+            self.put_item(
+                {
+                    "PK": f"USER#{user_id}",
+                    "SK": f"LOCK#{name}",
+                    "lease_until": now + lease_seconds,
+                    "ttl": now + lease_seconds,
+                },
+                condition_expression="attribute_not_exists(PK) OR lease_until < :now",
+                expression_attribute_values={":now": now},
+            )
+            return True
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                return False
+            raise
+
+    def release_refresh_lock(self, user_id: str, name: str) -> None:
+        """Release a refresh lease taken with acquire_refresh_lock."""
+        self.delete_item(f"USER#{user_id}", f"LOCK#{name}")
+
+    # =========================================================================
+    # Nessie incremental sync state
+    # =========================================================================
+
+    def get_sync_state(self, user_id: str) -> dict | None:
+        """Get persisted Nessie sync state (per-account marks + history)."""
         pk = f"USER#{user_id}"
-        sk = "BUDGET#latest"
-        item = self.get_item(pk, sk)
-        if item and item.get("ttl", 0) > int(time.time()):
+        item = self.get_item(pk, SYNC_SK)
+        if not item or not ("data" in item or "chunks" in item):
+            return None
+        state = self._decode_data(item)
+        if "months" not in item:
+            return state
+
+        rows = {row["SK"]: row for row in self.iter_query(pk, sk_prefix=SYNC_MONTH_SK)}
+        chunk_rows = {sk: row.get("data") for sk, row in rows.items() if CHUNK_MARKER in sk}
+        history = []
+        for month in sorted(item["months"], reverse=True):
+            row = rows.get(f"{SYNC_MONTH_SK}{month}")
+            if row is None:
+                raise ValueError(f"Missing sync history month {month}")
+            history.extend(self._decode_data(row, chunk_rows))
+        state["transactions"] = history
+        return state
+
+    def save_sync_state(self, user_id: str, state_dict: dict) -> None:
+        """
+        Persist Nessie sync state alongside the cached snapshot.
+
+        A state listing history_months has its purchase history stored as one
+        SYNC#nessie#MONTH# row per month, and only those months are rewritten
+        (months no longer in the history are deleted), so a sync writes what
+        it changed rather than the whole history. Other states are stored in
+        the head row.
+        """
+        pk = f"USER#{user_id}"
+        now = int(time.time())
+        if state_dict.get("history_months") is None:
+            self._put_data(pk, SYNC_SK, state_dict, {"updated_at": now})
+            return
+
+        by_month: dict[str, list[dict]] = {}
+        for txn in state_dict["transactions"]:
+            by_month.setdefault(txn["date"][:7], []).append(txn)
+        for month in state_dict["history_months"]:
+            if month in by_month:
+                self._put_data(pk, f"{SYNC_MONTH_SK}{month}", by_month[month], {"updated_at": now})
+
+        # Head row last: it names the months that make up the history
+        head = {k: v for k, v in state_dict.items() if k != "transactions"}
+        previous = self._put_data(
+            pk, SYNC_SK, head, {"updated_at": now, "months": sorted(by_month)}
+        )
+        for month in set((previous or {}).get("months", ())) - by_month.keys():
+            for row in list(self.iter_query(pk, sk_prefix=f"{SYNC_MONTH_SK}{month}")):
+                self.delete_item(pk, row["SK"])
+
+    # =========================================================================
+    # Monthly rollups
+    # =========================================================================
+
+    def save_rollups(self, user_id: str, rollups: list[dict]) -> None:
+        """Write per-month rollups (one ROLLUP#YYYY-MM item each)."""
+        now = int(time.time())
+        for rollup in rollups:
+            self.put_item({
+                "PK": f"USER#{user_id}",
+                "SK": f"ROLLUP#{rollup['month']}",
+                "data": json.dumps(rollup),
+                "updated_at": now,
+            })
+
+    def get_rollups(self, user_id: str, months: int = 6) -> list[dict]:
+        """Get the newest monthly rollups, most recent first."""
+        items = self.iter_query(
+            f"USER#{user_id}",
+            sk_prefix="ROLLUP#",
+            scan_index_forward=False,
+            page_size=months,
+        )
+        return [json.loads(item["data"]) for item in islice(items, months)]
+
+    # =========================================================================
+    # Specialist result cache
+    # =========================================================================
+
+    def get_specialist_result(self, user_id: str, key: str) -> dict | None:
+        """Get a cached specialist result unless its TTL has passed."""
+        item = self.get_item(f"USER#{user_id}", f"SPECIALIST#{key}")
+        # DynamoDB deletes expired rows lazily
+        if item and int(item.get("ttl", 0)) > int(time.time()):
             return json.loads(item["data"])
         return None
 
-    def cache_budget(self, user_id: str, budget_dict: dict) -> None:
-        """Cache budget report with 5-minute TTL."""
+    def save_specialist_result(
+        self, user_id: str, key: str, data: dict, ttl_seconds: int
+    ) -> None:
+        """Cache a specialist result for ttl_seconds."""
         self.put_item({
             "PK": f"USER#{user_id}",
-            "SK": "BUDGET#latest",
-            "data": json.dumps(budget_dict, default=str),
-            "ttl": int(time.time()) + CACHE_TTL_SECONDS,
+            "SK": f"SPECIALIST#{key}",
+            "data": json.dumps(data),
+            "ttl": int(time.time()) + ttl_seconds,
         })
 
+    # =========================================================================
+    # Incremental asteroid detector state
+    # =========================================================================
+
+    def get_detector_state(self, user_id: str) -> dict | None:
+        """Get persisted asteroid detector state (row signatures + asteroid set)."""
+        item = self.get_item(f"USER#{user_id}", "DETECTOR#asteroids")
+        if item and ("data" in item or "chunks" in item):
+            return self._decode_data(item)
+        return None
+
+    def save_detector_state(self, user_id: str, state_dict: dict) -> None:
+        """Persist asteroid detector state for the next refresh."""
+        self._put_data(
+            f"USER#{user_id}",
+            "DETECTOR#asteroids",
+            state_dict,
+            {"updated_at": int(time.time())},
+        )
+
     # =========================================================================
     # Asteroid state persistence
     # =========================================================================
@@ -83,11 +421,30 @@ class DataTableClient(DynamoDBClient):
             return json.loads(item["data"])
         return None
 
+    def iter_asteroid_states(
+        self, user_id: str, page_size: int | None = None
+    ) -> Iterator[dict]:
+        """Lazily iterate persisted asteroid action states, page by page."""
+        pk = f"USER#{user_id}"
+        items = self.iter_query(
+            pk,
+            sk_prefix="ASTEROID#",
+            page_size=page_size,
+            projection_expression="#d",
+            expression_attribute_names={"#d": "data"},
+        )
+        for item in items:
+            if "data" in item:
+                yield json.loads(item["data"])
+
     def get_all_asteroid_states(self, user_id: str) -> list[dict]:
         """Get all persisted asteroid action states for a user."""
-        pk = f"USER#{user_id}"
-        items = self.query(pk, sk_prefix="ASTEROID#")
-        return [json.loads(item["data"]) for item in items if "data" in item]
+        key = (user_id, "ASTEROID#")
+        states = self.l1.get(key)
+        if states is None:
+            states = list(self.iter_asteroid_states(user_id))
+            self.l1.set(key, states)
+        return states
 
     def save_asteroid_action(
         self, user_id: str, asteroid_id: str, action: str
@@ -102,6 +459,7 @@ class DataTableClient(DynamoDBClient):
                 "actioned_at": int(time.time()),
             }),
         })
+        self.l1.invalidate((user_id, "ASTEROID#"))
 
     # =========================================================================
     # VTC Preferences
@@ -109,12 +467,17 @@ class DataTableClient(DynamoDBClient):
 
     def get_vtc_preferences(self, user_id: str) -> dict | None:
         """Get VTC enforcement preferences."""
+        key = (user_id, "VTC_PREFS")
+        prefs = self.l1.get(key, _MISSING)
+        if prefs is not _MISSING:
+            return prefs
+
         pk = f"USER#{user_id}"
         sk = "VTC_PREFS"
         item = self.get_item(pk, sk)
-        if item and "data" in item:
-            return json.loads(item["data"])
-        return None
+        prefs = json.loads(item["data"]) if item and "data" in item else None
+        self.l1.set(key, prefs)
+        return prefs
 
     def save_vtc_preferences(self, user_id: str, prefs: dict) -> None:
         """Save VTC enforcement preferences."""
@@ -124,3 +487,75 @@ class DataTableClient(DynamoDBClient):
             "data": json.dumps(prefs),
             "updated_at": int(time.time()),
         })
+        self.l1.invalidate((user_id, "VTC_PREFS"))
+
+    # =========================================================================
+    # Dashboard bundle
+    # =========================================================================
+
+    def load_user_bundle(self, user_id: str) -> UserBundle:
+        """
+        Load snapshot, budget, VTC preferences and asteroid states together.
+
+        The fixed rows come from one BatchGetItem (plus one for the chunks
+        of fresh chunked heads) and asteroid states from an ASTEROID# Query,
+        so the partition's large rows (sync and detector state, rollups,
+        specialist results) are never read. Served from the L1 cache when
+        every dependency is still live there.
+        """
+        cached = self._bundle_from_l1(user_id)
+        if cached is not None:
+            return cached
+
+        pk = f"USER#{user_id}"
+        bundle = UserBundle(user_id=user_id)
+        rows = {
+            item["SK"]: item
+            for item in self.batch_get_items(
+                [(pk, sk) for sk in ("SNAPSHOT#latest", "BUDGET#latest", "VTC_PREFS")]
+            )
+        }
+        heads = {
+            sk: item for sk, item in rows.items()
+            if sk != "VTC_PREFS" and self._fresh_until(item) > int(time.time())
+        }
+        chunk_keys = [
+            (pk, chunk_sk)
+            for sk, item in heads.items()
+            for chunk_sk in self._chunk_keys(sk, item)
+        ]
+        chunk_rows = {
+            item["SK"]: item.get("data") for item in self.batch_get_items(chunk_keys)
+        } if chunk_keys else {}
+
+        fresh = {sk: self._fresh_data(item, chunk_rows) for sk, item in heads.items()}
+        for sk, data in fresh.items():
+            if data is not None:
+                self.l1.set((user_id, sk), data, expires_at=self._fresh_until(heads[sk]))
+        bundle.snapshot = fresh.get("SNAPSHOT#latest")
+        bundle.budget = fresh.get("BUDGET#latest")
+
+        prefs = rows.get("VTC_PREFS")
+        if prefs and "data" in prefs:
+            bundle.vtc_preferences = json.loads(prefs["data"])
+        bundle.asteroid_states = list(self.iter_asteroid_states(user_id))
+
+        self.l1.set((user_id, "VTC_PREFS"), bundle.vtc_preferences)
+        self.l1.set((user_id, "ASTEROID#"), bundle.asteroid_states)
+        return bundle
+
+    def _bundle_from_l1(self, user_id: str) -> UserBundle | None:
+        """Assemble a bundle from L1 entries, or None if any is missing."""
+        values = {
+            sk: self.l1.get((user_id, sk), _MISSING)
+            for sk in ("SNAPSHOT#latest", "BUDGET#latest", "VTC_PREFS", "ASTEROID#")
+        }
+        if any(value is _MISSING for value in values.values()):
+            return None
+        return UserBundle(
+            user_id=user_id,
+            snapshot=values["SNAPSHOT#latest"],
+            budget=values["BUDGET#latest"],
+            vtc_preferences=values["VTC_PREFS"],
+            asteroid_states=values["ASTEROID#"],
+        )
@@ -0,0 +1,17 @@
+from pydantic import BaseModel, Field
+
+
+class UserBundle(BaseModel):
+    """All cached dashboard rows for one user, loaded by targeted reads.
+
+    DynamoDB Schema (rows sharing PK "USER#<user_id>"):
+    - SK: "SNAPSHOT#latest" -> snapshot (None if missing or expired)
+    - SK: "BUDGET#latest" -> budget (None if missing or expired)
+    - SK: "VTC_PREFS" -> vtc_preferences
+    - SK: "ASTEROID#<id>" -> asteroid_states
+    """
+    user_id: str = Field(..., description="User the rows belong to")
+    snapshot: dict | None = Field(default=None, description="Cached FinancialSnapshot dict")
+    budget: dict | None = Field(default=None, description="Cached BudgetReport dict")
+    vtc_preferences: dict | None = Field(default=None, description="VTC enforcement preferences")
+    asteroid_states: list[dict] = Field(default_factory=list, description="Persisted asteroid action states")
@@ -0,0 +1,141 @@
+"""Tests for chunked and per-month payload storage in DataTableClient."""
+
+import pytest
+
+from database import data_table_client
+from database.data_table_client import CHUNK_MARKER, DataTableClient
+
+
+class FakeTable:
+    """In-memory stand-in for the boto3 Table and its BatchGetItem."""
+
+    def __init__(self):
+        self.items = {}
+        self.queries = 0
+        self.gets = 0
+
+    def put_item(self, Item, ReturnValues=None, **kwargs):
+        old = self.items.get((Item["PK"], Item["SK"]))
+        self.items[(Item["PK"], Item["SK"])] = dict(Item)
+        return {"Attributes": old} if ReturnValues == "ALL_OLD" and old else {}
+
+    def get_item(self, Key):
+        self.gets += 1
+        item = self.items.get((Key["PK"], Key["SK"]))
+        return {"Item": item} if item else {}
+
+    def delete_item(self, Key):
+        self.items.pop((Key["PK"], Key["SK"]), None)
+
+    def query(self, KeyConditionExpression, **kwargs):
+        self.queries += 1
+        return {"Items": [i for _, i in sorted(self.items.items()) if _matches(KeyConditionExpression, i)]}
+
+    def batch_get_item(self, RequestItems):
+        (table, request), = RequestItems.items()
+        keys = [(k["PK"], k["SK"]) for k in request["Keys"]]
+        return {"Responses": {table: [self.items[k] for k in keys if k in self.items]}}
+
+
+def _matches(condition, item):
+    expression = condition.get_expression()
+    values = expression["values"]
+    if expression["operator"] == "AND":
+        return all(_matches(c, item) for c in values)
+    if expression["operator"] == "begins_with":
+        return item.get(values[0].name, "").startswith(values[1])
+    return item.get(values[0].name) == values[1]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("USERS_TABLE_NAME", "users")
+    monkeypatch.setenv("AWS_REGION", "us-east-1")
+    monkeypatch.setattr(data_table_client, "MAX_CHUNK_BYTES", 64)
+    data_table_client._l1_cache.clear()
+    db = DataTableClient()
+    db.table = db.dynamodb = FakeTable()
+    return db
+
+
+def _chunk_rows(db):
+    return sorted(sk for _, sk in db.table.items if CHUNK_MARKER in sk)
+
+
+def _state(size):
+    return {"transactions": [f"purchase-{i:05d}" for i in range(size)]}
+
+
+def _history_state(months, changed):
+    transactions = [
+        {"id": f"{month}-{i}", "date": f"{month}-{28 - i:02d}T00:00:00Z"}
+        for month in sorted(months, reverse=True) for i in range(3)
+    ]
+    return {"accounts": {}, "transactions": transactions, "history_months": changed}
+
+
+def test_chunked_round_trip(client):
+    client.save_sync_state("u1", _state(200))
+    head = client.table.items[("USER#u1", "SYNC#nessie")]
+    assert head["chunks"] > 1 and "data" not in head
+    assert len(_chunk_rows(client)) == head["chunks"]
+    assert client.get_sync_state("u1") == _state(200)
+
+def test_rewrite_prunes_replaced_chunks_without_reads(client):
+    client.save_sync_state("u1", _state(200))
+    first = _chunk_rows(client)
+    client.save_sync_state("u1", _state(300))
+    second = _chunk_rows(client)
+    assert not set(first) & set(second)
+    assert client.table.queries == 0 and client.table.gets == 0
+    assert client.get_sync_state("u1") == _state(300)
+
+    # Shrinking below the chunk size leaves no chunk rows behind
+    client.save_sync_state("u1", _state(1))
+    assert _chunk_rows(client) == []
+    assert client.get_sync_state("u1") == _state(1)
+
+def test_chunks_of_another_write_are_ignored(client):
+    client.save_sync_state("u1", _state(200))
+    head = client.table.items[("USER#u1", "SYNC#nessie")]
+    # Chunk rows of an unfinished write sort before and after the live set
+    for write_id in ("000000000000", "ffffffffffff"):
+        for n in range(head["chunks"] + 1):
+            sk = f"SYNC#nessie{CHUNK_MARKER}{write_id}#{n:04d}"
+            client.table.items[("USER#u1", sk)] = {"PK": "USER#u1", "SK": sk, "data": b"\x01junk"}
+    assert client.get_sync_state("u1") == _state(200)
+
+def test_legacy_json_row_decodes(client):
+    client.table.items[("USER#u1", "SYNC#nessie")] = {
+        "PK": "USER#u1", "SK": "SYNC#nessie", "data": '{"transactions": ["legacy"]}'
+    }
+    assert client.get_sync_state("u1") == {"transactions": ["legacy"]}
+
+def test_bundle_reads_chunked_snapshot(client):
+    snapshot = {"recent_transactions": [f"t{i}" for i in range(100)]}
+    client.cache_snapshot("u1", snapshot)
+    client.save_sync_state("u1", _state(200))
+    client.l1.clear()
+    bundle = client.load_user_bundle("u1")
+    assert bundle.snapshot == snapshot
+    # Only the ASTEROID# rows are queried; sync state chunks are never read
+    assert client.table.queries == 1
+
+def test_sync_history_rewrites_only_changed_months(client):
+    months = ["2025-12", "2026-01", "2026-02", "2026-03"]
+    client.save_sync_state("u1", _history_state(months, months))
+    assert client.get_sync_state("u1") == _history_state(months, months)
+
+    writes = []
+    put_item = client.table.put_item
+    def recording_put(Item, **kwargs):
+        writes.append(Item["SK"])
+        return put_item(Item=Item, **kwargs)
+    client.table.put_item = recording_put
+
+    # December aged out and March changed; January and February are untouched
+    state = _history_state(months[1:], ["2025-12", "2026-03"])
+    client.save_sync_state("u1", state)
+    assert not any("2026-01" in sk or "2026-02" in sk for sk in writes)
+    assert not any("2025-12" in sk for _, sk in client.table.items)
+    assert client.get_sync_state("u1") == state
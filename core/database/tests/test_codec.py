@@ -0,0 +1,28 @@
+"""Tests for the payload codecs."""
+
+import json
+
+import pytest
+
+from database import codec
+
+PAYLOAD = {"accounts": [{"id": "a1", "balance": -12.5}], "note": "café", "count": 3}
+
+
+def test_round_trip():
+    blob = codec.encode(PAYLOAD)
+    assert blob[0] == codec.DEFAULT_CODEC.version
+    assert codec.decode(blob) == PAYLOAD
+    # boto3 hands Binary attributes back wrapped; anything bytes() accepts works
+    assert codec.decode(bytearray(blob)) == PAYLOAD
+
+def test_legacy_json_string_decodes():
+    assert codec.decode(json.dumps(PAYLOAD)) == PAYLOAD
+
+def test_bad_payloads_rejected():
+    with pytest.raises(ValueError, match="empty"):
+        codec.decode(b"")
+    with pytest.raises(ValueError, match="Unknown codec version"):
+        codec.decode(b"\xff{}")
+    with pytest.raises(ValueError):
+        codec.register_codec(codec.Codec(version=0, encode=bytes, decode=bytes))
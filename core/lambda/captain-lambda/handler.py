@@ -5,6 +5,7 @@ Routes:
 - GET  /api/captain/health                           - Health check
 - POST /api/captain/query                            - Legacy conversational agent
 - POST /api/captain/complete-analysis                - Full 7-specialist analysis
+- POST /api/captain/complete-analysis/stream         - Same, as NDJSON events per specialist
 - POST /api/captain/specialists/financial-meaning     - Bridge briefing
 - POST /api/captain/specialists/subscriptions         - Wasteful subscriptions
 - POST /api/captain/specialists/budget-overruns       - Budget overruns
@@ -15,6 +16,7 @@ Routes:
 """
 
 import asyncio
+import os
 from typing import Any
 
 from aws_lambda_powertools import Logger, Tracer
@@ -27,7 +29,11 @@ from agent import QueryRequest, run_captain_nova
 from agent.models import SpecialistDeps
 from agent.orchestrator import (
     analyze_finances,
+    build_slice,
     fetch_all_financial_data,
+    format_event,
+    request_deadline,
+    stream_analysis,
     slice_financial_meaning,
     slice_wasteful_subscriptions,
     slice_budget_overruns,
@@ -43,6 +49,7 @@ from agent.orchestrator import (
     MR_FALLBACK,
     FD_FALLBACK,
 )
+from agent.specialists import cache as specialist_cache
 from agent.specialists import (
     financial_meaning_agent,
     wasteful_subscriptions_agent,
@@ -58,6 +65,24 @@ logger = Logger(service="CaptainNovaHandler")
 tracer = Tracer()
 app = APIGatewayRestResolver()
 
+# Persistent tier of the specialist result cache
+if os.environ.get("USERS_TABLE_NAME"):
+    try:
+        from database.data_table_client import DataTableClient
+        specialist_cache.configure_store(DataTableClient())
+    except Exception as e:
+        logger.warning("Specialist result store unavailable", error=str(e))
+
+# One event loop per container, so the orchestrator's pooled Nessie client
+# (bound to its loop) is reused across warm invocations
+_loop = asyncio.new_event_loop()
+
+
+def _run(coro):
+    """Run a coroutine to completion on the container's event loop."""
+    return _loop.run_until_complete(coro)
+
+
 # ---------------------------------------------------------------------------
 # Specialist registry: name -> (agent, slice_fn, fallback)
 # ---------------------------------------------------------------------------
@@ -73,11 +98,12 @@ SPECIALIST_REGISTRY = {
 
 
 async def _run_single_specialist_async(name: str, user_id: str = "demo_user"):
-    """Fetch data, slice for the named specialist, and run it."""
+    """Fetch data, slice for the named specialist, and run it within the invocation's budget."""
+    deadline = request_deadline(_analysis_budget())
     agent, slice_fn, fallback = SPECIALIST_REGISTRY[name]
-    data = await fetch_all_financial_data(user_id)
-    deps = SpecialistDeps(user_id=user_id, financial_data=slice_fn(data))
-    return await safe_run_specialist(agent, deps, fallback)
+    data = await fetch_all_financial_data(user_id, deadline)
+    deps = SpecialistDeps(user_id=user_id, financial_data=await build_slice(slice_fn, data))
+    return await safe_run_specialist(agent, deps, fallback, deadline=deadline)
 
 
 def _error_response(status_code: int, message: str) -> Response:
@@ -114,7 +140,7 @@ def captain_query() -> Response:
         body = app.current_event.json_body
         request = QueryRequest(**body)
         logger.info(f"Query type: {request.type}, message_len: {len(request.message) if request.message else 0}")
-        response = asyncio.run(run_captain_nova(request))
+        response = _run(run_captain_nova(request))
         logger.info(f"Response tools used: {response.tools_used}")
         return Response(status_code=200, body=response.model_dump(), content_type="application/json")
     except ValidationError as ve:
@@ -137,13 +163,25 @@ def captain_query() -> Response:
 # Complete multi-agent analysis
 # ---------------------------------------------------------------------------
 
+# API Gateway REST integrations give up after 29 s regardless of the Lambda timeout
+API_GATEWAY_TIMEOUT_S = 29.0
+# Time kept back to run VTC enforcement, serialize and respond
+RESPONSE_MARGIN_S = 3.0
+
+
+def _analysis_budget() -> float:
+    """Analysis budget from the invocation's remaining time."""
+    remaining_s = app.lambda_context.get_remaining_time_in_millis() / 1000
+    return max(0.0, min(remaining_s, API_GATEWAY_TIMEOUT_S) - RESPONSE_MARGIN_S)
+
+
 @app.post("/api/captain/complete-analysis")
 @tracer.capture_method
 def complete_analysis() -> Response:
     """Run all 7 specialists in parallel and return combined CaptainAnalysis."""
     logger.info("Complete analysis endpoint called")
     try:
-        result = asyncio.run(analyze_finances("demo_user"))
+        result = _run(analyze_finances("demo_user", budget_s=_analysis_budget()))
         return Response(
             status_code=200,
             body=result.model_dump(mode="json"),
@@ -154,6 +192,30 @@ def complete_analysis() -> Response:
         return _error_response(500, "Complete analysis failed. Please try again, Commander.")
 
 
+async def _collect_events(user_id: str, budget_s: float) -> str:
+    return "".join([
+        format_event(event) async for event in stream_analysis(user_id, budget_s=budget_s)
+    ])
+
+
+@app.post("/api/captain/complete-analysis/stream")
+@tracer.capture_method
+def complete_analysis_stream() -> Response:
+    """Full analysis as NDJSON events in specialist completion order.
+
+    The Python Lambda runtime cannot stream a response body through API
+    Gateway, so the events are returned in one body; the format matches
+    the local server, which streams them as each specialist finishes.
+    """
+    logger.info("Complete analysis stream endpoint called")
+    try:
+        body = _run(_collect_events("demo_user", _analysis_budget()))
+        return Response(status_code=200, body=body, content_type="application/x-ndjson")
+    except Exception as e:
+        logger.exception(f"Error in complete analysis stream: {e}")
+        return _error_response(500, "Complete analysis failed. Please try again, Commander.")
+
+
 # ---------------------------------------------------------------------------
 # Individual specialist endpoints
 # ---------------------------------------------------------------------------
@@ -164,7 +226,7 @@ def specialist_financial_meaning() -> Response:
     """Run Financial Meaning (bridge briefing) specialist."""
     logger.info("Specialist endpoint called", specialist="financial-meaning")
     try:
-        result = asyncio.run(_run_single_specialist_async("financial-meaning"))
+        result = _run(_run_single_specialist_async("financial-meaning"))
         return Response(status_code=200, body=result.model_dump(mode="json"), content_type="application/json")
     except Exception as e:
         logger.exception(f"Error in financial-meaning specialist: {e}")
@@ -177,7 +239,7 @@ def specialist_subscriptions() -> Response:
     """Run Wasteful Subscriptions (asteroid) specialist."""
     logger.info("Specialist endpoint called", specialist="subscriptions")
     try:
-        result = asyncio.run(_run_single_specialist_async("subscriptions"))
+        result = _run(_run_single_specialist_async("subscriptions"))
         return Response(status_code=200, body=result.model_dump(mode="json"), content_type="application/json")
     except Exception as e:
         logger.exception(f"Error in subscriptions specialist: {e}")
@@ -190,7 +252,7 @@ def specialist_budget_overruns() -> Response:
     """Run Budget Overruns (ion storm) specialist."""
     logger.info("Specialist endpoint called", specialist="budget-overruns")
     try:
-        result = asyncio.run(_run_single_specialist_async("budget-overruns"))
+        result = _run(_run_single_specialist_async("budget-overruns"))
         return Response(status_code=200, body=result.model_dump(mode="json"), content_type="application/json")
     except Exception as e:
         logger.exception(f"Error in budget-overruns specialist: {e}")
@@ -203,7 +265,7 @@ def specialist_upcoming_bills() -> Response:
     """Run Upcoming Bills (solar flare) specialist."""
     logger.info("Specialist endpoint called", specialist="upcoming-bills")
     try:
-        result = asyncio.run(_run_single_specialist_async("upcoming-bills"))
+        result = _run(_run_single_specialist_async("upcoming-bills"))
         return Response(status_code=200, body=result.model_dump(mode="json"), content_type="application/json")
     except Exception as e:
         logger.exception(f"Error in upcoming-bills specialist: {e}")
@@ -216,7 +278,7 @@ def specialist_debt_spirals() -> Response:
     """Run Debt Spirals (black hole) specialist."""
     logger.info("Specialist endpoint called", specialist="debt-spirals")
     try:
-        result = asyncio.run(_run_single_specialist_async("debt-spirals"))
+        result = _run(_run_single_specialist_async("debt-spirals"))
         return Response(status_code=200, body=result.model_dump(mode="json"), content_type="application/json")
     except Exception as e:
         logger.exception(f"Error in debt-spirals specialist: {e}")
@@ -229,7 +291,7 @@ def specialist_missed_rewards() -> Response:
     """Run Missed Rewards (wormhole) specialist."""
     logger.info("Specialist endpoint called", specialist="missed-rewards")
     try:
-        result = asyncio.run(_run_single_specialist_async("missed-rewards"))
+        result = _run(_run_single_specialist_async("missed-rewards"))
         return Response(status_code=200, body=result.model_dump(mode="json"), content_type="application/json")
     except Exception as e:
         logger.exception(f"Error in missed-rewards specialist: {e}")
@@ -242,7 +304,7 @@ def specialist_fraud_detection() -> Response:
     """Run Fraud Detection (enemy cruiser) specialist."""
     logger.info("Specialist endpoint called", specialist="fraud-detection")
     try:
-        result = asyncio.run(_run_single_specialist_async("fraud-detection"))
+        result = _run(_run_single_specialist_async("fraud-detection"))
         return Response(status_code=200, body=result.model_dump(mode="json"), content_type="application/json")
     except Exception as e:
         logger.exception(f"Error in fraud-detection specialist: {e}")
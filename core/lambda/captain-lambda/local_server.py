@@ -9,6 +9,7 @@ Routes (same as Lambda):
 - GET  /api/captain/health                           - Health check
 - POST /api/captain/query                            - Legacy conversational agent
 - POST /api/captain/complete-analysis                - Full 7-specialist analysis
+- POST /api/captain/complete-analysis/stream         - Same, streamed per specialist (NDJSON or SSE)
 - POST /api/captain/specialists/financial-meaning     - Bridge briefing
 - POST /api/captain/specialists/subscriptions         - Wasteful subscriptions
 - POST /api/captain/specialists/budget-overruns       - Budget overruns
@@ -19,9 +20,12 @@ Routes (same as Lambda):
 """
 
 import logging
+import os
+from contextlib import asynccontextmanager
 from typing import Any
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import ValidationError
 
@@ -29,7 +33,12 @@ from agent import QueryRequest, run_captain_nova
 from agent.models import SpecialistDeps
 from agent.orchestrator import (
     analyze_finances,
+    build_slice,
+    close_nessie_client,
     fetch_all_financial_data,
+    format_event,
+    request_deadline,
+    stream_analysis,
     slice_financial_meaning,
     slice_wasteful_subscriptions,
     slice_budget_overruns,
@@ -45,6 +54,7 @@ from agent.orchestrator import (
     MR_FALLBACK,
     FD_FALLBACK,
 )
+from agent.specialists import cache as specialist_cache
 from agent.specialists import (
     financial_meaning_agent,
     wasteful_subscriptions_agent,
@@ -59,7 +69,23 @@ from agent.specialists import (
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("CaptainNovaLocal")
 
-app = FastAPI(title="Captain Nova Local Dev", version="1.0.0")
+# Persistent tier of the specialist result cache
+if os.environ.get("USERS_TABLE_NAME"):
+    try:
+        from database.data_table_client import DataTableClient
+        specialist_cache.configure_store(DataTableClient())
+    except Exception as e:
+        logger.warning(f"Specialist result store unavailable: {e}")
+
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await close_nessie_client()
+
+
+app = FastAPI(title="Captain Nova Local Dev", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -84,11 +110,12 @@ SPECIALIST_REGISTRY = {
 
 
 async def _run_single_specialist_async(name: str, user_id: str = "demo_user"):
-    """Fetch data, slice for the named specialist, and run it."""
+    """Fetch data, slice for the named specialist, and run it within ANALYSIS_BUDGET_S."""
+    deadline = request_deadline()
     agent, slice_fn, fallback = SPECIALIST_REGISTRY[name]
-    data = await fetch_all_financial_data(user_id)
-    deps = SpecialistDeps(user_id=user_id, financial_data=slice_fn(data))
-    return await safe_run_specialist(agent, deps, fallback)
+    data = await fetch_all_financial_data(user_id, deadline)
+    deps = SpecialistDeps(user_id=user_id, financial_data=await build_slice(slice_fn, data))
+    return await safe_run_specialist(agent, deps, fallback, deadline=deadline)
 
 
 # ---------------------------------------------------------------------------
@@ -145,6 +172,33 @@ async def complete_analysis() -> dict[str, Any]:
         raise HTTPException(status_code=500, detail="Complete analysis failed. Please try again, Commander.")
 
 
+@app.post("/api/captain/complete-analysis/stream")
+async def complete_analysis_stream(request: Request) -> StreamingResponse:
+    """Stream each specialist's result as it finishes, then the combined analysis.
+
+    Responds with Server-Sent Events when the client accepts
+    text/event-stream, NDJSON otherwise.
+    """
+    logger.info("Complete analysis stream endpoint called")
+    sse = "text/event-stream" in request.headers.get("accept", "")
+
+    async def events():
+        try:
+            async for event in stream_analysis("demo_user"):
+                yield format_event(event, sse=sse)
+        except Exception as e:
+            logger.exception(f"Error in complete analysis stream: {e}")
+            yield format_event(
+                {"type": "error", "message": "Complete analysis failed. Please try again, Commander."},
+                sse=sse,
+            )
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+    )
+
+
 # ---------------------------------------------------------------------------
 # Individual specialist endpoints
 # ---------------------------------------------------------------------------
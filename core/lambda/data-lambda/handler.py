@@ -5,21 +5,36 @@ Routes:
 - GET  /api/health       - Health check (no auth)
 - GET  /api/snapshot      - Financial snapshot (Cognito auth)
 - GET  /api/budget        - Budget report (Cognito auth)
-- GET  /api/asteroids     - Financial threats (Cognito auth)
+- GET  /api/asteroids     - Financial threats; ?since=<version> for changes only (Cognito auth)
 - POST /api/asteroids/<id>/action - Take action on asteroid (Cognito auth)
 - GET  /api/transactions  - Transaction list (Cognito auth)
+- GET  /api/dashboard     - Snapshot, budget and asteroids in one call (Cognito auth)
 - GET  /api/report/summary - 6-month financial summary (Cognito auth)
 
 Supports mock mode (DATA_SOURCE=mock) and live Nessie mode (DATA_SOURCE=nessie).
+
+In Nessie mode a stale cached snapshot is served immediately while a refresh
+runs in the background: an async self-invoke with {"action": "refresh_snapshot"}
+when deployed, or a worker thread when run outside Lambda. A per-user lock
+keeps concurrent requests from triggering duplicate refreshes.
+
+/api/asteroids runs the incremental detector: its state is persisted per
+user (in DynamoDB, or in-process in mock mode) and each call re-runs rules
+only over what changed since the previous call. A Nessie sync hands the
+detector its delta straight away, so the next poll finds it up to date.
 """
 
+import asyncio
+import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 from aws_lambda_powertools import Logger, Tracer
 from aws_lambda_powertools.event_handler import APIGatewayRestResolver, CORSConfig
 from aws_lambda_powertools.logging import correlation_paths
 from aws_lambda_powertools.utilities.typing import LambdaContext
+from shared.ttl_cache import TTLCache
 
 logger = Logger(service="DataLambdaHandler")
 tracer = Tracer()
@@ -31,7 +46,18 @@ DATA_SOURCE = os.getenv("DATA_SOURCE", "mock")
 
 # Lazy-initialized clients
 _data_table_client = None
-_nessie_service = None
+
+# Per-invocation data context, reset by lambda_handler
+_request_context = None
+
+# Background refreshes outside Lambda (Lambda freezes threads after returning)
+_refresh_executor = None
+_lambda_client = None
+
+SNAPSHOT_REFRESH_LOCK = "snapshot"
+
+# Detector state per user when there is no table to persist it (mock mode)
+_local_detector_states = TTLCache(max_entries=256, ttl_seconds=3600)
 
 
 def _get_data_table_client():
@@ -42,13 +68,117 @@ def _get_data_table_client():
     return _data_table_client
 
 
-def _get_nessie_service():
-    global _nessie_service
-    if _nessie_service is None:
-        from shared.nessie_service import NessieService
-        api_key = os.getenv("NESSIE_API_KEY", "")
-        _nessie_service = NessieService(api_key=api_key)
-    return _nessie_service
+async def _fetch_nessie_snapshot(state, days: int = 90):
+    """Incrementally sync a snapshot from Nessie, fetching accounts concurrently.
+
+    The async client is scoped to this call because each invocation runs
+    its own event loop via asyncio.run().
+    """
+    from shared.nessie_service import AsyncNessieService
+    api_key = os.getenv("NESSIE_API_KEY", "")
+    async with AsyncNessieService(api_key=api_key) as nessie:
+        return await nessie.sync_snapshot(state, days=days)
+
+
+def _save_rollups(db, user_id: str, state) -> None:
+    """Rewrite the monthly rollups (ROLLUP#YYYY-MM) a sync touched."""
+    from shared.frame import TransactionFrame
+    from shared.rollups import build_rollups
+
+    if not state.rollup_months:
+        return
+    rollups = build_rollups(TransactionFrame(state.transactions), state.rollup_months)
+    db.save_rollups(user_id, [r.model_dump(mode="json") for r in rollups])
+
+
+def _sync_nessie_snapshot(user_id: str, days: int = 90):
+    """Merge new Nessie purchases into the user's stored history.
+
+    Only purchases past each account's high-water mark are normalized;
+    the updated marks and history are persisted for the next refresh.
+    Returns the snapshot and its budget, taken from the sync state's
+    incremental budget aggregates.
+    """
+    from shared.nessie_service import NessieSyncState
+
+    db = _get_data_table_client()
+    state = None
+    try:
+        state_dict = db.get_sync_state(user_id)
+        if state_dict:
+            state = NessieSyncState.model_validate(state_dict)
+    except Exception as e:
+        logger.warning("Failed to load Nessie sync state, doing full sync", error=str(e))
+
+    snapshot, new_state = asyncio.run(_fetch_nessie_snapshot(state, days=days))
+
+    try:
+        db.save_sync_state(user_id, new_state.model_dump(mode="json"))
+    except Exception as e:
+        logger.warning("Failed to persist Nessie sync state", error=str(e))
+
+    try:
+        _save_rollups(db, user_id, new_state)
+    except Exception as e:
+        logger.warning("Failed to persist monthly rollups", error=str(e))
+
+    budget = new_state.budget.report(snapshot)
+    try:
+        _refresh_detector(user_id, snapshot, budget, new_state.delta)
+    except Exception as e:
+        logger.warning("Failed to refresh asteroid detector", error=str(e))
+
+    return snapshot, budget
+
+
+def _refresh_snapshot(user_id: str) -> bool:
+    """Re-sync the snapshot from Nessie and rewrite the snapshot/budget cache.
+
+    Runs with the user's refresh lock held and always releases it.
+    """
+    db = _get_data_table_client()
+    try:
+        snapshot, budget = _sync_nessie_snapshot(user_id)
+        db.cache_snapshot(user_id, snapshot.model_dump(mode="json"))
+        db.cache_budget(user_id, budget.model_dump(mode="json"))
+        logger.info("Refreshed stale snapshot", user_id=user_id)
+        return True
+    except Exception as e:
+        logger.warning("Background snapshot refresh failed", user_id=user_id, error=str(e))
+        return False
+    finally:
+        db.release_refresh_lock(user_id, SNAPSHOT_REFRESH_LOCK)
+
+
+def _schedule_snapshot_refresh(user_id: str) -> None:
+    """Start a background refresh unless one is already running for the user."""
+    global _refresh_executor, _lambda_client
+
+    db = _get_data_table_client()
+    if not db.acquire_refresh_lock(user_id, SNAPSHOT_REFRESH_LOCK):
+        logger.info("Snapshot refresh already in progress", user_id=user_id)
+        return
+
+    function_name = os.getenv("AWS_LAMBDA_FUNCTION_NAME")
+    try:
+        if function_name:
+            if _lambda_client is None:
+                import boto3
+                _lambda_client = boto3.client("lambda")
+            _lambda_client.invoke(
+                FunctionName=function_name,
+                InvocationType="Event",
+                Payload=json.dumps({"action": "refresh_snapshot", "user_id": user_id}),
+            )
+        else:
+            if _refresh_executor is None:
+                _refresh_executor = ThreadPoolExecutor(
+                    max_workers=2, thread_name_prefix="snapshot-refresh"
+                )
+            _refresh_executor.submit(_refresh_snapshot, user_id)
+    except Exception as e:
+        logger.warning("Failed to schedule snapshot refresh", error=str(e))
+        db.release_refresh_lock(user_id, SNAPSHOT_REFRESH_LOCK)
 
 
 def _get_user_id() -> str:
@@ -64,37 +194,52 @@ def _get_user_id() -> str:
     return "demo_user"
 
 
-def _get_snapshot_data() -> dict:
+def _load_snapshot_dict(ctx) -> dict:
     """Get financial snapshot, using cache or computing fresh."""
-    user_id = _get_user_id()
+    user_id = ctx.user_id
 
     if DATA_SOURCE == "nessie":
-        # Check cache first
+        # Check cache first; stale rows are served while a refresh runs
         db = _get_data_table_client()
-        cached = db.get_cached_snapshot(user_id)
+        cached, is_stale = db.get_snapshot_allow_stale(user_id)
         if cached:
-            logger.info("Returning cached snapshot", user_id=user_id)
+            if is_stale:
+                logger.info("Returning stale snapshot", user_id=user_id)
+                _schedule_snapshot_refresh(user_id)
+            else:
+                logger.info("Returning cached snapshot", user_id=user_id)
             return cached
 
         # Fetch fresh from Nessie
         try:
-            from shared.nessie_service import NessieApiError
-            nessie = _get_nessie_service()
-            snapshot = nessie.build_snapshot()
+            snapshot, budget = _sync_nessie_snapshot(user_id)
             snapshot_dict = snapshot.model_dump(mode="json")
             db.cache_snapshot(user_id, snapshot_dict)
+            db.cache_budget(user_id, budget.model_dump(mode="json"))
+            ctx.prime("snapshot", snapshot)
+            ctx.prime("budget", budget)
             return snapshot_dict
         except Exception as e:
             logger.warning("Nessie API failed, falling back to mock", error=str(e))
 
     # Mock mode or Nessie fallback
     from shared.mocks import get_mock_snapshot
-    return get_mock_snapshot().model_dump(mode="json")
+    snapshot = get_mock_snapshot()
+    ctx.prime("snapshot", snapshot)
+    return snapshot.model_dump(mode="json")
 
 
-def _get_budget_data() -> dict:
+def _load_snapshot(ctx):
+    """Parse the snapshot dict once per request."""
+    from shared.models import FinancialSnapshot
+    snapshot_dict = ctx.snapshot_dict
+    # A fresh fetch primes the parsed model while loading the dict
+    return ctx.peek("snapshot") or FinancialSnapshot.model_validate(snapshot_dict)
+
+
+def _load_budget_dict(ctx) -> dict:
     """Get budget report, using cache or computing fresh."""
-    user_id = _get_user_id()
+    user_id = ctx.user_id
 
     if DATA_SOURCE == "nessie":
         db = _get_data_table_client()
@@ -104,13 +249,11 @@ def _get_budget_data() -> dict:
             return cached
 
     # Compute from snapshot
-    from shared.models import FinancialSnapshot
     from shared.budget_engine import calculate
 
-    snapshot_dict = _get_snapshot_data()
-    snapshot = FinancialSnapshot.model_validate(snapshot_dict)
-    budget = calculate(snapshot)
+    budget = calculate(ctx.snapshot, frame=ctx.frame)
     budget_dict = budget.model_dump(mode="json")
+    ctx.prime("budget", budget)
 
     if DATA_SOURCE == "nessie":
         db = _get_data_table_client()
@@ -119,6 +262,127 @@ def _get_budget_data() -> dict:
     return budget_dict
 
 
+def _load_budget(ctx):
+    """Parse the budget dict once per request."""
+    from shared.models import BudgetReport
+    budget_dict = ctx.budget_dict
+    return ctx.peek("budget") or BudgetReport.model_validate(budget_dict)
+
+
+def _load_asteroid_states(ctx) -> list[dict]:
+    """Get persisted asteroid action states (Nessie mode only)."""
+    if DATA_SOURCE != "nessie":
+        return []
+    try:
+        return _get_data_table_client().get_all_asteroid_states(ctx.user_id)
+    except Exception as e:
+        logger.warning("Failed to load asteroid states", error=str(e))
+        return []
+
+
+def _read_detector_state(user_id: str):
+    """Get the user's incremental asteroid detector state, or a fresh one."""
+    from services.incremental_detector import DetectorState
+
+    if DATA_SOURCE != "nessie":
+        return _local_detector_states.get(user_id) or DetectorState()
+    try:
+        state_dict = _get_data_table_client().get_detector_state(user_id)
+        if state_dict:
+            return DetectorState.model_validate(state_dict)
+    except Exception as e:
+        logger.warning("Failed to load detector state, detecting from scratch", error=str(e))
+    return DetectorState()
+
+
+def _load_detector_state(ctx):
+    return _read_detector_state(ctx.user_id)
+
+
+def _save_detector_state(user_id: str, state) -> None:
+    if DATA_SOURCE != "nessie":
+        _local_detector_states.set(user_id, state)
+        return
+    try:
+        _get_data_table_client().save_detector_state(user_id, state.model_dump(mode="json"))
+    except Exception as e:
+        logger.warning("Failed to persist detector state", error=str(e))
+
+
+def _refresh_detector(user_id: str, snapshot, budget, delta) -> None:
+    """Fold a sync's window delta into the user's detector state."""
+    state = _read_detector_state(user_id)
+    diff, rules = state.refresh(snapshot, budget, delta=delta)
+    _save_detector_state(user_id, state)
+    logger.info(
+        "Refreshed asteroid detector from sync",
+        user_id=user_id,
+        rules_ran=sum(r["status"] == "ran" for r in rules.values()),
+        asteroids_changed=len(diff.added) + len(diff.updated) + len(diff.resolved),
+    )
+
+
+def _load_frame(ctx):
+    """Build the columnar transaction view once per request."""
+    from shared.frame import TransactionFrame
+    return TransactionFrame.from_snapshot(ctx.snapshot)
+
+
+_DATA_LOADERS = {
+    "snapshot_dict": _load_snapshot_dict,
+    "snapshot": _load_snapshot,
+    "budget_dict": _load_budget_dict,
+    "budget": _load_budget,
+    "frame": _load_frame,
+    "asteroid_states": _load_asteroid_states,
+    "detector_state": _load_detector_state,
+}
+
+
+def _get_context():
+    """Return the data context for the current invocation."""
+    global _request_context
+    if _request_context is None:
+        from services.request_context import RequestDataContext
+        _request_context = RequestDataContext(_get_user_id(), _DATA_LOADERS)
+    return _request_context
+
+
+def _merge_action_states(ctx, asteroids) -> list[dict]:
+    """Serialize asteroids with their persisted action states."""
+    asteroid_list = [a.model_dump(mode="json") for a in asteroids]
+    state_map = {s["asteroid_id"]: s for s in ctx.asteroid_states}
+    for asteroid in asteroid_list:
+        state = state_map.get(asteroid["id"])
+        if state:
+            asteroid["user_action"] = state["action"]
+            asteroid["actioned_at"] = state["actioned_at"]
+    return asteroid_list
+
+
+def _build_asteroid_list(ctx, max_cost: str = "expensive") -> tuple[list[dict], dict]:
+    """Detect asteroids and merge persisted action states.
+
+    Returns the asteroid list and per-rule status/latency metadata.
+    """
+    from services.asteroid_detector import run_rules
+
+    result = run_rules(
+        ctx.snapshot, ctx.budget, frame=ctx.frame, cache_key=ctx.user_id, max_cost=max_cost
+    )
+    return _merge_action_states(ctx, result.asteroids), result.rules
+
+
+def _get_snapshot_data() -> dict:
+    """Get financial snapshot for the current request."""
+    return _get_context().snapshot_dict
+
+
+def _get_budget_data() -> dict:
+    """Get budget report for the current request."""
+    return _get_context().budget_dict
+
+
 # =============================================================================
 # Routes
 # =============================================================================
@@ -150,37 +414,35 @@ def get_budget() -> dict[str, Any]:
 @app.get("/api/asteroids")
 @tracer.capture_method
 def get_asteroids() -> dict[str, Any]:
-    """Return financial threats (asteroids) for the authenticated user."""
-    logger.info("Asteroids endpoint called", user_id=_get_user_id())
-
-    from shared.models import BudgetReport, FinancialSnapshot
-    from services.asteroid_detector import detect
-
-    snapshot_dict = _get_snapshot_data()
-    budget_dict = _get_budget_data()
+    """Return financial threats (asteroids) for the authenticated user.
 
-    snapshot = FinancialSnapshot.model_validate(snapshot_dict)
-    budget = BudgetReport.model_validate(budget_dict)
-
-    asteroids = detect(snapshot, budget)
-    asteroid_list = [a.model_dump(mode="json") for a in asteroids]
+    Refreshes the user's incremental detector state. With ?since=<version>
+    from a previous response, returns only the changes when the client is
+    at most one version behind; otherwise the full asteroid list.
+    """
+    ctx = _get_context()
+    logger.info("Asteroids endpoint called", user_id=ctx.user_id)
 
-    # Merge with persisted action states
-    user_id = _get_user_id()
-    if DATA_SOURCE == "nessie":
-        try:
-            db = _get_data_table_client()
-            states = db.get_all_asteroid_states(user_id)
-            state_map = {s["asteroid_id"]: s for s in states}
-            for asteroid in asteroid_list:
-                state = state_map.get(asteroid["id"])
-                if state:
-                    asteroid["user_action"] = state["action"]
-                    asteroid["actioned_at"] = state["actioned_at"]
-        except Exception as e:
-            logger.warning("Failed to load asteroid states", error=str(e))
+    # Load the snapshot first: a sync it triggers refreshes the stored state
+    snapshot, budget = ctx.snapshot, ctx.budget
+    state = ctx.get("detector_state")
+    diff, rules = state.refresh(snapshot, budget, frame=ctx.frame)
+    if any(r["status"] == "ran" for r in rules.values()):
+        _save_detector_state(ctx.user_id, state)
 
-    return {"asteroids": asteroid_list}
+    response: dict[str, Any] = {"version": state.version, "meta": {"rules": rules}}
+    params = app.current_event.query_string_parameters or {}
+    since = params.get("since")
+    if since is not None and since.isdigit() and int(since) in (state.version - 1, state.version):
+        changes = state.last_diff if int(since) < state.version else diff
+        response["changes"] = {
+            "added": _merge_action_states(ctx, changes.added),
+            "updated": _merge_action_states(ctx, changes.updated),
+            "resolved": changes.resolved,
+        }
+    else:
+        response["asteroids"] = _merge_action_states(ctx, state.current())
+    return response
 
 
 @app.post("/api/asteroids/<asteroid_id>/action")
@@ -229,6 +491,42 @@ def get_transactions() -> dict[str, Any]:
     return {"transactions": transactions, "count": len(transactions)}
 
 
+@app.get("/api/dashboard")
+@tracer.capture_method
+def get_dashboard() -> dict[str, Any]:
+    """Return snapshot, budget, asteroids and VTC preferences in one call.
+
+    In Nessie mode all cached rows are read with a single DynamoDB Query and
+    primed into the request context; only missing or expired rows fall back
+    to the regular loaders.
+    """
+    ctx = _get_context()
+    logger.info("Dashboard endpoint called", user_id=ctx.user_id)
+
+    vtc_preferences = None
+    if DATA_SOURCE == "nessie":
+        try:
+            bundle = _get_data_table_client().load_user_bundle(ctx.user_id)
+            if bundle.snapshot is not None:
+                ctx.prime("snapshot_dict", bundle.snapshot)
+            if bundle.budget is not None:
+                ctx.prime("budget_dict", bundle.budget)
+            ctx.prime("asteroid_states", bundle.asteroid_states)
+            vtc_preferences = bundle.vtc_preferences
+        except Exception as e:
+            logger.warning("Failed to load user bundle", error=str(e))
+
+    # Expensive rules only run on /api/asteroids
+    asteroid_list, rules = _build_asteroid_list(ctx, max_cost="cheap")
+    return {
+        "snapshot": ctx.snapshot_dict,
+        "budget": ctx.budget_dict,
+        "asteroids": asteroid_list,
+        "vtc_preferences": vtc_preferences,
+        "meta": {"asteroid_rules": rules},
+    }
+
+
 @app.get("/api/report/summary")
 @tracer.capture_method
 def get_financial_summary() -> dict[str, Any]:
@@ -238,8 +536,9 @@ def get_financial_summary() -> dict[str, Any]:
         user_id: User ID to fetch report for (default: user_maya_torres)
 
     Data source priority:
-        1. Nessie API (fresh data)
-        2. DynamoDB cache (fallback)
+        1. Materialized monthly rollups (synced from Nessie on first use,
+           refreshed in the background once the snapshot goes stale)
+        2. DynamoDB snapshot cache (fallback)
     """
     # Get user_id from query params, default to Maya Torres for demo
     params = app.current_event.query_string_parameters or {}
@@ -248,19 +547,36 @@ def get_financial_summary() -> dict[str, Any]:
     logger.info("Financial summary endpoint called", user_id=user_id)
 
     from shared.models import FinancialSnapshot
+    from shared.rollups import MonthlyRollup
     from services.report_service import build_report
 
     snapshot_dict = None
+    rollups: list[MonthlyRollup] = []
 
-    # 1. Try Nessie API first
+    # 1. Materialized monthly rollups, accounts from the cached snapshot
     if DATA_SOURCE == "nessie":
         try:
-            nessie = _get_nessie_service()
-            snapshot = nessie.build_snapshot(days=180)  # 6 months
-            snapshot_dict = snapshot.model_dump(mode="json")
-            logger.info("Got fresh data from Nessie", user_id=user_id)
+            db = _get_data_table_client()
+            rollups = [MonthlyRollup.model_validate(r) for r in db.get_rollups(user_id)]
+            snapshot_dict, is_stale = db.get_snapshot_allow_stale(user_id)
+            # Serve what is materialized; a background sync rewrites the rollups
+            if rollups and snapshot_dict is not None and is_stale:
+                _schedule_snapshot_refresh(user_id)
         except Exception as e:
-            logger.warning("Nessie API failed, trying cache", error=str(e))
+            logger.warning("Failed to load monthly rollups", error=str(e))
+
+        # First report for this user: one sync materializes the rollups
+        if not rollups or snapshot_dict is None:
+            try:
+                snapshot, _ = _sync_nessie_snapshot(user_id)
+                snapshot_dict = snapshot.model_dump(mode="json")
+                rollups = [
+                    MonthlyRollup.model_validate(r)
+                    for r in _get_data_table_client().get_rollups(user_id)
+                ]
+                logger.info("Synced from Nessie for report", user_id=user_id)
+            except Exception as e:
+                logger.warning("Nessie API failed, trying cache", error=str(e))
 
     # 2. Fallback to DynamoDB cache
     if snapshot_dict is None:
@@ -279,7 +595,7 @@ def get_financial_summary() -> dict[str, Any]:
         logger.info("Using mock data as final fallback", user_id=user_id)
 
     snapshot = FinancialSnapshot.model_validate(snapshot_dict)
-    report = build_report(snapshot, user_id)
+    report = build_report(snapshot, user_id, rollups=rollups)
 
     return report.model_dump(mode="json")
 
@@ -293,4 +609,24 @@ def get_financial_summary() -> dict[str, Any]:
 @tracer.capture_lambda_handler
 def lambda_handler(event: dict, context: LambdaContext) -> dict[str, Any]:
     """Main Lambda handler function."""
-    return app.resolve(event, context)
+    global _request_context
+    _request_context = None
+
+    # Async self-invoke from _schedule_snapshot_refresh
+    if event.get("action") == "refresh_snapshot":
+        refreshed = _refresh_snapshot(event["user_id"])
+        return {"status": "refreshed" if refreshed else "failed", "user_id": event["user_id"]}
+
+    try:
+        return app.resolve(event, context)
+    finally:
+        if _request_context is not None:
+            logger.info(
+                "Request data context",
+                user_id=_request_context.user_id,
+                loads=_request_context.stats(),
+                l1_cache=(
+                    _data_table_client.l1.stats() if _data_table_client else None
+                ),
+            )
+        _request_context = None
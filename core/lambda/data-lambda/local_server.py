@@ -9,12 +9,14 @@ Routes (same as Lambda):
 - GET  /api/health              - Health check (no auth)
 - GET  /api/snapshot            - Financial snapshot
 - GET  /api/budget              - Budget report
-- GET  /api/asteroids           - Financial threats
+- GET  /api/asteroids           - Financial threats (?since=<version> for changes only)
 - POST /api/asteroids/{id}/action - Take action on asteroid
 - GET  /api/transactions        - Transaction list
+- GET  /api/dashboard           - Snapshot, budget and asteroids in one call
 - GET  /api/report/summary      - 6-month financial summary
 """
 
+import asyncio
 import logging
 import os
 from typing import Any
@@ -41,6 +43,14 @@ DATA_SOURCE = os.getenv("DATA_SOURCE", "mock")
 _data_table_client = None
 _nessie_service = None
 
+# Strong refs so in-flight background refreshes aren't garbage collected
+_refresh_tasks: set[asyncio.Task] = set()
+
+SNAPSHOT_REFRESH_LOCK = "snapshot"
+
+# Incremental detector state per user in mock mode
+_local_detector_states: dict[str, Any] = {}
+
 
 def _get_data_table_client():
     global _data_table_client
@@ -53,28 +63,101 @@ def _get_data_table_client():
 def _get_nessie_service():
     global _nessie_service
     if _nessie_service is None:
-        from shared.nessie_service import NessieService
+        # Pooled across requests: uvicorn serves everything on one event loop
+        from shared.nessie_service import AsyncNessieService
         api_key = os.getenv("NESSIE_API_KEY", "")
-        _nessie_service = NessieService(api_key=api_key)
+        _nessie_service = AsyncNessieService(api_key=api_key)
     return _nessie_service
 
 
-def _get_snapshot_data(user_id: str = "demo_user") -> dict:
+def _save_rollups(db, user_id: str, state) -> None:
+    """Rewrite the monthly rollups (ROLLUP#YYYY-MM) a sync touched."""
+    from shared.frame import TransactionFrame
+    from shared.rollups import build_rollups
+
+    if not state.rollup_months:
+        return
+    rollups = build_rollups(TransactionFrame(state.transactions), state.rollup_months)
+    db.save_rollups(user_id, [r.model_dump(mode="json") for r in rollups])
+
+
+async def _sync_nessie_snapshot(user_id: str, days: int = 90):
+    """Merge new Nessie purchases into the user's stored history.
+
+    Returns the snapshot and its budget from the incremental aggregates.
+    """
+    from shared.nessie_service import NessieSyncState
+
+    db = _get_data_table_client()
+    state = None
+    try:
+        state_dict = db.get_sync_state(user_id)
+        if state_dict:
+            state = NessieSyncState.model_validate(state_dict)
+    except Exception as e:
+        logger.warning(f"Failed to load Nessie sync state, doing full sync: {e}")
+
+    nessie = _get_nessie_service()
+    snapshot, new_state = await nessie.sync_snapshot(state, days=days)
+
+    try:
+        db.save_sync_state(user_id, new_state.model_dump(mode="json"))
+    except Exception as e:
+        logger.warning(f"Failed to persist Nessie sync state: {e}")
+
+    try:
+        _save_rollups(db, user_id, new_state)
+    except Exception as e:
+        logger.warning(f"Failed to persist monthly rollups: {e}")
+
+    return snapshot, new_state.budget.report(snapshot)
+
+
+async def _refresh_snapshot(user_id: str) -> None:
+    """Re-sync the snapshot and rewrite the snapshot/budget cache, then unlock."""
+    db = _get_data_table_client()
+    try:
+        snapshot, budget = await _sync_nessie_snapshot(user_id)
+        db.cache_snapshot(user_id, snapshot.model_dump(mode="json"))
+        db.cache_budget(user_id, budget.model_dump(mode="json"))
+        logger.info(f"Refreshed stale snapshot for {user_id}")
+    except Exception as e:
+        logger.warning(f"Background snapshot refresh failed for {user_id}: {e}")
+    finally:
+        db.release_refresh_lock(user_id, SNAPSHOT_REFRESH_LOCK)
+
+
+def _schedule_snapshot_refresh(user_id: str) -> None:
+    """Start a background refresh task unless one is already running."""
+    db = _get_data_table_client()
+    if not db.acquire_refresh_lock(user_id, SNAPSHOT_REFRESH_LOCK):
+        logger.info(f"Snapshot refresh already in progress for {user_id}")
+        return
+    task = asyncio.create_task(_refresh_snapshot(user_id))
+    _refresh_tasks.add(task)
+    task.add_done_callback(_refresh_tasks.discard)
+
+
+async def _get_snapshot_data(user_id: str = "demo_user") -> dict:
     """Get financial snapshot, using cache or computing fresh."""
     if DATA_SOURCE == "nessie":
-        # Check cache first
+        # Check cache first; stale rows are served while a refresh runs
         db = _get_data_table_client()
-        cached = db.get_cached_snapshot(user_id)
+        cached, is_stale = db.get_snapshot_allow_stale(user_id)
         if cached:
-            logger.info(f"Returning cached snapshot for {user_id}")
+            if is_stale:
+                logger.info(f"Returning stale snapshot for {user_id}")
+                _schedule_snapshot_refresh(user_id)
+            else:
+                logger.info(f"Returning cached snapshot for {user_id}")
             return cached
 
         # Fetch fresh from Nessie
         try:
-            nessie = _get_nessie_service()
-            snapshot = nessie.build_snapshot()
+            snapshot, budget = await _sync_nessie_snapshot(user_id)
             snapshot_dict = snapshot.model_dump(mode="json")
             db.cache_snapshot(user_id, snapshot_dict)
+            db.cache_budget(user_id, budget.model_dump(mode="json"))
             return snapshot_dict
         except Exception as e:
             logger.warning(f"Nessie API failed, falling back to mock: {e}")
@@ -84,8 +167,14 @@ def _get_snapshot_data(user_id: str = "demo_user") -> dict:
     return get_mock_snapshot().model_dump(mode="json")
 
 
-def _get_budget_data(user_id: str = "demo_user") -> dict:
-    """Get budget report, using cache or computing fresh."""
+async def _get_budget_data(
+    user_id: str = "demo_user", snapshot_dict: dict | None = None
+) -> dict:
+    """Get budget report, using cache or computing fresh.
+
+    Pass snapshot_dict when the caller already loaded it so a budget cache
+    miss does not fetch the snapshot a second time.
+    """
     if DATA_SOURCE == "nessie":
         db = _get_data_table_client()
         cached = db.get_cached_budget(user_id)
@@ -97,7 +186,8 @@ def _get_budget_data(user_id: str = "demo_user") -> dict:
     from shared.models import FinancialSnapshot
     from shared.budget_engine import calculate
 
-    snapshot_dict = _get_snapshot_data(user_id)
+    if snapshot_dict is None:
+        snapshot_dict = await _get_snapshot_data(user_id)
     snapshot = FinancialSnapshot.model_validate(snapshot_dict)
     budget = calculate(snapshot)
     budget_dict = budget.model_dump(mode="json")
@@ -124,48 +214,92 @@ async def health_check() -> dict[str, Any]:
 async def get_snapshot(user_id: str = "demo_user") -> dict[str, Any]:
     """Return financial snapshot for the user."""
     logger.info(f"Snapshot endpoint called for {user_id}")
-    return _get_snapshot_data(user_id)
+    return await _get_snapshot_data(user_id)
 
 
 @app.get("/api/budget")
 async def get_budget(user_id: str = "demo_user") -> dict[str, Any]:
     """Return 50/30/20 budget report for the user."""
     logger.info(f"Budget endpoint called for {user_id}")
-    return _get_budget_data(user_id)
+    return await _get_budget_data(user_id)
+
+
+def _load_detector_state(user_id: str):
+    """Get the user's incremental asteroid detector state, or a fresh one."""
+    from services.incremental_detector import DetectorState
+
+    if DATA_SOURCE != "nessie":
+        return _local_detector_states.get(user_id) or DetectorState()
+    try:
+        state_dict = _get_data_table_client().get_detector_state(user_id)
+        if state_dict:
+            return DetectorState.model_validate(state_dict)
+    except Exception as e:
+        logger.warning(f"Failed to load detector state, detecting from scratch: {e}")
+    return DetectorState()
+
+
+def _save_detector_state(user_id: str, state) -> None:
+    if DATA_SOURCE != "nessie":
+        _local_detector_states[user_id] = state
+        return
+    try:
+        _get_data_table_client().save_detector_state(user_id, state.model_dump(mode="json"))
+    except Exception as e:
+        logger.warning(f"Failed to persist detector state: {e}")
 
 
 @app.get("/api/asteroids")
-async def get_asteroids(user_id: str = "demo_user") -> dict[str, Any]:
-    """Return financial threats (asteroids) for the user."""
+async def get_asteroids(user_id: str = "demo_user", since: int | None = None) -> dict[str, Any]:
+    """Return financial threats (asteroids) for the user.
+
+    With ?since=<version> from a previous response, returns only the
+    changes when the client is at most one version behind.
+    """
     logger.info(f"Asteroids endpoint called for {user_id}")
 
     from shared.models import BudgetReport, FinancialSnapshot
-    from services.asteroid_detector import detect
 
-    snapshot_dict = _get_snapshot_data(user_id)
-    budget_dict = _get_budget_data(user_id)
+    snapshot_dict = await _get_snapshot_data(user_id)
+    budget_dict = await _get_budget_data(user_id, snapshot_dict=snapshot_dict)
 
     snapshot = FinancialSnapshot.model_validate(snapshot_dict)
     budget = BudgetReport.model_validate(budget_dict)
 
-    asteroids = detect(snapshot, budget)
-    asteroid_list = [a.model_dump(mode="json") for a in asteroids]
+    state = _load_detector_state(user_id)
+    diff, rules = state.refresh(snapshot, budget)
+    if any(r["status"] == "ran" for r in rules.values()):
+        _save_detector_state(user_id, state)
 
-    # Merge with persisted action states
+    # Persisted action states
+    state_map: dict[str, dict] = {}
     if DATA_SOURCE == "nessie":
         try:
-            db = _get_data_table_client()
-            states = db.get_all_asteroid_states(user_id)
+            states = _get_data_table_client().get_all_asteroid_states(user_id)
             state_map = {s["asteroid_id"]: s for s in states}
-            for asteroid in asteroid_list:
-                state = state_map.get(asteroid["id"])
-                if state:
-                    asteroid["user_action"] = state["action"]
-                    asteroid["actioned_at"] = state["actioned_at"]
         except Exception as e:
             logger.warning(f"Failed to load asteroid states: {e}")
 
-    return {"asteroids": asteroid_list}
+    def merged(asteroids) -> list[dict]:
+        asteroid_list = [a.model_dump(mode="json") for a in asteroids]
+        for asteroid in asteroid_list:
+            action = state_map.get(asteroid["id"])
+            if action:
+                asteroid["user_action"] = action["action"]
+                asteroid["actioned_at"] = action["actioned_at"]
+        return asteroid_list
+
+    response: dict[str, Any] = {"version": state.version, "meta": {"rules": rules}}
+    if since is not None and since in (state.version - 1, state.version):
+        changes = state.last_diff if since < state.version else diff
+        response["changes"] = {
+            "added": merged(changes.added),
+            "updated": merged(changes.updated),
+            "resolved": changes.resolved,
+        }
+    else:
+        response["asteroids"] = merged(state.current())
+    return response
 
 
 @app.post("/api/asteroids/{asteroid_id}/action")
@@ -198,7 +332,7 @@ async def get_transactions(
     """Return transaction list for the user."""
     logger.info(f"Transactions endpoint called for {user_id}")
 
-    snapshot_dict = _get_snapshot_data(user_id)
+    snapshot_dict = await _get_snapshot_data(user_id)
     transactions = snapshot_dict.get("recent_transactions", [])
 
     # Filter by days if needed
@@ -211,6 +345,55 @@ async def get_transactions(
     return {"transactions": transactions, "count": len(transactions)}
 
 
+@app.get("/api/dashboard")
+async def get_dashboard(user_id: str = "demo_user") -> dict[str, Any]:
+    """Return snapshot, budget, asteroids and VTC preferences in one call."""
+    logger.info(f"Dashboard endpoint called for {user_id}")
+
+    snapshot_dict = None
+    budget_dict = None
+    vtc_preferences = None
+    states: list[dict] = []
+    if DATA_SOURCE == "nessie":
+        try:
+            bundle = _get_data_table_client().load_user_bundle(user_id)
+            snapshot_dict = bundle.snapshot
+            budget_dict = bundle.budget
+            vtc_preferences = bundle.vtc_preferences
+            states = bundle.asteroid_states
+        except Exception as e:
+            logger.warning(f"Failed to load user bundle: {e}")
+
+    if snapshot_dict is None:
+        snapshot_dict = await _get_snapshot_data(user_id)
+    if budget_dict is None:
+        budget_dict = await _get_budget_data(user_id, snapshot_dict=snapshot_dict)
+
+    from shared.models import BudgetReport, FinancialSnapshot
+    from services.asteroid_detector import run_rules
+
+    snapshot = FinancialSnapshot.model_validate(snapshot_dict)
+    budget = BudgetReport.model_validate(budget_dict)
+    # Expensive rules only run on /api/asteroids
+    result = run_rules(snapshot, budget, cache_key=user_id, max_cost="cheap")
+    asteroid_list = [a.model_dump(mode="json") for a in result.asteroids]
+
+    state_map = {s["asteroid_id"]: s for s in states}
+    for asteroid in asteroid_list:
+        state = state_map.get(asteroid["id"])
+        if state:
+            asteroid["user_action"] = state["action"]
+            asteroid["actioned_at"] = state["actioned_at"]
+
+    return {
+        "snapshot": snapshot_dict,
+        "budget": budget_dict,
+        "asteroids": asteroid_list,
+        "vtc_preferences": vtc_preferences,
+        "meta": {"asteroid_rules": result.rules},
+    }
+
+
 @app.get("/api/report/summary")
 async def get_financial_summary(user_id: str = "user_maya_torres") -> dict[str, Any]:
     """Return 6-month financial summary report.
@@ -219,25 +402,39 @@ async def get_financial_summary(user_id: str = "user_maya_torres") -> dict[str,
         user_id: User ID to fetch report for (default: user_maya_torres)
 
     Data source priority:
-        1. Nessie API (fresh data)
-        2. DynamoDB cache (fallback)
+        1. Materialized monthly rollups (synced from Nessie on first use)
+        2. DynamoDB snapshot cache (fallback)
     """
     logger.info(f"Financial summary endpoint called for {user_id}")
 
     from shared.models import FinancialSnapshot
+    from shared.rollups import MonthlyRollup
     from services.report_service import build_report
 
     snapshot_dict = None
+    rollups: list[MonthlyRollup] = []
 
-    # 1. Try Nessie API first
+    # 1. Materialized monthly rollups, accounts from the cached snapshot
     if DATA_SOURCE == "nessie":
         try:
-            nessie = _get_nessie_service()
-            snapshot = nessie.build_snapshot(days=180)  # 6 months
-            snapshot_dict = snapshot.model_dump(mode="json")
-            logger.info(f"Got fresh data from Nessie for {user_id}")
+            db = _get_data_table_client()
+            rollups = [MonthlyRollup.model_validate(r) for r in db.get_rollups(user_id)]
+            snapshot_dict, _ = db.get_snapshot_allow_stale(user_id)
         except Exception as e:
-            logger.warning(f"Nessie API failed, trying cache: {e}")
+            logger.warning(f"Failed to load monthly rollups: {e}")
+
+        # First report for this user: one sync materializes the rollups
+        if not rollups or snapshot_dict is None:
+            try:
+                snapshot, _ = await _sync_nessie_snapshot(user_id)
+                snapshot_dict = snapshot.model_dump(mode="json")
+                rollups = [
+                    MonthlyRollup.model_validate(r)
+                    for r in _get_data_table_client().get_rollups(user_id)
+                ]
+                logger.info(f"Synced from Nessie for report for {user_id}")
+            except Exception as e:
+                logger.warning(f"Nessie API failed, trying cache: {e}")
 
     # 2. Fallback to DynamoDB cache
     if snapshot_dict is None:
@@ -256,7 +453,7 @@ async def get_financial_summary(user_id: str = "user_maya_torres") -> dict[str,
         logger.info(f"Using mock data as final fallback for {user_id}")
 
     snapshot = FinancialSnapshot.model_validate(snapshot_dict)
-    report = build_report(snapshot, user_id)
+    report = build_report(snapshot, user_id, rollups=rollups)
 
     return report.model_dump(mode="json")
 
@@ -2,6 +2,7 @@ from .nessie_service import NessieService, NessieApiError
 from .budget_engine import calculate as calculate_budget
 from .asteroid_detector import detect as detect_asteroids
 from .report_service import build_report
+from .request_context import RequestDataContext
 
 __all__ = [
     "NessieService",
@@ -9,4 +10,5 @@ __all__ = [
     "calculate_budget",
     "detect_asteroids",
     "build_report",
+    "RequestDataContext",
 ]
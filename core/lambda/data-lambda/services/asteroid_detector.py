@@ -1,157 +1,414 @@
 """
 Asteroid Detector for SynesthesiaPay.
 
-Stateless detector that analyzes a FinancialSnapshot and BudgetReport
-to identify financial threats (asteroids) requiring user attention.
+Analyzes a FinancialSnapshot and BudgetReport to identify financial
+threats (asteroids) requiring user attention.
 
 Detection rules:
 1. Subscription Renewal - upcoming recurring charges
 2. Budget Overrun - buckets exceeding targets
 3. Unused Service - recurring charges with low activity
-4. Spending Spike - single transactions far above category average
+4. Spending Spike - single transactions far above the category's typical amount
+
+Rules are plugins: each DetectionRule subclass registers itself with
+@register_rule and declares the inputs it reads (snapshot, budget,
+history, clock) and a cost class. run_rules() runs the enabled rules as
+accumulators: it walks the transaction frame once, in row batches,
+feeding every batch to every rule that reads the snapshot, then asks each
+rule to finalize. A new rule adds work per batch, not another scan of the
+transactions.
+
+Given a cache key (the user id), a rule whose inputs have the same
+fingerprint as on a previous run returns its earlier asteroids instead of
+running again. Every run reports per-rule status and latency so callers
+can surface it as response metadata.
 """
 
 import hashlib
-from collections import defaultdict
+import os
+import time
 from datetime import datetime, timedelta, timezone
+from typing import Hashable, NamedTuple
 
+import numpy as np
 from aws_lambda_powertools.logging import Logger
 
 from shared.categories import BUDGET_TARGETS
+from shared.frame import BUCKETS, NO_DATE, TransactionFrame, to_epoch_us
 from shared.models import Asteroid, BudgetReport, FinancialSnapshot
+from shared.streaming_stats import MAD_TO_SIGMA, MAX_SCORE, SpendingProfile
+from shared.ttl_cache import TTLCache
 
 logger = Logger(service="AsteroidDetector")
 
+# Rows handed to the rules per step of the scan
+BATCH_ROWS = 8192
 
-def _make_id(threat_type: str, key: str) -> str:
-    """Generate a deterministic asteroid ID from type and source data."""
-    h = hashlib.md5(f"{threat_type}:{key}".encode()).hexdigest()[:8]
-    return f"ast_{threat_type}_{h}"
+# Inputs a rule may declare. "clock" marks rules whose output depends on
+# the current time; its fingerprint changes every CLOCK_RESOLUTION_S.
+INPUTS = frozenset({"snapshot", "budget", "history", "clock"})
+CLOCK_RESOLUTION_S = 300
 
+# Cost classes, cheapest first; callers cap the classes they will wait for
+COSTS = ("cheap", "expensive")
 
-def detect(
-    snapshot: FinancialSnapshot, budget: BudgetReport
-) -> list[Asteroid]:
-    """Run all detection rules and return discovered asteroids."""
-    asteroids: list[Asteroid] = []
-    now = datetime.now(timezone.utc)
+# Frame labels a rule's output can be partitioned by
+PARTITIONS = ("category", "merchant")
 
-    asteroids.extend(_detect_subscription_renewals(snapshot, now))
-    asteroids.extend(_detect_budget_overruns(budget))
-    asteroids.extend(_detect_unused_services(snapshot, now))
-    asteroids.extend(_detect_spending_spikes(snapshot))
+# Comma-separated threat types to switch off without a deploy
+DISABLED_RULES_ENV = "ASTEROID_RULES_DISABLED"
 
-    return asteroids
+_INCOME = BUCKETS.index("income")
 
+# Spending spike: multiple of the category median, and modified z-score
+SPIKE_RATIO = 2.0
+SPIKE_SCORE = 3.5
 
-def _detect_subscription_renewals(
-    snapshot: FinancialSnapshot, now: datetime
-) -> list[Asteroid]:
-    """Rule 1: Flag upcoming recurring subscription renewals."""
-    asteroids = []
-    seen_merchants: set[str] = set()
+# Rule output per (cache key, threat type, input fingerprints)
+_results = TTLCache(max_entries=2048, ttl_seconds=900)
 
-    for txn in snapshot.recent_transactions:
-        if not txn.is_recurring or not txn.next_expected_date:
-            continue
-        if txn.merchant in seen_merchants:
-            continue
-        seen_merchants.add(txn.merchant)
 
-        days_until = (txn.next_expected_date - now).days
-        if days_until > 14:
-            continue
+def _make_id(threat_type: str, key: str) -> str:
+    """Generate a deterministic asteroid ID from type and source data."""
+    h = hashlib.md5(f"{threat_type}:{key}".encode()).hexdigest()[:8]
+    return f"ast_{threat_type}_{h}"
 
-        if days_until <= 3:
-            severity = "danger"
-        else:
-            severity = "warning"
-
-        asteroids.append(
-            Asteroid(
-                id=_make_id("subscription_renewal", txn.merchant),
-                threat_type="subscription_renewal",
-                severity=severity,
-                title=f"{txn.merchant} Renewal",
-                detail=f"{txn.merchant} subscription renews in {max(0, days_until)} days - ${abs(txn.amount):.2f}",
-                amount=abs(txn.amount),
-                days_until=max(0, days_until),
-                recommended_action="absorb",
-                reasoning=f"Recurring {txn.merchant} charge of ${abs(txn.amount):.2f}. Review whether this subscription is still providing value.",
-            )
-        )
 
-    return asteroids
+class DetectionRule:
+    """
+    One detection rule, run as an accumulator over row batches.
+
+    A fresh instance is created per run. Rules that declare the "snapshot"
+    input see every batch of the transaction frame in row order through
+    observe(); finalize() turns what was accumulated into asteroids.
+    history is the caller's longer transaction history, if it has one.
+
+    partition names the frame label ("category" or "merchant") a rule's
+    output is local to: running it over the rows of one label yields
+    exactly that label's asteroids. recurring_only rules ignore
+    non-recurring rows. Both let incremental detection re-run a rule over
+    just the partitions that changed.
+
+    category_stats rules judge rows against per-category spending stats
+    (shared.streaming_stats) and take them as a `profile` constructor
+    argument; when given, they skip building the stats from the rows, so
+    incremental detection can supply the ones it keeps.
+    """
+
+    threat_type: str
+    inputs: frozenset[str] = frozenset({"snapshot"})
+    cost: str = "cheap"
+    enabled: bool = True
+    partition: str | None = None
+    recurring_only: bool = False
+    category_stats: bool = False
+
+    def __init__(
+        self,
+        frame: TransactionFrame,
+        now: datetime,
+        history: TransactionFrame | None = None,
+    ):
+        self.frame = frame
+        self.now = now
+        self.history = history
+
+    def observe(self, rows: slice) -> None:
+        """Accumulate over frame rows [rows.start, rows.stop)."""
+
+    def finalize(self, budget: BudgetReport) -> list[Asteroid]:
+        raise NotImplementedError
+
+
+# Rules in the order their asteroids are reported
+RULES: list[type[DetectionRule]] = []
+
+
+def register_rule(rule: type[DetectionRule]) -> type[DetectionRule]:
+    """Class decorator adding a rule to the detection pipeline."""
+    unknown = rule.inputs - INPUTS
+    if unknown:
+        raise ValueError(f"{rule.__name__} declares unknown inputs: {sorted(unknown)}")
+    if rule.cost not in COSTS:
+        raise ValueError(f"{rule.__name__} has unknown cost class: {rule.cost}")
+    if rule.partition is not None and rule.partition not in PARTITIONS:
+        raise ValueError(f"{rule.__name__} has unknown partition: {rule.partition}")
+    if any(r.threat_type == rule.threat_type for r in RULES):
+        raise ValueError(f"Duplicate rule for threat type: {rule.threat_type}")
+    RULES.append(rule)
+    return rule
+
+
+def enabled_rules(max_cost: str = "expensive") -> list[type[DetectionRule]]:
+    """Registered rules that are enabled and no costlier than max_cost."""
+    disabled = {t.strip() for t in os.getenv(DISABLED_RULES_ENV, "").split(",")}
+    limit = COSTS.index(max_cost)
+    return [
+        rule for rule in RULES
+        if rule.enabled
+        and rule.threat_type not in disabled
+        and COSTS.index(rule.cost) <= limit
+    ]
+
+
+class DetectionResult(NamedTuple):
+    asteroids: list[Asteroid]
+    # threat type -> {"cost", "status": ran|cached|disabled|missing_input, "ms"}
+    rules: dict[str, dict]
+
+
+def input_fingerprints(
+    snapshot: FinancialSnapshot,
+    budget: BudgetReport,
+    frame: TransactionFrame,
+    history: TransactionFrame | None,
+    now: datetime,
+) -> dict[str, Hashable]:
+    """Cheap change markers for each input, stable across processes."""
+    last = history.transactions[-1].id if history is not None and len(history) else None
+    return {
+        "snapshot": (snapshot.snapshot_timestamp.isoformat(), len(frame)),
+        "budget": hashlib.md5(budget.model_dump_json().encode()).hexdigest(),
+        "history": None if history is None else (len(history), last),
+        "clock": int(now.timestamp() // CLOCK_RESOLUTION_S),
+    }
+
+
+def run_rules(
+    snapshot: FinancialSnapshot,
+    budget: BudgetReport,
+    frame: TransactionFrame | None = None,
+    history: TransactionFrame | None = None,
+    cache_key: str | None = None,
+    max_cost: str = "expensive",
+) -> DetectionResult:
+    """
+    Run enabled rules and return their asteroids with per-rule metadata.
+
+    Rules above max_cost are reported as disabled, so the dashboard can
+    skip expensive rules that /api/asteroids still runs. Without a
+    cache_key every enabled rule runs.
+    """
+    if frame is None:
+        frame = TransactionFrame.from_snapshot(snapshot)
+
+    now = datetime.now(timezone.utc)
+    enabled = enabled_rules(max_cost)
+    fingerprints = input_fingerprints(snapshot, budget, frame, history, now)
+
+    meta: dict[str, dict] = {}
+    outputs: dict[str, list[Asteroid]] = {}
+    seconds: dict[str, float] = {}
+    pending: list[tuple[DetectionRule, tuple | None]] = []
+    for rule_cls in RULES:
+        name = rule_cls.threat_type
+        meta[name] = {"cost": rule_cls.cost}
+        if rule_cls not in enabled:
+            meta[name]["status"] = "disabled"
+            continue
+        if "history" in rule_cls.inputs and history is None:
+            meta[name]["status"] = "missing_input"
+            continue
+
+        key = None
+        if cache_key is not None:
+            key = (cache_key, name, tuple(fingerprints[i] for i in sorted(rule_cls.inputs)))
+            cached = _results.get(key)
+            if cached is not None:
+                outputs[name] = cached
+                meta[name]["status"] = "cached"
+                continue
+
+        meta[name]["status"] = "ran"
+        start = time.perf_counter()
+        pending.append((rule_cls(frame, now, history), key))
+        seconds[name] = time.perf_counter() - start
+
+    # One pass over the transactions, shared by every rule that reads them
+    observers = [rule for rule, _ in pending if "snapshot" in rule.inputs]
+    for batch_start in range(0, len(frame), BATCH_ROWS) if observers else ():
+        rows = slice(batch_start, min(batch_start + BATCH_ROWS, len(frame)))
+        for rule in observers:
+            start = time.perf_counter()
+            rule.observe(rows)
+            seconds[rule.threat_type] += time.perf_counter() - start
+
+    for rule, key in pending:
+        start = time.perf_counter()
+        outputs[rule.threat_type] = rule.finalize(budget)
+        seconds[rule.threat_type] += time.perf_counter() - start
+        if key is not None:
+            _results.set(key, outputs[rule.threat_type])
+
+    for name, elapsed in seconds.items():
+        meta[name]["ms"] = round(elapsed * 1000, 3)
+
+    asteroids = [a for rule_cls in RULES for a in outputs.get(rule_cls.threat_type, ())]
+    return DetectionResult(asteroids, meta)
 
 
-def _detect_budget_overruns(budget: BudgetReport) -> list[Asteroid]:
-    """Rule 2: Flag buckets exceeding their budget targets."""
-    asteroids = []
+def detect(
+    snapshot: FinancialSnapshot,
+    budget: BudgetReport,
+    frame: TransactionFrame | None = None,
+) -> list[Asteroid]:
+    """Run all enabled detection rules and return discovered asteroids."""
+    return run_rules(snapshot, budget, frame=frame).asteroids
 
-    for bucket_name in ("needs", "wants", "savings"):
-        bucket = getattr(budget, bucket_name)
-        target_pct = BUDGET_TARGETS[bucket_name]
 
-        if target_pct == 0:
-            continue
+@register_rule
+class SubscriptionRenewalRule(DetectionRule):
+    """Rule 1: Flag upcoming recurring subscription renewals."""
 
-        ratio = bucket.actual_pct / target_pct
+    threat_type = "subscription_renewal"
+    inputs = frozenset({"snapshot", "clock"})
+    partition = "merchant"
+    recurring_only = True
+
+    def __init__(
+        self,
+        frame: TransactionFrame,
+        now: datetime,
+        history: TransactionFrame | None = None,
+    ):
+        super().__init__(frame, now, history)
+        # First recurring row with an expected date, per merchant code
+        self.first_row: dict[int, int] = {}
+
+    def observe(self, rows: slice) -> None:
+        frame = self.frame
+        scheduled = frame.is_recurring[rows] & (frame.next_expected_us[rows] != NO_DATE)
+        idx = np.flatnonzero(scheduled) + rows.start
+        codes, first = np.unique(frame.merchant_codes[idx], return_index=True)
+        for code, row in zip(codes.tolist(), idx[first].tolist()):
+            self.first_row.setdefault(code, row)
+
+    def finalize(self, budget: BudgetReport) -> list[Asteroid]:
+        asteroids = []
+        frame = self.frame
+        rows = np.array(sorted(self.first_row.values()), dtype=np.int64)
+        days = frame.days_until(frame.next_expected_us[rows], self.now)
+        upcoming = days <= 14
+
+        for i, days_until in zip(rows[upcoming], days[upcoming].tolist()):
+            txn = frame.transactions[i]
+
+            if days_until <= 3:
+                severity = "danger"
+            else:
+                severity = "warning"
 
-        if ratio > 1.0:
-            severity = "danger"
-            overspend = bucket.actual_amount - bucket.target_amount
             asteroids.append(
                 Asteroid(
-                    id=_make_id("budget_overrun", bucket_name),
-                    threat_type="budget_overrun",
+                    id=_make_id("subscription_renewal", txn.merchant),
+                    threat_type="subscription_renewal",
                     severity=severity,
-                    title=f"{bucket_name.title()} Budget Overrun",
-                    detail=f"{bucket_name.title()} spending at {ratio * 100:.0f}% of target ({bucket.actual_pct * 100:.1f}% vs {target_pct * 100:.0f}% target)",
-                    amount=round(overspend, 2),
-                    days_until=0,
-                    recommended_action="redirect",
-                    reasoning=f"{bucket_name.title()} spending (${bucket.actual_amount:.2f}) exceeds ${bucket.target_amount:.2f} target by ${overspend:.2f}. Consider reducing discretionary spending or reallocating budget.",
-                )
-            )
-        elif ratio > 0.9:
-            asteroids.append(
-                Asteroid(
-                    id=_make_id("budget_overrun", bucket_name),
-                    threat_type="budget_overrun",
-                    severity="warning",
-                    title=f"{bucket_name.title()} Budget Warning",
-                    detail=f"{bucket_name.title()} spending at {ratio * 100:.0f}% of target - approaching limit",
-                    amount=round(bucket.target_amount - bucket.actual_amount, 2),
-                    days_until=0,
-                    recommended_action="redirect",
-                    reasoning=f"{bucket_name.title()} spending (${bucket.actual_amount:.2f}) is approaching the ${bucket.target_amount:.2f} target. Monitor closely to avoid overrun.",
+                    title=f"{txn.merchant} Renewal",
+                    detail=f"{txn.merchant} subscription renews in {max(0, days_until)} days - ${abs(txn.amount):.2f}",
+                    amount=abs(txn.amount),
+                    days_until=max(0, days_until),
+                    recommended_action="absorb",
+                    reasoning=f"Recurring {txn.merchant} charge of ${abs(txn.amount):.2f}. Review whether this subscription is still providing value.",
                 )
             )
 
-    return asteroids
+        return asteroids
 
 
-def _detect_unused_services(
-    snapshot: FinancialSnapshot, now: datetime
-) -> list[Asteroid]:
-    """Rule 3: Flag recurring subscriptions with low usage (single charge in last 30 days)."""
-    asteroids = []
-    cutoff = now - timedelta(days=30)
+@register_rule
+class BudgetOverrunRule(DetectionRule):
+    """Rule 2: Flag buckets exceeding their budget targets."""
+
+    threat_type = "budget_overrun"
+    inputs = frozenset({"budget"})
+
+    def finalize(self, budget: BudgetReport) -> list[Asteroid]:
+        asteroids = []
+
+        for bucket_name in ("needs", "wants", "savings"):
+            bucket = getattr(budget, bucket_name)
+            target_pct = BUDGET_TARGETS[bucket_name]
+
+            if target_pct == 0:
+                continue
+
+            ratio = bucket.actual_pct / target_pct
+
+            if ratio > 1.0:
+                severity = "danger"
+                overspend = bucket.actual_amount - bucket.target_amount
+                asteroids.append(
+                    Asteroid(
+                        id=_make_id("budget_overrun", bucket_name),
+                        threat_type="budget_overrun",
+                        severity=severity,
+                        title=f"{bucket_name.title()} Budget Overrun",
+                        detail=f"{bucket_name.title()} spending at {ratio * 100:.0f}% of target ({bucket.actual_pct * 100:.1f}% vs {target_pct * 100:.0f}% target)",
+                        amount=round(overspend, 2),
+                        days_until=0,
+                        recommended_action="redirect",
+                        reasoning=f"{bucket_name.title()} spending (${bucket.actual_amount:.2f}) exceeds ${bucket.target_amount:.2f} target by ${overspend:.2f}. Consider reducing discretionary spending or reallocating budget.",
+                    )
+                )
+            elif ratio > 0.9:
+                asteroids.append(
+                    Asteroid(
+                        id=_make_id("budget_overrun", bucket_name),
+                        threat_type="budget_overrun",
+                        severity="warning",
+                        title=f"{bucket_name.title()} Budget Warning",
+                        detail=f"{bucket_name.title()} spending at {ratio * 100:.0f}% of target - approaching limit",
+                        amount=round(bucket.target_amount - bucket.actual_amount, 2),
+                        days_until=0,
+                        recommended_action="redirect",
+                        reasoning=f"{bucket_name.title()} spending (${bucket.actual_amount:.2f}) is approaching the ${bucket.target_amount:.2f} target. Monitor closely to avoid overrun.",
+                    )
+                )
 
-    # Count occurrences of each recurring merchant in last 30 days
-    merchant_counts: dict[str, int] = defaultdict(int)
-    merchant_amount: dict[str, float] = {}
+        return asteroids
 
-    for txn in snapshot.recent_transactions:
-        if not txn.is_recurring or txn.bucket == "income":
-            continue
-        if txn.date >= cutoff:
-            merchant_counts[txn.merchant] += 1
-            merchant_amount[txn.merchant] = abs(txn.amount)
 
-    for merchant, count in merchant_counts.items():
-        if count == 1:
-            amount = merchant_amount[merchant]
+@register_rule
+class UnusedServiceRule(DetectionRule):
+    """Rule 3: Flag recurring subscriptions with low usage (single charge in last 30 days)."""
+
+    threat_type = "unused_service"
+    inputs = frozenset({"snapshot", "clock"})
+    partition = "merchant"
+    recurring_only = True
+
+    def __init__(
+        self,
+        frame: TransactionFrame,
+        now: datetime,
+        history: TransactionFrame | None = None,
+    ):
+        super().__init__(frame, now, history)
+        self.cutoff_us = to_epoch_us(now - timedelta(days=30))
+        # Recurring non-income charges in the last 30 days, per merchant code
+        self.counts = np.zeros(len(frame.merchants), dtype=np.int64)
+        self.candidates: list[np.ndarray] = []
+
+    def observe(self, rows: slice) -> None:
+        frame = self.frame
+        mask = (
+            frame.is_recurring[rows]
+            & (frame.bucket_codes[rows] != _INCOME)
+            & (frame.date_us[rows] >= self.cutoff_us)
+        )
+        codes = frame.merchant_codes[rows][mask]
+        self.counts += np.bincount(codes, minlength=len(self.counts))
+        self.candidates.append(np.flatnonzero(mask) + rows.start)
+
+    def finalize(self, budget: BudgetReport) -> list[Asteroid]:
+        asteroids = []
+        frame = self.frame
+        rows = np.concatenate(self.candidates) if self.candidates else np.zeros(0, dtype=np.int64)
+
+        # Merchants charged exactly once, in the order they appear
+        for i in rows[self.counts[frame.merchant_codes[rows]] == 1]:
+            merchant = frame.merchants[frame.merchant_codes[i]]
+            amount = int(frame.abs_cents[i]) / 100
             asteroids.append(
                 Asteroid(
                     id=_make_id("unused_service", merchant),
@@ -166,35 +423,75 @@ def _detect_unused_services(
                 )
             )
 
-    return asteroids
-
-
-def _detect_spending_spikes(snapshot: FinancialSnapshot) -> list[Asteroid]:
-    """Rule 4: Flag single transactions that are >2x the category average."""
-    asteroids = []
-
-    # Calculate average per category (excluding income)
-    category_amounts: dict[str, list[float]] = defaultdict(list)
-    for txn in snapshot.recent_transactions:
-        if txn.bucket == "income":
-            continue
-        category_amounts[txn.category].append(abs(txn.amount))
-
-    category_avg: dict[str, float] = {}
-    for cat, amounts in category_amounts.items():
-        if len(amounts) >= 2:
-            category_avg[cat] = sum(amounts) / len(amounts)
-
-    # Find spikes
-    for txn in snapshot.recent_transactions:
-        if txn.bucket == "income":
-            continue
-        avg = category_avg.get(txn.category)
-        if avg is None or avg == 0:
-            continue
+        return asteroids
+
+
+@register_rule
+class SpendingSpikeRule(DetectionRule):
+    """
+    Rule 4: Flag single transactions far above the category's typical amount.
+
+    A spike is over SPIKE_RATIO x the category median and an outlier by
+    modified z-score (median/MAD), so one large purchase can't inflate the
+    baseline it is judged against the way a mean would.
+    """
+
+    threat_type = "spending_spike"
+    # Builds a quantile digest per category: the slowest rule by far
+    cost = "expensive"
+    partition = "category"
+    category_stats = True
+
+    def __init__(
+        self,
+        frame: TransactionFrame,
+        now: datetime,
+        history: TransactionFrame | None = None,
+        profile: SpendingProfile | None = None,
+    ):
+        super().__init__(frame, now, history)
+        self.build_profile = profile is None
+        self.profile = profile or SpendingProfile()
+        self.spending: list[np.ndarray] = []
+
+    def observe(self, rows: slice) -> None:
+        # Per-category stats (excluding income)
+        frame = self.frame
+        idx = np.flatnonzero(frame.bucket_codes[rows] != _INCOME) + rows.start
+        if self.build_profile:
+            self.profile.observe_frame(frame, idx)
+        self.spending.append(idx)
+
+    def finalize(self, budget: BudgetReport) -> list[Asteroid]:
+        asteroids = []
+        frame = self.frame
+        rows = np.concatenate(self.spending) if self.spending else np.zeros(0, dtype=np.int64)
+
+        # Median and MAD per category code; needs 2+ samples
+        size = len(frame.categories)
+        medians = np.zeros(size)
+        mads = np.zeros(size)
+        for code, category in enumerate(frame.categories):
+            stats = self.profile.categories.get(category)
+            if stats is not None and stats.count >= 2:
+                medians[code] = stats.digest.median()
+                mads[code] = stats.digest.mad()
+
+        # Find spikes
+        codes = frame.category_codes[rows]
+        amounts = frame.abs_cents[rows] / 100
+        row_median = medians[codes]
+        row_mad = mads[codes]
+        ratios = np.divide(amounts, row_median, out=np.zeros(len(rows)), where=row_median > 0)
+        scores = np.where(
+            row_mad > 0,
+            MAD_TO_SIGMA * np.abs(amounts - row_median) / np.where(row_mad > 0, row_mad, 1),
+            np.where(amounts != row_median, MAX_SCORE, 0.0),
+        )
+        spikes = (ratios > SPIKE_RATIO) & (scores > SPIKE_SCORE)
 
-        ratio = abs(txn.amount) / avg
-        if ratio > 2.0:
+        for i, ratio, median in zip(rows[spikes], ratios[spikes].tolist(), row_median[spikes].tolist()):
+            txn = frame.transactions[i]
             asteroids.append(
                 Asteroid(
                     id=_make_id("spending_spike", f"{txn.merchant}_{txn.id}"),
@@ -205,8 +502,8 @@ def _detect_spending_spikes(snapshot: FinancialSnapshot) -> list[Asteroid]:
                     amount=abs(txn.amount),
                     days_until=0,
                     recommended_action="absorb",
-                    reasoning=f"Single purchase of ${abs(txn.amount):.2f} at {txn.merchant} is significantly above the ${avg:.2f} average for {txn.category}. Consider whether this was planned or impulse spending.",
+                    reasoning=f"Single purchase of ${abs(txn.amount):.2f} at {txn.merchant} is significantly above the typical ${median:.2f} for {txn.category}. Consider whether this was planned or impulse spending.",
                 )
             )
 
-    return asteroids
+        return asteroids
@@ -0,0 +1,350 @@
+"""
+Incremental asteroid detection with persisted detector state.
+
+DetectorState keeps what the previous run worked out: per-category
+spending stats (shared.streaming_stats: running mean/variance, median/MAD
+digest, EWMA), per-merchant counts, totals and last-seen dates, the
+snapshot, budget and clock fingerprints, and the current asteroid set
+grouped by rule and partition (see DetectionRule.partition). The outcome
+of a refresh is reported as a diff of added, updated and resolved
+asteroids plus a version number clients can poll.
+
+A refresh after a Nessie sync is handed that sync's SyncDelta (purchases
+that entered and left the window). When the delta follows on from the
+sync the state last saw, only its rows are processed: they update the
+category and merchant stats (O(new), except categories with more rows
+than the digest buffers, which are rebuilt from their rows) and mark
+their categories and merchants dirty. Category rules re-run over the rows
+of dirty categories only, judged against the kept stats. Without a
+matching delta (first run, a missed sync, mock data) the stats are rebuilt
+from the snapshot and every rule re-runs.
+
+A poll that sees the snapshot the state already reflects does no row work.
+Rules that read the clock re-run over all their partitions when its
+fingerprint moves (every CLOCK_RESOLUTION_S); recurring-only rules also do
+whenever the snapshot changes, since a sync can flip the recurring flags
+of rows outside its delta. Either way they only read recurring rows.
+
+DetectorState is a Pydantic model so it can be persisted per user; its
+size follows the number of categories, merchants and asteroids, not the
+transaction history.
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+from services.asteroid_detector import (
+    BATCH_ROWS,
+    RULES,
+    DetectionRule,
+    enabled_rules,
+    input_fingerprints,
+)
+from shared.frame import BUCKETS, TransactionFrame
+from shared.models import Asteroid, BudgetReport, FinancialSnapshot
+from shared.nessie_service import SyncDelta
+from shared.streaming_stats import SpendingProfile, SpendingStats
+
+_INCOME = BUCKETS.index("income")
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class MerchantStats(BaseModel):
+    """Charges from one merchant in the snapshot window."""
+
+    count: int = 0
+    total_cents: int = 0  # Absolute amounts
+    last_seen: datetime | None = None
+
+
+class AsteroidDiff(BaseModel):
+    """Asteroid changes produced by one refresh."""
+
+    added: list[Asteroid] = []
+    updated: list[Asteroid] = []
+    resolved: list[str] = []  # Asteroid ids
+
+    @property
+    def empty(self) -> bool:
+        return not (self.added or self.updated or self.resolved)
+
+
+def run_rule(rule: DetectionRule, budget: BudgetReport) -> list[Asteroid]:
+    """Run a single rule over its whole frame."""
+    if "snapshot" in rule.inputs:
+        for start in range(0, len(rule.frame), BATCH_ROWS):
+            rule.observe(slice(start, min(start + BATCH_ROWS, len(rule.frame))))
+    return rule.finalize(budget)
+
+
+def _partition_column(frame: TransactionFrame, kind: str) -> tuple[np.ndarray, tuple[str, ...]]:
+    """Codes and labels of a partition column ("category" or "merchant")."""
+    if kind == "category":
+        return frame.category_codes, frame.categories
+    return frame.merchant_codes, frame.merchants
+
+
+def _spending_rows(frame: TransactionFrame, categories: set[str] | None = None) -> np.ndarray:
+    """Non-income rows, optionally of the given categories only."""
+    mask = frame.bucket_codes != _INCOME
+    if categories is not None:
+        mask &= frame.category_mask(*categories)
+    return np.flatnonzero(mask)
+
+
+def _category_stats(frame: TransactionFrame, categories: set[str] | None = None) -> dict[str, SpendingStats]:
+    """
+    Spending stats per category built from the frame's rows, observed in
+    the same row batches as run_rules() so digests compress identically.
+    """
+    profile = SpendingProfile()
+    rows = _spending_rows(frame, categories)
+    for start in range(0, len(frame), BATCH_ROWS):
+        profile.observe_frame(frame, rows[(rows >= start) & (rows < start + BATCH_ROWS)])
+    return profile.categories
+
+
+def _merchant_stats(frame: TransactionFrame, merchants: set[str] | None = None) -> dict[str, MerchantStats]:
+    """Per-merchant stats built from the frame's rows."""
+    size = len(frame.merchants)
+    codes = frame.merchant_codes
+    counts = np.bincount(codes, minlength=size)
+    totals = TransactionFrame.group_sum(codes, frame.abs_cents, size)
+    last = np.full(size, np.iinfo(np.int64).min)
+    np.maximum.at(last, codes, frame.date_us)
+    return {
+        label: MerchantStats(
+            count=int(counts[code]),
+            total_cents=int(totals[code]),
+            last_seen=_EPOCH + timedelta(microseconds=int(last[code])),
+        )
+        for code, label in enumerate(frame.merchants)
+        if counts[code] and (merchants is None or label in merchants)
+    }
+
+
+class DetectorState(BaseModel):
+    """Persisted detector state for one user."""
+
+    version: int = 0  # Bumped whenever the asteroid set changes
+    synced_at: datetime | None = None  # Sync whose window the stats reflect
+    categories: dict[str, SpendingStats] = {}  # Non-income spending per category
+    merchants: dict[str, MerchantStats] = {}
+    fingerprints: dict[str, str | int] = {}
+    # threat type -> partition label ("" for unpartitioned rules) -> asteroids
+    asteroids: dict[str, dict[str, list[Asteroid]]] = {}
+    last_diff: AsteroidDiff = Field(default_factory=AsteroidDiff)
+
+    def current(self) -> list[Asteroid]:
+        """Current asteroid set, grouped in rule order."""
+        return [
+            asteroid
+            for rule in RULES
+            for found in self.asteroids.get(rule.threat_type, {}).values()
+            for asteroid in found
+        ]
+
+    def refresh(
+        self,
+        snapshot: FinancialSnapshot,
+        budget: BudgetReport,
+        frame: TransactionFrame | None = None,
+        delta: SyncDelta | None = None,
+    ) -> tuple[AsteroidDiff, dict[str, dict]]:
+        """
+        Bring the asteroid set up to date with a snapshot and budget.
+
+        delta is the sync that produced the snapshot, if the caller ran
+        one. Returns the diff against the previous set (also kept as
+        last_diff when non-empty) and per-rule status/latency metadata in
+        the same shape as run_rules().
+        """
+        if frame is None:
+            frame = TransactionFrame.from_snapshot(snapshot)
+        now = datetime.now(timezone.utc)
+        before = {a.id: a for a in self.current()}
+
+        markers = input_fingerprints(snapshot, budget, frame, None, now)
+        timestamp, size = markers["snapshot"]
+        fingerprints = {
+            "snapshot": f"{timestamp}/{size}",
+            "budget": markers["budget"],
+            "clock": markers["clock"],
+        }
+
+        # Rows only change with the snapshot; polls of the same one skip this
+        snapshot_changed = self.fingerprints.get("snapshot") != fingerprints["snapshot"]
+        rebuild = False
+        dirty: dict[str, set[str]] = {"category": set(), "merchant": set()}
+        if snapshot_changed:
+            if delta is not None and delta.since is not None and delta.since == self.synced_at:
+                dirty = self._apply_delta(frame, delta)
+            else:
+                self.categories = _category_stats(frame)
+                self.merchants = _merchant_stats(frame)
+                rebuild = True
+            self.synced_at = delta.until if delta is not None else None
+        rows_changed = rebuild or bool(dirty["category"] or dirty["merchant"])
+        changed_inputs = {
+            name for name, value in fingerprints.items()
+            if name != "snapshot" and self.fingerprints.get(name) != value
+        }
+        if rows_changed:
+            changed_inputs.add("snapshot")
+
+        profile = SpendingProfile.model_construct(categories=self.categories)
+        meta: dict[str, dict] = {}
+        enabled = enabled_rules()
+        for rule_cls in RULES:
+            name = rule_cls.threat_type
+            meta[name] = {"cost": rule_cls.cost}
+            if rule_cls not in enabled:
+                self.asteroids.pop(name, None)
+                meta[name]["status"] = "disabled"
+                continue
+            if "history" in rule_cls.inputs:
+                self.asteroids.pop(name, None)
+                meta[name]["status"] = "missing_input"
+                continue
+
+            stored = self.asteroids.get(name)
+            kind = rule_cls.partition
+            # Inputs other than the rows themselves invalidate every partition
+            full = rebuild or stored is None or bool((rule_cls.inputs - {"snapshot"}) & changed_inputs)
+            if kind is None:
+                rows_read = "snapshot" in rule_cls.inputs and rows_changed
+                targets = [""] if full or rows_read else []
+            elif full or (rule_cls.recurring_only and snapshot_changed):
+                codes, labels = _partition_column(frame, kind)
+                mask = frame.is_recurring if rule_cls.recurring_only else slice(None)
+                present = {labels[c] for c in np.unique(codes[mask]).tolist()}
+                targets = sorted(present | set(stored or {}))
+            else:
+                targets = sorted(dirty[kind])
+
+            if not targets:
+                meta[name]["status"] = "cached"
+                continue
+
+            start = time.perf_counter()
+            partitions = {} if full else dict(stored)
+            kwargs = {"profile": profile} if rule_cls.category_stats else {}
+            if kind is None:
+                found = run_rule(rule_cls(frame, now, **kwargs), budget)
+                partitions = {"": found} if found else {}
+            else:
+                codes, labels = _partition_column(frame, kind)
+                index = {label: code for code, label in enumerate(labels)}
+                for label in targets:
+                    partitions.pop(label, None)
+                    if label not in index:
+                        continue
+                    mask = codes == index[label]
+                    if rule_cls.recurring_only:
+                        mask &= frame.is_recurring
+                    if not mask.any():
+                        continue
+                    sub = TransactionFrame(frame.rows(mask))
+                    found = run_rule(rule_cls(sub, now, **kwargs), budget)
+                    if found:
+                        partitions[label] = found
+            self.asteroids[name] = partitions
+            meta[name].update(
+                status="ran",
+                partitions=len(targets),
+                ms=round((time.perf_counter() - start) * 1000, 3),
+            )
+
+        self.fingerprints = fingerprints
+
+        after = {a.id: a for a in self.current()}
+        diff = AsteroidDiff(
+            added=[a for i, a in after.items() if i not in before],
+            updated=[a for i, a in after.items() if i in before and before[i] != a],
+            resolved=[i for i in before if i not in after],
+        )
+        if not diff.empty:
+            self.version += 1
+            self.last_diff = diff
+        return diff, meta
+
+    def _apply_delta(self, frame: TransactionFrame, delta: SyncDelta) -> dict[str, set[str]]:
+        """
+        Fold a sync delta into the category and merchant stats.
+
+        Returns the categories and merchants it touched. frame (the new
+        window) is only read for stats that cannot be updated in place.
+        """
+        removed = TransactionFrame(delta.removed)
+        inserted = TransactionFrame(delta.inserted)
+        dirty = {
+            "category": set(removed.categories) | set(inserted.categories),
+            "merchant": set(removed.merchants) | set(inserted.merchants),
+        }
+
+        # Categories: take aged-out spending out, add new spending in
+        stale: set[str] = set()
+        rows = _spending_rows(removed)
+        codes = removed.category_codes[rows]
+        for code in np.unique(codes).tolist():
+            label = removed.categories[code]
+            selected = rows[codes == code]
+            stats = self.categories.get(label)
+            if stats is None or not stats.remove_many(
+                removed.abs_cents[selected] / 100, removed.date_us[selected]
+            ):
+                stale.add(label)
+        added = SpendingProfile()
+        added.observe_frame(inserted)
+        for label, stats in added.categories.items():
+            if label in self.categories:
+                self.categories[label].merge(stats)
+            else:
+                self.categories[label] = stats
+        # Past the digest buffer, merging compresses in a different order
+        # than a full build would: rebuild those categories from their rows
+        stale |= {
+            label for label in dirty["category"]
+            if label in self.categories and self.categories[label].digest.means
+        }
+        for label in dirty["category"]:
+            stats = self.categories.get(label)
+            if stats is not None and stats.count <= 0:
+                del self.categories[label]
+        if stale:
+            for label in stale:
+                self.categories.pop(label, None)
+            self.categories.update(_category_stats(frame, stale))
+
+        # Merchants: counts and totals move by the delta; last_seen only
+        # needs the rows when its latest charge left the window
+        stale = set()
+        for code, label in enumerate(removed.merchants):
+            selected = removed.merchant_codes == code
+            stats = self.merchants.get(label)
+            if stats is None:
+                stale.add(label)
+                continue
+            stats.count -= int(selected.sum())
+            stats.total_cents -= int(removed.abs_cents[selected].sum())
+            latest = _EPOCH + timedelta(microseconds=int(removed.date_us[selected].max()))
+            if stats.count <= 0:
+                del self.merchants[label]
+            elif stats.last_seen is None or latest >= stats.last_seen:
+                stale.add(label)
+        for code, label in enumerate(inserted.merchants):
+            selected = inserted.merchant_codes == code
+            latest = _EPOCH + timedelta(microseconds=int(inserted.date_us[selected].max()))
+            stats = self.merchants.setdefault(label, MerchantStats())
+            stats.count += int(selected.sum())
+            stats.total_cents += int(inserted.abs_cents[selected].sum())
+            if stats.last_seen is None or latest > stats.last_seen:
+                stats.last_seen = latest
+        if stale:
+            for label in stale:
+                self.merchants.pop(label, None)
+            self.merchants.update(_merchant_stats(frame, stale))
+        return dirty
@@ -5,14 +5,15 @@ Fetches accounts and transactions from the Nessie API, normalizes
 into shared Pydantic models, and detects recurring transactions.
 """
 
-from collections import defaultdict
 from datetime import datetime, timedelta, timezone
 
 import httpx
 from aws_lambda_powertools.logging import Logger
 
 from shared.categories import categorize_transaction
+from shared.merchants import DEFAULT_CATEGORIZER
 from shared.models import AccountSummary, FinancialSnapshot, Transaction
+from shared.recurrence import detect_recurring
 
 logger = Logger(service="NessieService")
 
@@ -26,20 +27,6 @@ ACCOUNT_TYPE_MAP = {
     "Credit Card": "credit_card",
 }
 
-# Merchant-to-category overrides for Nessie merchants with unclear categories
-MERCHANT_CATEGORY_MAP = {
-    "Whole Foods": "groceries",
-    "Trader Joes": "groceries",
-    "Costco": "groceries",
-    "Shell Gas": "transportation",
-    "Electric Company": "utilities",
-    "State Farm": "insurance",
-    "CVS Pharmacy": "medical",
-    "Planet Fitness": "gym",
-    "Apartment Complex": "rent",
-}
-
-
 class NessieApiError(Exception):
     """Raised when Nessie API returns an error or is unreachable."""
 
@@ -157,8 +144,8 @@ class NessieService:
             merchant_name = raw["description"]
 
         # Determine category from merchant or Nessie data
-        category = MERCHANT_CATEGORY_MAP.get(
-            merchant_name, raw.get("category", "shopping")
+        category = DEFAULT_CATEGORIZER.categorize(
+            merchant_name, fallback=raw.get("category")
         )
         bucket = categorize_transaction(category)
 
@@ -188,63 +175,5 @@ class NessieService:
     def _detect_recurring(
         self, transactions: list[Transaction]
     ) -> list[Transaction]:
-        """
-        Detect recurring transactions by grouping by merchant.
-
-        Flags as recurring if 2+ transactions from the same merchant within
-        30 days with +/-10% amount variance. Estimates next_expected_date.
-        """
-        # Group by merchant
-        by_merchant: dict[str, list[Transaction]] = defaultdict(list)
-        for txn in transactions:
-            by_merchant[txn.merchant].append(txn)
-
-        updated: list[Transaction] = []
-        for merchant, txns in by_merchant.items():
-            if len(txns) < 2:
-                updated.extend(txns)
-                continue
-
-            # Sort by date
-            txns.sort(key=lambda t: t.date)
-
-            # Check if amounts are consistent (within 10% variance)
-            amounts = [abs(t.amount) for t in txns]
-            avg_amount = sum(amounts) / len(amounts)
-            if avg_amount == 0:
-                updated.extend(txns)
-                continue
-
-            consistent = all(
-                abs(a - avg_amount) / avg_amount <= 0.10 for a in amounts
-            )
-
-            if not consistent:
-                updated.extend(txns)
-                continue
-
-            # Check if they occur within roughly monthly intervals
-            intervals = []
-            for i in range(1, len(txns)):
-                delta = (txns[i].date - txns[i - 1].date).days
-                intervals.append(delta)
-
-            avg_interval = sum(intervals) / len(intervals) if intervals else 30
-
-            # Flag as recurring if average interval is roughly monthly (7-45 days)
-            if 7 <= avg_interval <= 45:
-                last_date = txns[-1].date
-                next_date = last_date + timedelta(days=int(avg_interval))
-                for txn in txns:
-                    updated.append(
-                        txn.model_copy(
-                            update={
-                                "is_recurring": True,
-                                "next_expected_date": next_date,
-                            }
-                        )
-                    )
-            else:
-                updated.extend(txns)
-
-        return updated
+        """Flag recurring transactions via shared.recurrence."""
+        return detect_recurring(transactions)
@@ -2,7 +2,8 @@
 Financial summary report service.
 
 Aggregates transactions into monthly summaries with income vs spending
-ratios and category breakdowns. Nessie API first, DynamoDB cache fallback.
+ratios and category breakdowns. In Nessie mode the months come from
+materialized ROLLUP# items; otherwise they are rolled up from the snapshot.
 """
 
 from collections import defaultdict
@@ -10,6 +11,7 @@ from datetime import datetime, timedelta, timezone
 
 from aws_lambda_powertools.logging import Logger
 
+from shared.frame import TransactionFrame
 from shared.models import (
     AccountsSummary,
     CreditCardSummary,
@@ -17,6 +19,7 @@ from shared.models import (
     FinancialSummaryReport,
     MonthlySummary,
 )
+from shared.rollups import MonthlyRollup, build_rollups
 
 logger = Logger(service="ReportService")
 
@@ -63,41 +66,24 @@ def build_accounts_summary(snapshot: FinancialSnapshot) -> AccountsSummary:
     )
 
 
-def build_monthly_summaries(snapshot: FinancialSnapshot, months: int = 6) -> list[MonthlySummary]:
-    """Aggregate transactions into monthly summaries."""
-    # Group transactions by month
-    by_month: dict[str, list] = defaultdict(list)
+def build_monthly_summaries(
+    snapshot: FinancialSnapshot,
+    months: int = 6,
+    frame: TransactionFrame | None = None,
+) -> list[MonthlySummary]:
+    """Aggregate transactions into monthly summaries, most recent first."""
+    if frame is None:
+        frame = TransactionFrame.from_snapshot(snapshot)
+    rollups = build_rollups(frame)
+    return summaries_from_rollups(rollups, months=months)
 
-    for txn in snapshot.recent_transactions:
-        month_key = txn.date.strftime("%Y-%m")
-        by_month[month_key].append(txn)
 
-    # Build summary for each month
-    summaries = []
-    for month_key in sorted(by_month.keys(), reverse=True)[:months]:
-        txns = by_month[month_key]
-
-        income = sum(t.amount for t in txns if t.bucket == "income")
-        spending = sum(abs(t.amount) for t in txns if t.bucket in ("needs", "wants"))
-
-        # Category breakdown
-        categories: dict[str, float] = defaultdict(float)
-        for txn in txns:
-            if txn.bucket in ("needs", "wants"):
-                categories[txn.category] += abs(txn.amount)
-
-        spending_ratio = spending / income if income > 0 else 0
-
-        summaries.append(MonthlySummary(
-            month=month_key,
-            income=round(income, 2),
-            spending=round(spending, 2),
-            net=round(income - spending, 2),
-            spending_ratio=round(spending_ratio, 2),
-            categories={k: round(v, 2) for k, v in sorted(categories.items())},
-        ))
-
-    return summaries
+def summaries_from_rollups(
+    rollups: list[MonthlyRollup], months: int = 6
+) -> list[MonthlySummary]:
+    """Monthly summaries for the newest rollups, most recent first."""
+    newest = sorted(rollups, key=lambda r: r.month, reverse=True)[:months]
+    return [r.to_summary() for r in newest]
 
 
 def build_aggregate_summary(monthly: list[MonthlySummary]) -> MonthlySummary:
@@ -133,12 +119,24 @@ def build_aggregate_summary(monthly: list[MonthlySummary]) -> MonthlySummary:
     )
 
 
-def build_report(snapshot: FinancialSnapshot, user_id: str) -> FinancialSummaryReport:
-    """Build complete financial summary report from snapshot."""
+def build_report(
+    snapshot: FinancialSnapshot,
+    user_id: str,
+    rollups: list[MonthlyRollup] | None = None,
+) -> FinancialSummaryReport:
+    """Build complete financial summary report.
+
+    Monthly figures come from materialized rollups when given, otherwise
+    from the snapshot's transactions; accounts always come from the
+    snapshot.
+    """
     now = datetime.now(timezone.utc)
 
     accounts = build_accounts_summary(snapshot)
-    monthly = build_monthly_summaries(snapshot, months=6)
+    if rollups:
+        monthly = summaries_from_rollups(rollups, months=6)
+    else:
+        monthly = build_monthly_summaries(snapshot, months=6)
     aggregate = build_aggregate_summary(monthly)
 
     # Determine period from available data
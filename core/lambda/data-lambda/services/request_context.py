@@ -0,0 +1,83 @@
+"""
+Request-scoped data context for the Data Lambda.
+
+Each invocation gets one RequestDataContext. Dependencies (snapshot, its
+TransactionFrame, budget, asteroid states) are loaded lazily through named
+loaders, memoized for the rest of the request, and shared as parsed objects
+across route helpers. Hit/miss counters confirm each dependency is loaded
+only once.
+"""
+
+from collections import defaultdict
+from typing import Any, Callable
+
+from shared.frame import TransactionFrame
+from shared.models import BudgetReport, FinancialSnapshot
+
+Loader = Callable[["RequestDataContext"], Any]
+
+
+class RequestDataContext:
+    """Memoizing loader registry scoped to a single request."""
+
+    def __init__(self, user_id: str, loaders: dict[str, Loader]):
+        self.user_id = user_id
+        self._loaders = loaders
+        self._values: dict[str, Any] = {}
+        self.hits: dict[str, int] = defaultdict(int)
+        self.misses: dict[str, int] = defaultdict(int)
+
+    def get(self, name: str) -> Any:
+        """Return a dependency, loading it on first access."""
+        if name in self._values:
+            self.hits[name] += 1
+            return self._values[name]
+
+        self.misses[name] += 1
+        value = self._loaders[name](self)
+        self._values[name] = value
+        return value
+
+    def peek(self, name: str, default: Any = None) -> Any:
+        """Return a dependency if already loaded, without counting or loading."""
+        return self._values.get(name, default)
+
+    def prime(self, name: str, value: Any) -> None:
+        """Seed a dependency that was produced as a side effect of another load."""
+        self._values.setdefault(name, value)
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Per-dependency hit/miss counters."""
+        names = set(self.hits) | set(self.misses)
+        return {
+            name: {"hits": self.hits[name], "misses": self.misses[name]}
+            for name in sorted(names)
+        }
+
+    # =========================================================================
+    # Typed accessors
+    # =========================================================================
+
+    @property
+    def snapshot_dict(self) -> dict:
+        return self.get("snapshot_dict")
+
+    @property
+    def snapshot(self) -> FinancialSnapshot:
+        return self.get("snapshot")
+
+    @property
+    def frame(self) -> TransactionFrame:
+        return self.get("frame")
+
+    @property
+    def budget_dict(self) -> dict:
+        return self.get("budget_dict")
+
+    @property
+    def budget(self) -> BudgetReport:
+        return self.get("budget")
+
+    @property
+    def asteroid_states(self) -> list[dict]:
+        return self.get("asteroid_states")
@@ -0,0 +1,71 @@
+"""Tests for the asteroid rule registry and the rule result cache."""
+
+import pytest
+
+from services import asteroid_detector
+from services.asteroid_detector import (
+    DISABLED_RULES_ENV,
+    DetectionRule,
+    enabled_rules,
+    register_rule,
+    run_rules,
+)
+from shared.budget_engine import calculate
+from shared.mocks import get_mock_snapshot
+
+
+@pytest.fixture
+def rules(monkeypatch):
+    """A scratch copy of the registry for rules defined by a test."""
+    registry = list(asteroid_detector.RULES)
+    monkeypatch.setattr(asteroid_detector, "RULES", registry)
+    return registry
+
+
+def _rule(**attrs):
+    return type("Rule", (DetectionRule,), {"threat_type": "test_rule", **attrs})
+
+
+def test_register_rule_validates_declarations(rules):
+    for attrs in ({"inputs": frozenset({"weather"})}, {"cost": "free"}, {"partition": "account"}):
+        with pytest.raises(ValueError):
+            register_rule(_rule(**attrs))
+    with pytest.raises(ValueError, match="Duplicate"):
+        register_rule(_rule(threat_type="budget_overrun"))
+
+    rule = register_rule(_rule())
+    assert rules[-1] is rule
+
+def _names(**kwargs):
+    return {rule.threat_type for rule in enabled_rules(**kwargs)}
+
+
+def test_enabled_rules_honours_flags_and_cost(monkeypatch, rules):
+    assert "spending_spike" in _names()
+    assert "spending_spike" not in _names(max_cost="cheap")
+
+    monkeypatch.setenv(DISABLED_RULES_ENV, "unused_service, budget_overrun")
+    assert _names() == {"subscription_renewal", "spending_spike"}
+
+    register_rule(_rule(enabled=False))
+    assert "test_rule" not in _names()
+
+def test_run_rules_serves_unchanged_inputs_from_cache(monkeypatch):
+    # Keep the clock fingerprint still for the duration of the test
+    monkeypatch.setattr(asteroid_detector, "CLOCK_RESOLUTION_S", 10**9)
+    asteroid_detector._results.clear()
+    snapshot = get_mock_snapshot()
+    budget = calculate(snapshot)
+
+    first = run_rules(snapshot, budget, cache_key="cache_user")
+    assert {m["status"] for m in first.rules.values()} == {"ran"}
+    again = run_rules(snapshot, budget, cache_key="cache_user")
+    assert {m["status"] for m in again.rules.values()} == {"cached"}
+    assert again.asteroids == first.asteroids
+
+    # A different budget re-runs only the rule that reads it
+    changed = run_rules(snapshot, budget.model_copy(update={"overall_health": 1.0}), cache_key="cache_user")
+    assert {n for n, m in changed.rules.items() if m["status"] == "ran"} == {"budget_overrun"}
+
+    # Without a cache key every rule runs
+    assert {m["status"] for m in run_rules(snapshot, budget).rules.values()} == {"ran"}
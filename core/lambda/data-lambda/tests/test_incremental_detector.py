@@ -0,0 +1,248 @@
+"""Property tests: incremental asteroid detection matches a full run."""
+
+import json
+from datetime import datetime, timedelta, timezone
+
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+import handler
+from services.asteroid_detector import run_rules
+from services.incremental_detector import DetectorState
+from shared import mocks
+from shared.budget_engine import calculate
+from shared.models import FinancialSnapshot, Transaction
+from shared.nessie_service import SyncDelta
+
+NOW = datetime.now(timezone.utc)
+
+CATEGORIES = ["groceries", "dining", "shopping", "utilities", "salary"]
+MERCHANTS = ["Netflix", "Kroger", "Chipotle", "Amazon", "Comcast"]
+
+transactions = st.builds(
+    lambda category, merchant, cents, age, recurring, due: (category, merchant, cents, age, recurring, due),
+    st.sampled_from(CATEGORIES),
+    st.sampled_from(MERCHANTS),
+    st.integers(min_value=100, max_value=200_000),
+    st.integers(min_value=0, max_value=89),
+    st.booleans(),
+    st.integers(min_value=-2, max_value=30),
+)
+
+# Each step inserts new rows, amends some existing ones and removes others,
+# and either hands the detector the delta (as a sync does) or not
+steps = st.lists(
+    st.tuples(
+        st.lists(transactions, max_size=10),
+        st.lists(st.tuples(st.integers(min_value=0), transactions), max_size=4),
+        st.lists(st.integers(min_value=0), max_size=5),
+        st.booleans(),
+    ),
+    min_size=1,
+    max_size=6,
+)
+
+
+def _txn(txn_id, fields):
+    category, merchant, cents, age, recurring, due = fields
+    income = category == "salary"
+    return Transaction(
+        id=txn_id,
+        account_id="acc",
+        date=NOW - timedelta(days=age),
+        merchant=merchant,
+        category=category,
+        amount=(cents if income else -cents) / 100,
+        is_recurring=recurring,
+        next_expected_date=NOW + timedelta(days=due) if recurring else None,
+        bucket="income" if income else "wants",
+    )
+
+
+def _snapshot(rows, step):
+    return FinancialSnapshot(
+        accounts=[],
+        recent_transactions=sorted(rows.values(), key=lambda t: t.date, reverse=True),
+        total_net_worth=0.0,
+        monthly_income=5000.0,
+        monthly_spending=0.0,
+        snapshot_timestamp=NOW + timedelta(seconds=step),
+    )
+
+
+def _ids(asteroids):
+    return sorted(json.dumps(a.model_dump(mode="json"), sort_keys=True) for a in asteroids)
+
+
+def _stats(state):
+    categories = {
+        label: (s.count, s.digest.median(), s.digest.mad()) for label, s in state.categories.items()
+    }
+    return categories, {label: m.model_dump() for label, m in state.merchants.items()}
+
+
+@settings(max_examples=40, deadline=None)
+@given(initial=st.lists(transactions, max_size=20), steps=steps)
+def test_refresh_matches_full_run(initial, steps):
+    rows = {f"t{i}": _txn(f"t{i}", fields) for i, fields in enumerate(initial)}
+    next_id = len(rows)
+    state = DetectorState()
+    synced_at = None
+    for step, (inserts, amends, removes, synced) in enumerate(steps):
+        previous = dict(rows)
+        for fields in inserts:
+            rows[f"t{next_id}"] = _txn(f"t{next_id}", fields)
+            next_id += 1
+        for pick, fields in amends:
+            if rows:
+                txn_id = sorted(rows)[pick % len(rows)]
+                rows[txn_id] = _txn(txn_id, fields)
+        for pick in removes:
+            if rows:
+                rows.pop(sorted(rows)[pick % len(rows)])
+
+        snapshot = _snapshot(rows, step)
+        budget = calculate(snapshot)
+        until = NOW + timedelta(minutes=step)
+        delta = None
+        if synced:
+            delta = SyncDelta(
+                since=synced_at,
+                until=until,
+                inserted=[t for i, t in rows.items() if previous.get(i) != t],
+                removed=[t for i, t in previous.items() if rows.get(i) != t],
+            )
+        synced_at = until if synced else None
+
+        before = {a.id for a in state.current()}
+        # Persisted between requests
+        state = DetectorState.model_validate_json(state.model_dump_json())
+        diff, _ = state.refresh(snapshot, budget, delta=delta)
+
+        assert _ids(state.current()) == _ids(run_rules(snapshot, budget).asteroids)
+        rebuilt = DetectorState()
+        rebuilt.refresh(snapshot, budget)
+        assert _stats(state) == _stats(rebuilt)
+        after = {a.id for a in state.current()}
+        assert {a.id for a in diff.added} == after - before
+        assert set(diff.resolved) == before - after
+
+
+def test_same_snapshot_runs_nothing():
+    rows = {f"t{i}": _txn(f"t{i}", ("dining", "Chipotle", 1200 + i, i, False, 0)) for i in range(5)}
+    snapshot = _snapshot(rows, 0)
+    budget = calculate(snapshot)
+    state = DetectorState()
+    state.refresh(snapshot, budget)
+    diff, meta = state.refresh(snapshot, budget)
+    assert diff.empty
+    assert {m["status"] for m in meta.values()} == {"cached"}
+
+
+class Ctx:
+    function_name = "data-lambda"
+    memory_limit_in_mb = 128
+    invoked_function_arn = "arn:aws:lambda:us-east-1:123456789012:function:data-lambda"
+    aws_request_id = "req"
+
+
+def _get_asteroids(since=None):
+    event = {
+        "httpMethod": "GET",
+        "path": "/api/asteroids",
+        "resource": "/api/asteroids",
+        "headers": {},
+        "requestContext": {"authorizer": {"claims": {"sub": "since_user"}}},
+        "queryStringParameters": None if since is None else {"since": str(since)},
+        "body": None,
+    }
+    return json.loads(handler.lambda_handler(event, Ctx())["body"])
+
+
+def test_since_returns_changes_only(monkeypatch):
+    monkeypatch.setattr(handler, "DATA_SOURCE", "mock")
+    handler._local_detector_states.clear()
+    base = mocks.get_mock_snapshot()
+    first = _get_asteroids()
+    assert "asteroids" in first and "changes" not in first
+
+    # A purchase far above its category's typical amount
+    groceries = next(t for t in base.recent_transactions if t.category == "groceries")
+    spike = Transaction(**{**groceries.__dict__, "id": "spike", "amount": -5000.0, "date": NOW})
+    spiked = base.model_copy(update={
+        "recent_transactions": [spike, *base.recent_transactions],
+        "snapshot_timestamp": NOW,
+    })
+    monkeypatch.setattr(mocks, "get_mock_snapshot", lambda: spiked)
+
+    second = _get_asteroids(since=first["version"])
+    assert second["version"] == first["version"] + 1
+    added = second["changes"]["added"]
+    assert "spending_spike" in {a["threat_type"] for a in added}
+    assert "asteroids" not in second
+
+    # Up to date: nothing changed; one version behind: the last diff again
+    assert _get_asteroids(since=second["version"])["changes"] == {"added": [], "updated": [], "resolved": []}
+    assert _get_asteroids(since=first["version"])["changes"]["added"] == added
+    assert "asteroids" in _get_asteroids(since=first["version"] - 1)
+
+
+def test_sync_deltas_drive_the_detector():
+    # Weekly Nessie syncs: each hands the detector its delta, so after the
+    # first only the categories that delta touched are re-examined
+    from shared.models import AccountSummary
+    from shared.nessie_service import NessieService
+
+    service = NessieService(api_key="test")
+    account = AccountSummary(account_id="acc", type="credit_card", balance=0, nickname="Card", source="nessie")
+    merchants = ["Kroger", "Chipotle", "Netflix", "Shell Oil", "Amazon"]
+    purchases = []
+    state, detector = None, DetectorState()
+    for week in range(20):
+        day = NOW + timedelta(days=7 * week - 140)
+        for i in range(4):
+            purchases.append({
+                "_id": f"w{week}-{i}",
+                "purchase_date": (day - timedelta(days=i)).date().isoformat(),
+                "amount": 300.0 if (week, i) == (15, 1) else 10.0 * (i + 1) + week % 3,
+                "description": merchants[(week + i) % len(merchants)],
+            })
+        snapshot, state = service._merge_sync(
+            state, [account], {"acc": list(purchases)}, days=90, now=day + timedelta(hours=12)
+        )
+        budget = state.budget.report(snapshot)
+        detector = DetectorState.model_validate_json(detector.model_dump_json())
+        _, meta = detector.refresh(snapshot, budget, delta=state.delta)
+
+        assert _ids(detector.current()) == _ids(run_rules(snapshot, budget).asteroids)
+        if week:
+            dirty = {t.category for t in state.delta.inserted + state.delta.removed}
+            assert meta["spending_spike"].get("partitions", 0) == len(dirty)
+    assert "spending_spike" in {a.threat_type for a in detector.current()}
+    assert "rows" not in detector.model_dump()
+
+
+def test_large_category_is_rebuilt_from_its_rows():
+    # More purchases than the digest buffers: merged stats would compress
+    # differently from a full build, so the category is rebuilt instead
+    rows = {
+        f"g{i}": _txn(f"g{i}", ("groceries", "Kroger", 2000 + (i * 37) % 900, i % 90, False, 0))
+        for i in range(700)
+    }
+    snapshot = _snapshot(rows, 0)
+    state = DetectorState()
+    state.refresh(snapshot, calculate(snapshot), delta=SyncDelta(until=NOW))
+    assert state.categories["groceries"].digest.means
+
+    removed = [rows.pop(f"g{i}") for i in range(40)]
+    inserted = [_txn("big", ("groceries", "Kroger", 90_000, 0, False, 0))]
+    rows["big"] = inserted[0]
+    snapshot = _snapshot(rows, 1)
+    budget = calculate(snapshot)
+    delta = SyncDelta(since=NOW, until=NOW + timedelta(minutes=1), inserted=inserted, removed=removed)
+    state.refresh(snapshot, budget, delta=delta)
+
+    assert _ids(state.current()) == _ids(run_rules(snapshot, budget).asteroids)
+    rebuilt = DetectorState()
+    rebuilt.refresh(snapshot, budget)
+    assert _stats(state) == _stats(rebuilt)
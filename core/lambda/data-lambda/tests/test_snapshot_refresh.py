@@ -0,0 +1,141 @@
+"""Tests for serving stale data while a refresh runs in the background."""
+
+import json
+
+import pytest
+
+import handler
+from shared.budget_engine import calculate
+from shared.frame import TransactionFrame
+from shared.mocks import get_mock_snapshot
+from shared.rollups import build_rollups
+from shared.ttl_cache import TTLCache
+
+
+class FakeTable:
+    """The DataTableClient calls the refresh paths make, in memory."""
+
+    def __init__(self):
+        self.snapshot = None
+        self.stale = False
+        self.rollups: list[dict] = []
+        self.locks: set[tuple[str, str]] = set()
+        self.cached: dict[str, dict] = {}
+        self.l1 = TTLCache()
+
+    def get_snapshot_allow_stale(self, user_id):
+        return self.snapshot, self.stale
+
+    def get_rollups(self, user_id, months=6):
+        return self.rollups[:months]
+
+    def acquire_refresh_lock(self, user_id, name):
+        if (user_id, name) in self.locks:
+            return False
+        self.locks.add((user_id, name))
+        return True
+
+    def release_refresh_lock(self, user_id, name):
+        self.locks.discard((user_id, name))
+
+    def cache_snapshot(self, user_id, snapshot_dict):
+        self.cached["snapshot"] = snapshot_dict
+
+    def cache_budget(self, user_id, budget_dict):
+        self.cached["budget"] = budget_dict
+
+
+class Ctx:
+    function_name = "data-lambda"
+    memory_limit_in_mb = 128
+    invoked_function_arn = "arn:aws:lambda:us-east-1:123456789012:function:data-lambda"
+    aws_request_id = "req"
+
+
+@pytest.fixture
+def table(monkeypatch):
+    table = FakeTable()
+    monkeypatch.setattr(handler, "DATA_SOURCE", "nessie")
+    monkeypatch.setattr(handler, "_data_table_client", table)
+    return table
+
+
+class FakeLambda:
+    """Records async self-invokes."""
+
+    def __init__(self):
+        self.invokes: list[dict] = []
+
+    def invoke(self, **kwargs):
+        self.invokes.append(kwargs)
+
+
+def _get(path, params=None):
+    event = {
+        "httpMethod": "GET",
+        "path": path,
+        "resource": path,
+        "headers": {},
+        "requestContext": {"authorizer": {"claims": {"sub": "stale_user"}}},
+        "queryStringParameters": params,
+        "body": None,
+    }
+    return json.loads(handler.lambda_handler(event, Ctx())["body"])
+
+
+def test_stale_report_schedules_a_refresh(table, monkeypatch):
+    snapshot = get_mock_snapshot()
+    table.snapshot = snapshot.model_dump(mode="json")
+    table.rollups = [
+        r.model_dump(mode="json")
+        for r in reversed(build_rollups(TransactionFrame(snapshot.recent_transactions)))
+    ]
+    scheduled = []
+    monkeypatch.setattr(handler, "_schedule_snapshot_refresh", scheduled.append)
+    monkeypatch.setattr(handler, "_sync_nessie_snapshot", pytest.fail)
+
+    _get("/api/report/summary", {"user_id": "u1"})
+    assert scheduled == []
+
+    table.stale = True
+    report = _get("/api/report/summary", {"user_id": "u1"})
+    assert scheduled == ["u1"]
+    assert len(report["monthly"]) == len(table.rollups[:6])
+
+
+def test_stale_snapshot_is_served_while_one_refresh_runs(table, monkeypatch):
+    table.snapshot = get_mock_snapshot().model_dump(mode="json")
+    table.stale = True
+    fake_lambda = FakeLambda()
+    monkeypatch.setenv("AWS_LAMBDA_FUNCTION_NAME", "data-lambda")
+    monkeypatch.setattr(handler, "_lambda_client", fake_lambda)
+    monkeypatch.setattr(handler, "_sync_nessie_snapshot", pytest.fail)
+
+    for _ in range(3):
+        assert _get("/api/snapshot") == table.snapshot
+
+    # The first stale read takes the lock; the rest see it held
+    assert table.locks == {("stale_user", handler.SNAPSHOT_REFRESH_LOCK)}
+    (invoke,) = fake_lambda.invokes
+    assert invoke["FunctionName"] == "data-lambda"
+    assert invoke["InvocationType"] == "Event"
+    assert json.loads(invoke["Payload"]) == {"action": "refresh_snapshot", "user_id": "stale_user"}
+
+
+def test_refresh_event_rewrites_the_cache_and_releases_the_lock(table, monkeypatch):
+    snapshot = get_mock_snapshot()
+    event = {"action": "refresh_snapshot", "user_id": "stale_user"}
+    monkeypatch.setattr(handler, "_sync_nessie_snapshot", lambda user_id: (snapshot, calculate(snapshot)))
+
+    table.locks.add(("stale_user", handler.SNAPSHOT_REFRESH_LOCK))
+    assert handler.lambda_handler(event, Ctx()) == {"status": "refreshed", "user_id": "stale_user"}
+    assert table.cached["snapshot"] == snapshot.model_dump(mode="json")
+    assert "budget" in table.cached
+    assert not table.locks
+
+    def fail(user_id):
+        raise RuntimeError("nessie down")
+    monkeypatch.setattr(handler, "_sync_nessie_snapshot", fail)
+    table.locks.add(("stale_user", handler.SNAPSHOT_REFRESH_LOCK))
+    assert handler.lambda_handler(event, Ctx()) == {"status": "failed", "user_id": "stale_user"}
+    assert not table.locks
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+"""
+Benchmark per-transaction construction and serialization costs.
+
+Compares the ways Transaction objects get built and round-tripped on the
+hot paths (Nessie normalization, recurring flags, snapshot cache reads,
+agent slices) so changes to them can be checked against numbers.
+
+Usage:
+    cd core && python scripts/bench_transactions.py [--rows 10000 100000] [--users 2000]
+"""
+
+import json
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from pydantic_core import to_json
+
+from shared.budget_engine import calculate, calculate_many
+from shared.frame import TransactionFrame
+from shared.merchants import MerchantCategorizer, MERCHANT_PATTERNS
+from shared.models import FinancialSnapshot, Transaction
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "lambda" / "data-lambda"))
+from services.asteroid_detector import detect  # noqa: E402
+
+NOW = datetime.now(timezone.utc)
+
+
+def _fields(n: int) -> list[dict]:
+    return [
+        {
+            "id": f"txn_{i}",
+            "account_id": "acc_1",
+            "date": NOW - timedelta(days=i % 180),
+            "merchant": f"Merchant {i % 250}",
+            "category": "groceries",
+            "amount": -round(5 + (i % 97) * 1.13, 2),
+            "is_recurring": i % 5 == 0,
+            "next_expected_date": NOW + timedelta(days=i % 30) if i % 5 == 0 else None,
+            "bucket": "needs",
+        }
+        for i in range(n)
+    ]
+
+
+def _time(label: str, n: int, fn) -> object:
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<44} {elapsed * 1e6 / n:8.2f} us/item {elapsed * 1e3:9.1f} ms")
+    return result
+
+
+def run(n: int) -> None:
+    print(f"\n{n:,} transactions")
+    fields = _fields(n)
+
+    print(" construction")
+    txns = _time("Transaction(**fields)  [validated]", n, lambda: [Transaction(**f) for f in fields])
+    _time("Transaction.model_construct(**fields)", n, lambda: [Transaction.model_construct(**f) for f in fields])
+
+    print(" recurring flag copy")
+    _time("model_copy(update=...)", n, lambda: [
+        t.model_copy(update={"is_recurring": True, "next_expected_date": NOW}) for t in txns
+    ])
+    _time("Transaction(**{**t.__dict__, ...})", n, lambda: [
+        Transaction(**{**t.__dict__, "is_recurring": True, "next_expected_date": NOW}) for t in txns
+    ])
+
+    snapshot = FinancialSnapshot(
+        accounts=[],
+        recent_transactions=txns,
+        total_net_worth=0.0,
+        monthly_income=0.0,
+        monthly_spending=0.0,
+        snapshot_timestamp=NOW,
+    )
+
+    print(" serialization")
+    _time("json.dumps([t.model_dump(mode='json')])", n, lambda: json.dumps(
+        [t.model_dump(mode="json") for t in txns]
+    ))
+    _time("pydantic_core.to_json(txns)", n, lambda: to_json(txns))
+    snapshot_dict = _time("snapshot.model_dump(mode='json')", n, lambda: snapshot.model_dump(mode="json"))
+    snapshot_json = _time("snapshot.model_dump_json()", n, snapshot.model_dump_json)
+
+    print(" asteroid detection")
+    budget = calculate(snapshot)
+    _time("detect(snapshot, budget)  [frame built]", n, lambda: detect(snapshot, budget))
+    frame = TransactionFrame.from_snapshot(snapshot)
+    detect(snapshot, budget, frame=frame)
+    _time("detect(snapshot, budget, frame)  [warm]", n, lambda: detect(snapshot, budget, frame=frame))
+
+    print(" parsing")
+    _time("FinancialSnapshot.model_validate(dict)", n, lambda: FinancialSnapshot.model_validate(snapshot_dict))
+    _time("FinancialSnapshot.model_validate_json(str)", n, lambda: FinancialSnapshot.model_validate_json(snapshot_json))
+
+    # Realistic descriptors: known merchants with store numbers, plus noise
+    names = [d[0] for _, _, d in MERCHANT_PATTERNS.values()]
+    descriptors = [
+        f"POS {names[i % len(names)].upper()} #{i:06d} CITY {i % 50}"
+        if i % 4 else f"LOCAL SHOP {i} MAIN ST"
+        for i in range(n)
+    ]
+    print(" merchant categorization")
+    cold = MerchantCategorizer(memo_size=0)
+    _time("categorize_many  [no memo, all unique]", n, lambda: cold.categorize_many(descriptors))
+    warm = MerchantCategorizer()
+    repeated = [descriptors[i % 500] for i in range(n)]
+    _time("categorize_many  [memo, 500 merchants]", n, lambda: warm.categorize_many(repeated))
+
+
+def run_users(n_users: int, per_user: int = 60) -> None:
+    """Per-snapshot calculate() loop vs one calculate_many() pass."""
+    print(f"\n{n_users:,} users x {per_user} transactions")
+    txns = [Transaction(**f) for f in _fields(per_user * 4)]
+    snapshots = [
+        FinancialSnapshot(
+            accounts=[],
+            recent_transactions=txns[(u * 7) % (per_user * 3):][:per_user],
+            total_net_worth=0.0,
+            monthly_income=4000.0 + u % 3000,
+            monthly_spending=0.0,
+            snapshot_timestamp=NOW,
+        )
+        for u in range(n_users)
+    ]
+    print(" budgets")
+    _time("[calculate(s) for s in snapshots]", n_users, lambda: [calculate(s) for s in snapshots])
+    _time("calculate_many(snapshots)", n_users, lambda: calculate_many(snapshots))
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark Transaction construction paths")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--users", type=int, default=2_000)
+    args = parser.parse_args()
+
+    for n in args.rows:
+        run(n)
+    if args.users:
+        run_users(args.users)
+
+
+if __name__ == "__main__":
+    main()
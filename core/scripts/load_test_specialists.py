@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""
+Load-test the specialist limiter against the local fake Bedrock model.
+
+Runs --users concurrent complete analyses (7 specialists each) on mock data
+with the result cache off. The fake model throttles like Bedrock once its
+quotas are exceeded; the report shows how many specialists still got a
+real answer, per-status counts, latency and the limiter's end state.
+
+Usage:
+    cd core && python scripts/load_test_specialists.py [--users 20] [--rpm 200] [--tpm 400000]
+        [--fake-rpm 120] [--fake-concurrency 10]
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from collections import Counter
+
+os.environ["SPECIALIST_FAKE_MODEL"] = "true"
+os.environ["SPECIALIST_CACHE_ENABLED"] = "false"
+os.environ.setdefault("DATA_SOURCE", "mock")
+os.environ.setdefault("PYDANTIC_AI_NO_BANNER", "1")
+
+from agent.orchestrator import analyze_finances  # noqa: E402
+from agent.specialists import base, limiter  # noqa: E402
+from agent.specialists.fake_model import FakeBedrockModel  # noqa: E402
+
+
+async def run(args: argparse.Namespace) -> None:
+    fake = FakeBedrockModel(rpm=args.fake_rpm, max_concurrency=args.fake_concurrency)
+    base.haiku_model.wrapped = fake
+    limiter.LIMITER = limiter.AdaptiveLimiter(
+        rpm=args.rpm, tpm=args.tpm, max_concurrency=args.max_concurrency
+    )
+
+    start = time.perf_counter()
+    analyses = await asyncio.gather(
+        *(analyze_finances(f"load_user_{i}", budget_s=args.budget) for i in range(args.users))
+    )
+    elapsed = time.perf_counter() - start
+
+    outcomes = [o for a in analyses for o in a.specialist_outcomes.values()]
+    statuses = Counter(o.status for o in outcomes)
+    latencies = sorted(o.elapsed_ms for o in outcomes)
+
+    def pct(q: float) -> float:
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+    print(f"\n{args.users} analyses, {len(outcomes)} specialist runs in {elapsed:.1f} s")
+    print(f"  outcomes            {dict(statuses)}")
+    print(f"  latency ms          p50 {pct(0.5):.0f}  p95 {pct(0.95):.0f}  max {latencies[-1]:.0f}")
+    print(f"  fake model          calls {fake.calls}  throttled {fake.throttles}")
+    print(f"  limiter             {limiter.LIMITER.stats()}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--budget", type=float, default=50.0, help="Per-analysis budget, seconds")
+    parser.add_argument("--rpm", type=float, default=limiter.BEDROCK_RPM)
+    parser.add_argument("--tpm", type=float, default=limiter.BEDROCK_TPM)
+    parser.add_argument("--max-concurrency", type=int, default=limiter.BEDROCK_MAX_CONCURRENCY)
+    parser.add_argument("--fake-rpm", type=float, default=120)
+    parser.add_argument("--fake-concurrency", type=int, default=10)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
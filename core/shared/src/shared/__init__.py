@@ -12,9 +12,12 @@ from shared.categories import (
     SAVINGS,
     WANTS,
     BucketType,
+    CategoryIndex,
+    categorize_many,
     categorize_transaction,
 )
-from shared.budget_engine import calculate as calculate_budget
+from shared.budget_engine import BudgetAccumulator, calculate as calculate_budget
+from shared.merchants import MerchantCategorizer, MerchantMatch
 from shared.models import (
     AccountSummary,
     Asteroid,
@@ -26,7 +29,16 @@ from shared.models import (
     VisaAlert,
     VisaControlRule,
 )
-from shared.nessie_service import NessieApiError, NessieService
+from shared.nessie_service import (
+    AsyncNessieService,
+    NessieApiError,
+    NessieService,
+    NessieSyncState,
+    SyncDelta,
+)
+from shared.recurrence import RecurrenceState, detect_recurring
+from shared.streaming_stats import SpendingProfile, SpendingStats
+from shared.ttl_cache import TTLCache
 
 __all__ = [
     # Models
@@ -40,8 +52,19 @@ __all__ = [
     "VisaAlert",
     "CaptainResponse",
     "NessieService",
+    "AsyncNessieService",
     "NessieApiError",
+    "NessieSyncState",
+    "SyncDelta",
     "calculate_budget",
+    "BudgetAccumulator",
+    "RecurrenceState",
+    "detect_recurring",
+    "SpendingProfile",
+    "SpendingStats",
+    "TTLCache",
+    "MerchantCategorizer",
+    "MerchantMatch",
     # Categories
     "NEEDS",
     "WANTS",
@@ -49,5 +72,7 @@ __all__ = [
     "INCOME",
     "BUDGET_TARGETS",
     "BucketType",
+    "CategoryIndex",
     "categorize_transaction",
+    "categorize_many",
 ]
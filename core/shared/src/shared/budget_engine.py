@@ -1,57 +1,139 @@
 """
 50/30/20 Budget Engine for SynesthesiaPay.
 
-Stateless calculator that takes a FinancialSnapshot and produces
-a BudgetReport with bucket breakdowns, health score, and overspend analysis.
+Takes a FinancialSnapshot and produces a BudgetReport with bucket
+breakdowns, health score, and overspend analysis.
+
+calculate() aggregates the snapshot's transactions from scratch.
+BudgetAccumulator keeps the same per-bucket, per-category cent totals as
+persistent state and applies inserted/removed transactions in O(delta);
+both paths feed one report builder, so for the same transactions they
+produce identical reports. calculate_many() batches many users' snapshots
+through a single frame for bulk refreshes.
 """
 
-from collections import defaultdict
+from itertools import chain
+from typing import Iterable, Sequence
 
+import numpy as np
 from aws_lambda_powertools.logging import Logger
+from pydantic import BaseModel
 
 from shared.categories import BUDGET_TARGETS
-from shared.models import BucketBreakdown, BudgetReport, FinancialSnapshot
+from shared.frame import BUCKETS, TransactionFrame
+from shared.models import (
+    AccountSummary,
+    BucketBreakdown,
+    BudgetReport,
+    FinancialSnapshot,
+    Transaction,
+)
 
 logger = Logger(service="BudgetEngine")
 
+SPENDING_BUCKETS = ("needs", "wants", "savings")
+
+# bucket -> category -> (transaction count, absolute cents)
+CategoryTotals = dict[str, dict[str, tuple[int, int]]]
+
 
-def calculate(snapshot: FinancialSnapshot) -> BudgetReport:
+def calculate(
+    snapshot: FinancialSnapshot, frame: TransactionFrame | None = None
+) -> BudgetReport:
     """
     Calculate 50/30/20 budget report from a financial snapshot.
 
     Separates transactions by bucket, computes actual vs target for each,
     derives overall health score and identifies overspend categories.
+    Pass the snapshot's TransactionFrame if the caller already built one.
     """
-    monthly_income = snapshot.monthly_income
+    if frame is None:
+        frame = TransactionFrame.from_snapshot(snapshot)
+
+    totals: CategoryTotals = {}
+    for bucket_name in SPENDING_BUCKETS:
+        counts, cents = frame.category_totals(frame.bucket_mask(bucket_name))
+        totals[bucket_name] = {
+            frame.categories[code]: (int(counts[code]), int(cents[code]))
+            for code in counts.nonzero()[0]
+        }
+
+    return build_report(snapshot.monthly_income, totals, snapshot.accounts)
+
+
+def calculate_many(snapshots: Sequence[FinancialSnapshot]) -> list[BudgetReport]:
+    """
+    Budget reports for many snapshots (typically one per user) in one pass.
+
+    All transactions go into one TransactionFrame tagged with the index of
+    their snapshot; (snapshot, bucket, category) totals come from a single
+    grouped reduction instead of one frame and one set of masks per user.
+    Returns reports in snapshot order, identical to calling calculate()
+    on each.
+    """
+    lengths = [len(s.recent_transactions) for s in snapshots]
+    frame = TransactionFrame(
+        list(chain.from_iterable(s.recent_transactions for s in snapshots))
+    )
+    owner = np.repeat(np.arange(len(snapshots), dtype=np.int64), lengths)
+
+    spending = frame.bucket_mask(*SPENDING_BUCKETS)
+    n_categories = max(len(frame.categories), 1)
+    n_buckets = len(BUCKETS)
+    key = (
+        owner[spending] * n_buckets + frame.bucket_codes[spending]
+    ) * n_categories + frame.category_codes[spending]
+    groups, inverse = np.unique(key, return_inverse=True)
+    counts = np.bincount(inverse, minlength=len(groups))
+    cents = frame.group_sum(inverse, frame.abs_cents[spending], len(groups))
+
+    # Decode each group key back into (snapshot, bucket, category)
+    group_category = groups % n_categories
+    group_bucket = (groups // n_categories) % n_buckets
+    group_owner = groups // (n_categories * n_buckets)
+
+    totals: list[CategoryTotals] = [{} for _ in snapshots]
+    for i, b, c, n, total in zip(
+        group_owner.tolist(),
+        group_bucket.tolist(),
+        group_category.tolist(),
+        counts.tolist(),
+        cents.tolist(),
+    ):
+        totals[i].setdefault(BUCKETS[b], {})[frame.categories[c]] = (n, total)
+
+    return [
+        build_report(s.monthly_income, t, s.accounts)
+        for s, t in zip(snapshots, totals)
+    ]
+
+
+def build_report(
+    monthly_income: float,
+    totals: CategoryTotals,
+    accounts: list[AccountSummary],
+) -> BudgetReport:
+    """Turn per-bucket category totals into a BudgetReport."""
     if monthly_income <= 0:
         logger.warning("Monthly income is zero or negative, using 1.0 to avoid division by zero")
         monthly_income = 1.0
 
-    # Separate spending transactions by bucket (skip income)
-    bucket_transactions: dict[str, list] = {
-        "needs": [],
-        "wants": [],
-        "savings": [],
-    }
-    for txn in snapshot.recent_transactions:
-        if txn.bucket in bucket_transactions:
-            bucket_transactions[txn.bucket].append(txn)
-
-    # Build breakdown for each bucket
+    # Build breakdown for each spending bucket (income is skipped)
     buckets: dict[str, BucketBreakdown] = {}
-    for bucket_name in ("needs", "wants", "savings"):
+    for bucket_name in SPENDING_BUCKETS:
         target_pct = BUDGET_TARGETS[bucket_name]
         target_amount = monthly_income * target_pct
-        txns = bucket_transactions[bucket_name]
+        categories = totals.get(bucket_name, {})
 
         # Compute actual spending (absolute values)
-        actual_amount = sum(abs(t.amount) for t in txns)
+        actual_amount = sum(cents for _, cents in categories.values()) / 100
         actual_pct = actual_amount / monthly_income
 
-        # Category breakdown
-        breakdown: dict[str, float] = defaultdict(float)
-        for txn in txns:
-            breakdown[txn.category] += abs(txn.amount)
+        # Category breakdown, in name order so both engines agree
+        breakdown = {
+            category: categories[category][1] / 100
+            for category in sorted(categories)
+        }
 
         # Determine status
         if actual_pct <= target_pct:
@@ -67,7 +149,7 @@ def calculate(snapshot: FinancialSnapshot) -> BudgetReport:
             actual_amount=round(actual_amount, 2),
             actual_pct=round(actual_pct, 3),
             status=status,
-            breakdown=dict(breakdown),
+            breakdown=breakdown,
         )
 
     # Overall health: start at 100, deduct proportionally for deviation
@@ -104,7 +186,7 @@ def calculate(snapshot: FinancialSnapshot) -> BudgetReport:
 
     # Credit card impact: sum of absolute credit card balances
     credit_card_impact = sum(
-        abs(a.balance) for a in snapshot.accounts if a.type == "credit_card"
+        abs(a.balance) for a in accounts if a.type == "credit_card"
     )
 
     return BudgetReport(
@@ -116,3 +198,79 @@ def calculate(snapshot: FinancialSnapshot) -> BudgetReport:
         overspend_categories=overspend_categories,
         credit_card_impact=round(credit_card_impact, 2),
     )
+
+
+def _abs_cents(amount: float) -> int:
+    """Absolute cents, rounded exactly like TransactionFrame.abs_cents."""
+    return abs(round(amount * 100))
+
+
+class BudgetAccumulator(BaseModel):
+    """
+    Running budget aggregates, updated from transaction deltas.
+
+    entries records what each counted transaction contributed so removals
+    and amended transactions can be reversed without the original object.
+    Only spending-bucket transactions are tracked; income enters the
+    report through the snapshot's monthly_income.
+    """
+
+    entries: dict[str, tuple[str, str, int]] = {}  # id -> (bucket, category, cents)
+    totals: CategoryTotals = {}
+
+    def _add(self, bucket: str, category: str, count: int, cents: int) -> None:
+        categories = self.totals.setdefault(bucket, {})
+        prev_count, prev_cents = categories.get(category, (0, 0))
+        if prev_count + count == 0:
+            del categories[category]
+        else:
+            categories[category] = (prev_count + count, prev_cents + cents)
+
+    def apply(
+        self,
+        inserted: Iterable[Transaction] = (),
+        removed: Iterable[str] = (),
+    ) -> int:
+        """
+        Remove transaction ids, then insert or amend transactions.
+
+        Re-inserting an unchanged transaction is a no-op. Returns how many
+        entries changed.
+        """
+        changed = 0
+        for txn_id in removed:
+            entry = self.entries.pop(txn_id, None)
+            if entry is not None:
+                self._add(entry[0], entry[1], -1, -entry[2])
+                changed += 1
+
+        for txn in inserted:
+            entry = None
+            if txn.bucket in SPENDING_BUCKETS:
+                entry = (txn.bucket, txn.category, _abs_cents(txn.amount))
+            previous = self.entries.get(txn.id)
+            if previous == entry:
+                continue
+            if previous is not None:
+                self._add(previous[0], previous[1], -1, -previous[2])
+                del self.entries[txn.id]
+            if entry is not None:
+                self._add(entry[0], entry[1], 1, entry[2])
+                self.entries[txn.id] = entry
+            changed += 1
+        return changed
+
+    def sync(self, transactions: list[Transaction]) -> int:
+        """
+        Bring the aggregates in line with a transaction list.
+
+        Diffs ids against the tracked entries and applies only the
+        difference; returns how many entries changed.
+        """
+        current = {t.id for t in transactions}
+        removed = [txn_id for txn_id in self.entries if txn_id not in current]
+        return self.apply(inserted=transactions, removed=removed)
+
+    def report(self, snapshot: FinancialSnapshot) -> BudgetReport:
+        """BudgetReport for the snapshot this accumulator is synced to."""
+        return build_report(snapshot.monthly_income, self.totals, snapshot.accounts)
@@ -6,7 +6,8 @@ WANTS (30%): Lifestyle/discretionary spending
 SAVINGS (20%): Future financial security
 """
 
-from typing import Literal
+from types import MappingProxyType
+from typing import Iterable, Literal, Mapping
 
 # 50% - Life Support (essential expenses)
 NEEDS: list[str] = [
@@ -63,22 +64,102 @@ INCOME: list[str] = [
 
 BucketType = Literal["needs", "wants", "savings", "income"]
 
+BUDGET_BUCKETS: tuple[BucketType, ...] = ("needs", "wants", "savings", "income")
 
-def categorize_transaction(category: str) -> BucketType:
+# Bucket for categories nobody has mapped (conservative)
+DEFAULT_BUCKET: BucketType = "wants"
+
+
+def normalize_category(category: str) -> str:
+    """Lookup form of a category: lowercase, otherwise spelled as given."""
+    return category.lower()
+
+
+class CategoryIndex:
+    """
+    Immutable category -> bucket lookup.
+
+    Built once from the bucket lists; per-user aliases ("netflix" ->
+    "streaming") and per-tenant bucket overrides ("gym" -> "needs") are
+    layered on with extend(), which returns a new index and leaves the
+    original untouched.
+    """
+
+    __slots__ = ("_buckets",)
+
+    def __init__(self, buckets: Mapping[str, BucketType]):
+        self._buckets: Mapping[str, BucketType] = MappingProxyType(
+            {normalize_category(c): b for c, b in buckets.items()}
+        )
+
+    @classmethod
+    def from_lists(cls) -> "CategoryIndex":
+        """Index over NEEDS, WANTS, SAVINGS and INCOME."""
+        buckets: dict[str, BucketType] = {}
+        for bucket, categories in (
+            ("needs", NEEDS), ("wants", WANTS), ("savings", SAVINGS), ("income", INCOME)
+        ):
+            for category in categories:
+                buckets.setdefault(normalize_category(category), bucket)
+        return cls(buckets)
+
+    def extend(
+        self,
+        aliases: Mapping[str, str] | None = None,
+        overrides: Mapping[str, BucketType] | None = None,
+    ) -> "CategoryIndex":
+        """
+        New index with aliases and bucket overrides applied.
+
+        aliases maps a new category name to an existing one and inherits its
+        bucket (resolved against this index, before overrides); overrides
+        pin a category to a bucket outright and win over everything else.
+        """
+        buckets = dict(self._buckets)
+        for alias, target in (aliases or {}).items():
+            buckets[normalize_category(alias)] = self.bucket(target)
+        for category, bucket in (overrides or {}).items():
+            if bucket not in BUDGET_BUCKETS:
+                raise ValueError(f"Unknown bucket for {category!r}: {bucket!r}")
+            buckets[normalize_category(category)] = bucket
+        return CategoryIndex(buckets)
+
+    def bucket(self, category: str) -> BucketType:
+        """Bucket for one category, DEFAULT_BUCKET if unmapped."""
+        found = self._buckets.get(category)
+        if found is None:
+            found = self._buckets.get(normalize_category(category), DEFAULT_BUCKET)
+        return found
+
+    def categorize_many(self, categories: Iterable[str]) -> list[BucketType]:
+        """Buckets for a batch of categories, resolving each distinct one once."""
+        categories = list(categories)
+        resolved = {c: self.bucket(c) for c in set(categories)}
+        return [resolved[c] for c in categories]
+
+    def __contains__(self, category: str) -> bool:
+        return normalize_category(category) in self._buckets
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+# Index used when no tenant-specific one is supplied
+DEFAULT_INDEX = CategoryIndex.from_lists()
+
+
+def categorize_transaction(
+    category: str, index: CategoryIndex = DEFAULT_INDEX
+) -> BucketType:
     """Map a transaction category to a 50/30/20 bucket."""
-    category_lower = category.lower()
-
-    if category_lower in [c.lower() for c in NEEDS]:
-        return "needs"
-    elif category_lower in [c.lower() for c in WANTS]:
-        return "wants"
-    elif category_lower in [c.lower() for c in SAVINGS]:
-        return "savings"
-    elif category_lower in [c.lower() for c in INCOME]:
-        return "income"
-    else:
-        # Default unknown categories to wants (conservative)
-        return "wants"
+    return index.bucket(category)
+
+
+def categorize_many(
+    categories: Iterable[str], index: CategoryIndex = DEFAULT_INDEX
+) -> list[BucketType]:
+    """Map a batch of categories to 50/30/20 buckets."""
+    return index.categorize_many(categories)
 
 
 # Target percentages for 50/30/20 budget
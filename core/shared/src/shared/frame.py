@@ -0,0 +1,236 @@
+"""
+Columnar, NumPy-backed view of a transaction list.
+
+Analytics code (budget engine, asteroid detection, monthly reports, agent
+slices) repeatedly scans list[Transaction], reading Pydantic attributes and
+calling abs() per row. TransactionFrame extracts those columns once per
+snapshot so grouped sums, filters and per-category stats run vectorized.
+
+Amounts are held as int64 cents so grouped sums are exact; dates as int64
+microseconds since the Unix epoch (UTC); category, merchant and bucket as
+small integer codes into interned label tuples. The source transactions are
+kept so rules can turn selected row indices back into Transaction objects.
+"""
+
+from datetime import datetime, timedelta, timezone
+from functools import cached_property
+from operator import attrgetter
+from typing import Sequence
+
+import numpy as np
+
+from shared.models import FinancialSnapshot, Transaction
+
+BUCKETS: tuple[str, ...] = ("needs", "wants", "savings", "income")
+
+# Bucket code for transactions without a bucket, and date value for "no date"
+NO_BUCKET = -1
+NO_DATE = np.iinfo(np.int64).min
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_US_PER_DAY = 86_400_000_000
+
+
+def to_epoch_us(value: datetime) -> int:
+    """Convert a datetime to integer microseconds since the epoch (naive = UTC)."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - _EPOCH) // timedelta(microseconds=1)
+
+
+def _epoch_seconds(values: list[datetime | None]) -> list[float]:
+    """Float epoch seconds (naive = UTC); NaN for missing dates."""
+    return [
+        np.nan if d is None
+        else d.timestamp() if d.tzinfo is not None
+        else d.replace(tzinfo=timezone.utc).timestamp()
+        for d in values
+    ]
+
+
+def _seconds_to_us(seconds: list[float]) -> np.ndarray:
+    """
+    Float epoch seconds -> int64 microseconds, NaN -> NO_DATE.
+
+    A float64 timestamp resolves well under a microsecond for present-day
+    dates, so rounding recovers the exact microsecond.
+    """
+    values = np.array(seconds, dtype=np.float64)
+    missing = np.isnan(values)
+    us = np.rint(np.where(missing, 0.0, values) * 1e6).astype(np.int64)
+    us[missing] = NO_DATE
+    return us
+
+
+def _intern(values: Sequence[str]) -> tuple[np.ndarray, tuple[str, ...]]:
+    """Map labels to int32 codes in first-appearance order."""
+    index: dict[str, int] = {}
+    codes = np.fromiter(
+        (index.setdefault(v, len(index)) for v in values),
+        dtype=np.int32,
+        count=len(values),
+    )
+    codes.flags.writeable = False
+    return codes, tuple(index)
+
+
+def _frozen(column: np.ndarray) -> np.ndarray:
+    column.flags.writeable = False
+    return column
+
+
+class TransactionFrame:
+    """
+    Read-only columnar view over a list of transactions.
+
+    Columns are extracted lazily and cached, so a consumer that only needs
+    amounts and buckets never pays for converting dates or merchants.
+    """
+
+    def __init__(self, transactions: Sequence[Transaction]):
+        self.transactions = transactions
+
+    def _column(self, name: str) -> list:
+        return list(map(attrgetter(name), self.transactions))
+
+    # =========================================================================
+    # Columns
+    # =========================================================================
+
+    @cached_property
+    def amount_cents(self) -> np.ndarray:
+        """Signed amount in integer cents."""
+        amounts = np.array(self._column("amount"), dtype=np.float64)
+        return _frozen(np.rint(amounts * 100).astype(np.int64))
+
+    @cached_property
+    def abs_cents(self) -> np.ndarray:
+        """Absolute amount in integer cents."""
+        return _frozen(np.abs(self.amount_cents))
+
+    @cached_property
+    def date_us(self) -> np.ndarray:
+        """Transaction date as epoch microseconds."""
+        return _frozen(_seconds_to_us(_epoch_seconds(self._column("date"))))
+
+    @cached_property
+    def next_expected_us(self) -> np.ndarray:
+        """Next expected recurrence as epoch microseconds, NO_DATE if unknown."""
+        return _frozen(_seconds_to_us(_epoch_seconds(self._column("next_expected_date"))))
+
+    @cached_property
+    def is_recurring(self) -> np.ndarray:
+        return _frozen(np.array(self._column("is_recurring"), dtype=bool))
+
+    @cached_property
+    def bucket_codes(self) -> np.ndarray:
+        """Index into BUCKETS, NO_BUCKET when unset."""
+        index = {name: i for i, name in enumerate(BUCKETS)}
+        codes = [index.get(b, NO_BUCKET) for b in self._column("bucket")]
+        return _frozen(np.array(codes, dtype=np.int8))
+
+    @cached_property
+    def _category_index(self) -> tuple[np.ndarray, tuple[str, ...]]:
+        return _intern(self._column("category"))
+
+    @property
+    def category_codes(self) -> np.ndarray:
+        return self._category_index[0]
+
+    @property
+    def categories(self) -> tuple[str, ...]:
+        """Category label per code, in first-appearance order."""
+        return self._category_index[1]
+
+    @cached_property
+    def _merchant_index(self) -> tuple[np.ndarray, tuple[str, ...]]:
+        return _intern(self._column("merchant"))
+
+    @property
+    def merchant_codes(self) -> np.ndarray:
+        return self._merchant_index[0]
+
+    @property
+    def merchants(self) -> tuple[str, ...]:
+        """Merchant label per code, in first-appearance order."""
+        return self._merchant_index[1]
+
+    @classmethod
+    def from_snapshot(cls, snapshot: FinancialSnapshot) -> "TransactionFrame":
+        """Build a frame over a snapshot's recent transactions."""
+        return cls(snapshot.recent_transactions)
+
+    def __len__(self) -> int:
+        return len(self.transactions)
+
+    # =========================================================================
+    # Filters
+    # =========================================================================
+
+    def bucket_mask(self, *buckets: str) -> np.ndarray:
+        """Rows whose bucket is one of the given names."""
+        codes = [BUCKETS.index(b) for b in buckets]
+        return np.isin(self.bucket_codes, codes)
+
+    def category_mask(self, *categories: str) -> np.ndarray:
+        """Rows whose category is one of the given names."""
+        codes = [self.categories.index(c) for c in categories if c in self.categories]
+        return np.isin(self.category_codes, codes)
+
+    def since_mask(self, cutoff: datetime) -> np.ndarray:
+        """Rows dated at or after cutoff."""
+        return self.date_us >= to_epoch_us(cutoff)
+
+    def rows(self, mask: np.ndarray) -> list[Transaction]:
+        """Source transactions selected by a mask, in original order."""
+        return [self.transactions[i] for i in np.flatnonzero(mask)]
+
+    # =========================================================================
+    # Grouped aggregates
+    # =========================================================================
+
+    @staticmethod
+    def group_sum(codes: np.ndarray, values: np.ndarray, size: int) -> np.ndarray:
+        """
+        Sum of integer values per code (codes must be in [0, size)).
+
+        bincount accumulates in float64, which is exact for integer sums
+        below 2**53 cents.
+        """
+        sums = np.bincount(codes, weights=values, minlength=size)
+        return sums.astype(np.int64)
+
+    def category_totals(
+        self, mask: np.ndarray, signed: bool = False
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Per-category (count, cents) over masked rows, indexed by category code."""
+        codes = self.category_codes[mask]
+        values = (self.amount_cents if signed else self.abs_cents)[mask]
+        size = len(self.categories)
+        counts = np.bincount(codes, minlength=size)
+        return counts, self.group_sum(codes, values, size)
+
+    def category_amounts(self, mask: np.ndarray, signed: bool = False) -> dict[str, float]:
+        """Category -> dollar total for categories with at least one masked row."""
+        counts, cents = self.category_totals(mask, signed=signed)
+        return {
+            self.categories[code]: int(cents[code]) / 100
+            for code in np.flatnonzero(counts)
+        }
+
+    def month_codes(self) -> tuple[np.ndarray, tuple[str, ...]]:
+        """Per-row month code and the YYYY-MM label for each code, ascending."""
+        months = self.date_us.astype("datetime64[us]").astype("datetime64[M]")
+        labels, codes = np.unique(months, return_inverse=True)
+        return codes, tuple(str(m) for m in labels)
+
+    def first_per_group(self, codes: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        """Row index of the first masked row in each group, in row order."""
+        idx = np.flatnonzero(mask)
+        _, first = np.unique(codes[idx], return_index=True)
+        return np.sort(idx[first])
+
+    @staticmethod
+    def days_until(target_us: np.ndarray, now: datetime) -> np.ndarray:
+        """Whole days from now to each target, floored like timedelta.days."""
+        return (target_us - to_epoch_us(now)) // _US_PER_DAY
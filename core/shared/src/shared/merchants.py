@@ -0,0 +1,349 @@
+"""
+Merchant normalization and categorization.
+
+Raw merchant descriptors ("WHOLEFDS MKT #10234", "Trader Joe's 552",
+"SQ *BLUE BOTTLE COFFEE") are reduced to lowercase word tokens, then
+scanned once by an Aho-Corasick automaton built over the token sequences
+of every known merchant pattern. The longest pattern found anywhere in the
+descriptor wins, so "uber eats" beats "uber" and the scan cost is linear
+in the descriptor length regardless of how many patterns are loaded.
+Short, ambiguous names are either spelled with a second token ("bp oil")
+or anchored with a leading "^" ("^target"), which then only matches at
+the start of the descriptor.
+
+When no pattern matches, an ISO 18245 merchant category code (MCC) is
+consulted. Categories use the budget vocabulary from shared.categories, and
+the MCC table carries the Visa Merchant Control Type for each code, using
+the same MCT as vtc.constants.CATEGORY_TO_MCT wherever that map names the
+category.
+
+Results are memoized per (descriptor, mcc) in an LRU, since the same few
+hundred merchants make up most of any user's history.
+"""
+
+import re
+from functools import lru_cache
+from typing import Mapping, NamedTuple
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Tokens that carry no merchant identity (domains, corporate suffixes,
+# payment-processor prefixes)
+NOISE_TOKENS = frozenset({
+    "com", "net", "www", "inc", "llc", "co", "ltd", "corp",
+    "sq", "tst", "pp", "paypal", "pos", "debit", "purchase",
+})
+
+# Pattern prefix (and scan sentinel) anchoring a pattern to the first token
+ANCHOR = "^"
+
+# Fallback when neither pattern, MCC nor source category is known
+DEFAULT_CATEGORY = "shopping"
+
+MEMO_SIZE = 8192
+
+
+def merchant_tokens(description: str) -> tuple[str, ...]:
+    """Lowercase word tokens with store numbers and noise removed."""
+    return tuple(
+        t for t in _WORD.findall(description.lower().replace("'", ""))
+        if not t.isdigit() and t not in NOISE_TOKENS
+    )
+
+
+class MerchantMatch(NamedTuple):
+    """A resolved merchant descriptor."""
+
+    merchant: str | None  # Canonical merchant name, None when matched by MCC
+    category: str
+    mct: str | None  # Visa Merchant Control Type, if one applies
+    source: str  # "pattern" or "mcc"
+
+
+# Canonical merchant -> (category, typical MCC, descriptor patterns)
+MERCHANT_PATTERNS: dict[str, tuple[str, int | None, tuple[str, ...]]] = {
+    # Groceries
+    "Whole Foods": ("groceries", 5411, ("whole foods", "wholefds", "wholefoods")),
+    "Trader Joes": ("groceries", 5411, ("trader joes", "trader joe")),
+    "Costco": ("groceries", 5300, ("costco",)),
+    "Kroger": ("groceries", 5411, ("kroger",)),
+    "Safeway": ("groceries", 5411, ("safeway",)),
+    "Aldi": ("groceries", 5411, ("aldi",)),
+    "Publix": ("groceries", 5411, ("publix",)),
+    "Wegmans": ("groceries", 5411, ("wegmans",)),
+    "Instacart": ("groceries", 5411, ("instacart",)),
+    # Transportation
+    "Shell Gas": ("transportation", 5541, ("shell gas", "shell oil", "shell service")),
+    "Chevron": ("transportation", 5541, ("chevron",)),
+    "Exxon": ("transportation", 5541, ("exxon", "exxonmobil")),
+    "BP": ("transportation", 5541, ("bp oil", "bp gas", "bp products", "bp amoco")),
+    "Uber": ("transportation", 4121, ("uber", "uber trip")),
+    "Lyft": ("transportation", 4121, ("lyft",)),
+    # Dining
+    "Uber Eats": ("dining", 5812, ("uber eats", "ubereats")),
+    "DoorDash": ("dining", 5812, ("doordash", "dd doordash")),
+    "Grubhub": ("dining", 5812, ("grubhub",)),
+    "Chipotle": ("dining", 5814, ("chipotle",)),
+    "McDonalds": ("dining", 5814, ("mcdonalds",)),
+    # Coffee
+    "Starbucks": ("coffee", 5814, ("starbucks",)),
+    "Dunkin": ("coffee", 5814, ("dunkin",)),
+    "Blue Bottle": ("coffee", 5814, ("blue bottle",)),
+    # Utilities / phone / internet
+    "Electric Company": ("utilities", 4900, ("electric company",)),
+    "Verizon": ("phone", 4814, ("verizon", "vzwrlss")),
+    "AT&T": ("phone", 4814, ("att bill", "att wireless", "att uverse", "at t")),
+    "T-Mobile": ("phone", 4814, ("t mobile", "tmobile")),
+    "Comcast": ("internet", 4899, ("comcast", "xfinity")),
+    # Insurance / medical / rent
+    "State Farm": ("insurance", 6300, ("state farm",)),
+    "Geico": ("insurance", 6300, ("geico",)),
+    "CVS Pharmacy": ("medical", 5912, ("cvs pharmacy", "cvs")),
+    "Walgreens": ("medical", 5912, ("walgreens",)),
+    "Apartment Complex": ("rent", 6513, ("apartment complex",)),
+    # Streaming / subscriptions
+    "Netflix": ("streaming", 4899, ("netflix",)),
+    "Spotify": ("streaming", 5815, ("spotify",)),
+    "Hulu": ("streaming", 4899, ("hulu",)),
+    "Disney+": ("streaming", 4899, ("disney plus", "disneyplus")),
+    "HBO Max": ("streaming", 4899, ("hbo max", "hbomax")),
+    "YouTube Premium": ("streaming", 5815, ("youtube premium", "google youtube")),
+    "Apple": ("subscriptions", 5818, ("apple com bill", "apple bill", "itunes")),
+    "Amazon Prime": ("subscriptions", 5968, ("amazon prime", "prime video")),
+    # Shopping
+    "Amazon": ("shopping", 5999, ("amazon", "amzn", "amzn mktp")),
+    "Target": ("shopping", 5310, ("^target", "target store")),
+    "Walmart": ("shopping", 5310, ("walmart", "wal mart", "wm supercenter")),
+    "Best Buy": ("shopping", 5732, ("best buy", "bestbuy")),
+    # Gym / personal care / entertainment / travel
+    "Planet Fitness": ("gym", 7997, ("planet fitness",)),
+    "Equinox": ("gym", 7997, ("equinox",)),
+    "Sephora": ("personal_care", 5977, ("sephora",)),
+    "AMC Theatres": ("entertainment", 7832, ("amc theatres", "^amc")),
+    "Steam": ("gaming", 5816, ("steam games", "steampowered")),
+    "Airbnb": ("travel", 7011, ("airbnb",)),
+    "Delta": ("travel", 3058, ("delta air", "delta airlines")),
+    "United": ("travel", 3000, ("united airlines", "united air")),
+}
+
+# MCC -> (category, MCT)
+MCC_CATEGORIES: dict[int, tuple[str, str | None]] = {
+    4111: ("transportation", None),
+    4121: ("transportation", None),
+    4131: ("transportation", None),
+    4511: ("travel", "MCT_AIRFARE"),
+    4812: ("phone", None),
+    4814: ("phone", None),
+    4899: ("internet", None),
+    4900: ("utilities", None),
+    5200: ("household", "MCT_HOUSEHOLD"),
+    5251: ("household", "MCT_HOUSEHOLD"),
+    5300: ("groceries", "MCT_GROCERY"),
+    5310: ("shopping", "MCT_APPAREL_AND_ACCESSORIES"),
+    5311: ("shopping", "MCT_APPAREL_AND_ACCESSORIES"),
+    5331: ("shopping", "MCT_APPAREL_AND_ACCESSORIES"),
+    5411: ("groceries", "MCT_GROCERY"),
+    5422: ("groceries", "MCT_GROCERY"),
+    5441: ("groceries", "MCT_GROCERY"),
+    5451: ("groceries", "MCT_GROCERY"),
+    5462: ("groceries", "MCT_GROCERY"),
+    5499: ("groceries", "MCT_GROCERY"),
+    5532: ("transportation", "MCT_AUTOMOTIVE"),
+    5533: ("transportation", "MCT_AUTOMOTIVE"),
+    5541: ("transportation", "MCT_GAS_AND_PETROLEUM"),
+    5542: ("transportation", "MCT_GAS_AND_PETROLEUM"),
+    5651: ("clothing", "MCT_APPAREL_AND_ACCESSORIES"),
+    5691: ("clothing", "MCT_APPAREL_AND_ACCESSORIES"),
+    5699: ("clothing", "MCT_APPAREL_AND_ACCESSORIES"),
+    5712: ("household", "MCT_HOUSEHOLD"),
+    5719: ("household", "MCT_HOUSEHOLD"),
+    5732: ("electronics", "MCT_ELECTRONICS"),
+    5734: ("electronics", "MCT_ELECTRONICS"),
+    5812: ("dining", "MCT_DINING"),
+    5813: ("alcohol", "MCT_ALCOHOL"),
+    5814: ("dining", "MCT_DINING"),
+    5815: ("streaming", None),
+    5816: ("gaming", None),
+    5817: ("subscriptions", None),
+    5818: ("subscriptions", None),
+    5912: ("medical", None),
+    5921: ("alcohol", "MCT_ALCOHOL"),
+    5942: ("hobbies", None),
+    5945: ("hobbies", None),
+    5968: ("subscriptions", None),
+    5977: ("personal_care", "MCT_PERSONAL_CARE"),
+    5993: ("tobacco", "MCT_SMOKE_AND_TOBACCO"),
+    5999: ("shopping", "MCT_APPAREL_AND_ACCESSORIES"),
+    6300: ("insurance", None),
+    6513: ("rent", None),
+    7011: ("travel", "MCT_HOTEL_AND_LODGING"),
+    7230: ("personal_care", "MCT_PERSONAL_CARE"),
+    7298: ("personal_care", "MCT_PERSONAL_CARE"),
+    7512: ("travel", "MCT_CAR_RENTAL"),
+    7531: ("transportation", "MCT_AUTOMOTIVE"),
+    7538: ("transportation", "MCT_AUTOMOTIVE"),
+    7832: ("entertainment", "MCT_SPORT_AND_RECREATION"),
+    7922: ("entertainment", "MCT_SPORT_AND_RECREATION"),
+    7995: ("gambling", "MCT_GAMBLING"),
+    7997: ("gym", "MCT_SPORT_AND_RECREATION"),
+    8011: ("medical", None),
+    8021: ("medical", None),
+    8062: ("medical", None),
+    8099: ("medical", None),
+    8351: ("childcare", None),
+}
+
+# Inclusive MCC ranges reserved for individual airlines, car rental
+# agencies and hotel chains
+MCC_RANGES: tuple[tuple[int, int, str, str], ...] = (
+    (3000, 3350, "travel", "MCT_AIRFARE"),
+    (3351, 3500, "travel", "MCT_CAR_RENTAL"),
+    (3501, 3999, "travel", "MCT_HOTEL_AND_LODGING"),
+)
+
+
+def mcc_category(mcc: int | str | None) -> tuple[str, str | None] | None:
+    """(category, MCT) for a merchant category code, None if unknown."""
+    if mcc is None:
+        return None
+    try:
+        code = int(mcc)
+    except (TypeError, ValueError):
+        return None
+    found = MCC_CATEGORIES.get(code)
+    if found is not None:
+        return found
+    for low, high, category, mct in MCC_RANGES:
+        if low <= code <= high:
+            return category, mct
+    return None
+
+
+class _TokenAutomaton:
+    """Aho-Corasick automaton over word tokens rather than characters."""
+
+    def __init__(self, patterns: Mapping[tuple[str, ...], int]):
+        # Node 0 is the root; goto[n] maps a token to the child node
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        # Longest pattern ending at each node (following fail links):
+        # (pattern length in tokens, payload) or None
+        self._out: list[tuple[int, int] | None] = [None]
+
+        for tokens, payload in patterns.items():
+            node = 0
+            for token in tokens:
+                nxt = self._goto[node].get(token)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][token] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(None)
+                node = nxt
+            self._out[node] = (len(tokens), payload)
+
+        # Breadth-first: fail links point to the longest proper suffix that
+        # is also a trie path; outputs inherit the fail target's when empty.
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for token, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and token not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(token, 0)
+                if self._out[child] is None:
+                    self._out[child] = self._out[self._fail[child]]
+
+    def longest(self, tokens: tuple[str, ...]) -> int | None:
+        """Payload of the longest pattern occurring in tokens (first on ties)."""
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        best_len = 0
+        best = None
+        for token in tokens:
+            while node and token not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(token, 0)
+            hit = out[node]
+            if hit is not None and hit[0] > best_len:
+                best_len, best = hit
+        return best
+
+
+class MerchantCategorizer:
+    """
+    Compiled merchant matcher with an MCC fallback and an LRU memo.
+
+    Instances are immutable once built; extra patterns (tenant-specific
+    merchants) are passed at construction and merged over the defaults.
+    """
+
+    def __init__(
+        self,
+        patterns: Mapping[str, tuple[str, int | None, tuple[str, ...]]] | None = None,
+        memo_size: int = MEMO_SIZE,
+    ):
+        merged = {**MERCHANT_PATTERNS, **(patterns or {})}
+        self._merchants: list[MerchantMatch] = []
+        token_patterns: dict[tuple[str, ...], int] = {}
+        for merchant, (category, mcc, descriptors) in merged.items():
+            by_mcc = mcc_category(mcc)
+            mct = by_mcc[1] if by_mcc is not None else None
+            payload = len(self._merchants)
+            self._merchants.append(MerchantMatch(merchant, category, mct, "pattern"))
+            for descriptor in descriptors:
+                tokens = merchant_tokens(descriptor)
+                if tokens and descriptor.startswith(ANCHOR):
+                    tokens = (ANCHOR, *tokens)
+                if tokens:
+                    token_patterns[tokens] = payload
+        self._automaton = _TokenAutomaton(token_patterns)
+        self.match = lru_cache(maxsize=memo_size)(self._match)
+
+    def _match(
+        self, description: str, mcc: int | str | None = None
+    ) -> MerchantMatch | None:
+        """Pattern match first, then MCC; None when neither applies."""
+        payload = self._automaton.longest((ANCHOR, *merchant_tokens(description)))
+        if payload is not None:
+            return self._merchants[payload]
+
+        by_mcc = mcc_category(mcc)
+        if by_mcc is not None:
+            return MerchantMatch(None, by_mcc[0], by_mcc[1], "mcc")
+        return None
+
+    def categorize(
+        self,
+        description: str,
+        mcc: int | str | None = None,
+        fallback: str | None = None,
+    ) -> str:
+        """Category for a descriptor, else the source category, else DEFAULT_CATEGORY."""
+        found = self.match(description, mcc)
+        if found is not None:
+            return found.category
+        return fallback or DEFAULT_CATEGORY
+
+    def categorize_many(
+        self,
+        descriptions: list[str],
+        mccs: list[int | str | None] | None = None,
+        fallbacks: list[str | None] | None = None,
+    ) -> list[str]:
+        """Vectorized categorize(); optional lists align with descriptions."""
+        n = len(descriptions)
+        mccs = mccs or [None] * n
+        fallbacks = fallbacks or [None] * n
+        match = self.match
+        out = []
+        for description, mcc, fallback in zip(descriptions, mccs, fallbacks):
+            found = match(description, mcc)
+            out.append(found.category if found is not None else fallback or DEFAULT_CATEGORY)
+        return out
+
+
+# Process-wide default instance
+DEFAULT_CATEGORIZER = MerchantCategorizer()
@@ -83,13 +83,7 @@ class Asteroid(BaseModel):
     """Financial threat requiring user attention."""
 
     id: str
-    threat_type: Literal[
-        "subscription_renewal",
-        "budget_overrun",
-        "unused_service",
-        "spending_spike",
-        "bill_due",
-    ]
+    threat_type: str  # A registered detection rule's type, e.g. "spending_spike"
     severity: Literal["danger", "warning", "info"]
     title: str
     detail: str
@@ -3,22 +3,50 @@ Nessie API client for Capital One sandbox data.
 
 Fetches accounts and transactions from the Nessie API, normalizes
 into shared Pydantic models, and detects recurring transactions.
+
+NessieService is the blocking client. AsyncNessieService fans out the
+per-account purchase requests concurrently on a pooled httpx.AsyncClient
+and runs the CPU-bound normalization in a worker thread.
+
+Both clients support incremental sync via sync_snapshot(): a NessieSyncState
+carries a per-account high-water mark plus the normalized purchase history,
+so a refresh only normalizes and merges purchases it hasn't merged before
+(newer than the mark, or late arrivals with unseen IDs). The state lists
+the months of history each sync changed, so storage can rewrite only those.
+Recurring-charge series (shared.recurrence) and budget aggregates
+(shared.budget_engine.BudgetAccumulator) are carried in the same state and
+updated from the delta only. The state also records how the sync changed
+the snapshot window (SyncDelta), so later consumers such as the asteroid
+detector can follow it without diffing snapshots.
 """
 
-from collections import defaultdict
+import asyncio
+import os
+from bisect import bisect_right
 from datetime import datetime, timedelta, timezone
 
 import httpx
 from aws_lambda_powertools.logging import Logger
+from pydantic import BaseModel, Field
 
-from shared.categories import categorize_transaction
+from shared.budget_engine import BudgetAccumulator
+from shared.categories import DEFAULT_INDEX, CategoryIndex
+from shared.merchants import DEFAULT_CATEGORIZER, MerchantCategorizer
 from shared.models import AccountSummary, FinancialSnapshot, Transaction
+from shared.recurrence import RecurrenceState, detect_recurring
+from shared.rollups import month_key, touched_months
 
 logger = Logger(service="NessieService")
 
 NESSIE_BASE_URL = "http://api.nessieisreal.com"
 HTTP_TIMEOUT = 10.0
 
+# Max in-flight Nessie requests per AsyncNessieService
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("NESSIE_MAX_CONCURRENCY", "8"))
+
+# Purchase history kept in the sync state (covers the 6-month report)
+HISTORY_RETENTION_DAYS = 180
+
 # Nessie account type mapping
 ACCOUNT_TYPE_MAP = {
     "Checking": "checking",
@@ -26,45 +54,87 @@ ACCOUNT_TYPE_MAP = {
     "Credit Card": "credit_card",
 }
 
-# Merchant-to-category overrides for Nessie merchants with unclear categories
-MERCHANT_CATEGORY_MAP = {
-    "Whole Foods": "groceries",
-    "Trader Joes": "groceries",
-    "Costco": "groceries",
-    "Shell Gas": "transportation",
-    "Electric Company": "utilities",
-    "State Farm": "insurance",
-    "CVS Pharmacy": "medical",
-    "Planet Fitness": "gym",
-    "Apartment Complex": "rent",
-}
-
-
 class NessieApiError(Exception):
     """Raised when Nessie API returns an error or is unreachable."""
 
 
-class NessieService:
-    """Client for Capital One Nessie sandbox API."""
+class AccountHighWaterMark(BaseModel):
+    """Newest purchase seen for one account."""
 
-    def __init__(self, api_key: str):
-        self.api_key = api_key
-        self.client = httpx.Client(
-            base_url=NESSIE_BASE_URL,
-            timeout=HTTP_TIMEOUT,
-        )
+    last_purchase_date: str  # Nessie purchase_date (YYYY-MM-DD)
+    ids_at_last_date: list[str]  # Purchase IDs already seen on that date
 
-    def build_snapshot(self, days: int = 90) -> FinancialSnapshot:
-        """Build a complete financial snapshot from Nessie data."""
-        accounts = self.get_accounts()
-        all_transactions: list[Transaction] = []
 
-        for account in accounts:
-            txns = self.get_transactions(account.account_id, days=days)
-            all_transactions.extend(txns)
+class SyncDelta(BaseModel):
+    """How one sync changed the snapshot window."""
 
-        # Detect recurring patterns
-        all_transactions = self._detect_recurring(all_transactions)
+    # synced_at of the state the delta applies to; None when the sync
+    # rebuilt the window (first sync, wider window, dropped account)
+    since: datetime | None = None
+    until: datetime | None = None  # synced_at of the sync that produced it
+    inserted: list[Transaction] = []  # Purchases that entered the window
+    removed: list[Transaction] = []  # Purchases that left it (aged out or superseded)
+
+
+class NessieSyncState(BaseModel):
+    """Persisted incremental sync state for one user."""
+
+    accounts: dict[str, AccountHighWaterMark] = {}
+    transactions: list[Transaction] = []  # Normalized history, newest first
+    recurrence: RecurrenceState = Field(default_factory=RecurrenceState)
+    budget: BudgetAccumulator = Field(default_factory=BudgetAccumulator)
+    synced_at: datetime | None = None
+    window_start: datetime | None = None  # Cutoff the budget was last synced to
+    rollup_months: list[str] = []  # Months whose rollups the last sync changed
+    # Months whose stored history the last sync changed; None rewrites all
+    history_months: list[str] | None = None
+    delta: SyncDelta = Field(default_factory=SyncDelta)  # Window changes of the last sync
+
+
+def _purchase_date(raw: dict) -> datetime | None:
+    """Nessie purchase date as a UTC datetime, None if missing or malformed."""
+    date_str = raw.get("purchase_date", raw.get("transaction_date", ""))
+    try:
+        return datetime.fromisoformat(date_str).replace(tzinfo=timezone.utc)
+    except (ValueError, TypeError):
+        return None
+
+
+def _dated_between(
+    transactions: list[Transaction], start: datetime, end: datetime
+) -> list[Transaction]:
+    """Transactions (sorted newest first) dated in [start, end)."""
+    first = bisect_right(transactions, -end.timestamp(), key=lambda t: -t.date.timestamp())
+    last = bisect_right(transactions, -start.timestamp(), key=lambda t: -t.date.timestamp())
+    return transactions[first:last]
+
+
+class _NessieBase:
+    """Normalization and aggregation shared by the sync and async clients."""
+
+    def __init__(
+        self,
+        api_key: str,
+        categories: CategoryIndex | None = None,
+        merchants: MerchantCategorizer | None = None,
+    ):
+        self.api_key = api_key
+        # Tenant-specific category index (aliases / bucket overrides)
+        self.categories = categories or DEFAULT_INDEX
+        self.merchants = merchants or DEFAULT_CATEGORIZER
+
+    def _assemble_snapshot(
+        self,
+        accounts: list[AccountSummary],
+        all_transactions: list[Transaction],
+        recurrence: RecurrenceState | None = None,
+    ) -> FinancialSnapshot:
+        """Combine normalized accounts and transactions into a snapshot."""
+        # Flag recurring patterns, from the incremental state when synced
+        if recurrence is None:
+            all_transactions = detect_recurring(all_transactions)
+        else:
+            all_transactions = recurrence.flag(all_transactions)
 
         # Sort by date descending
         all_transactions.sort(key=lambda t: t.date, reverse=True)
@@ -89,49 +159,197 @@ class NessieService:
             snapshot_timestamp=datetime.now(timezone.utc),
         )
 
-    def get_accounts(self) -> list[AccountSummary]:
-        """Fetch all accounts from Nessie API."""
-        try:
-            response = self.client.get(
-                "/accounts", params={"key": self.api_key}
-            )
-            response.raise_for_status()
-            raw_accounts = response.json()
-            return [
-                self._normalize_account(raw)
-                for raw in raw_accounts
-                if raw.get("type") in ACCOUNT_TYPE_MAP
-            ]
-        except httpx.HTTPError as e:
-            logger.error("Failed to fetch accounts from Nessie", error=str(e))
-            raise NessieApiError(f"Failed to fetch accounts: {e}") from e
+    def _parse_accounts(self, raw_accounts: list[dict]) -> list[AccountSummary]:
+        """Normalize supported Nessie account types."""
+        return [
+            self._normalize_account(raw)
+            for raw in raw_accounts
+            if raw.get("type") in ACCOUNT_TYPE_MAP
+        ]
 
-    def get_transactions(
-        self, account_id: str, days: int = 90
+    def _parse_transactions(
+        self, raw_transactions: list[dict], account_id: str, days: int
     ) -> list[Transaction]:
-        """Fetch purchases for an account from Nessie API."""
-        try:
-            response = self.client.get(
-                f"/accounts/{account_id}/purchases",
-                params={"key": self.api_key},
-            )
-            response.raise_for_status()
-            raw_transactions = response.json()
+        """Normalize purchases and drop anything older than the window."""
+        cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+        transactions = []
+        for raw in raw_transactions:
+            txn = self._normalize_transaction(raw, account_id)
+            if txn.date >= cutoff:
+                transactions.append(txn)
+        return transactions
+
+    def _new_purchases(
+        self,
+        raw_transactions: list[dict],
+        mark: AccountHighWaterMark | None,
+        seen_ids: set[str],
+        not_before: datetime,
+    ) -> tuple[list[dict], AccountHighWaterMark | None]:
+        """
+        Split out purchases not merged yet.
 
-            cutoff = datetime.now(timezone.utc) - timedelta(days=days)
-            transactions = []
-            for raw in raw_transactions:
+        Purchases dated after the mark, or with an ID in neither seen_ids
+        (the account's stored history) nor the mark date's IDs, are new; the
+        latter catches purchases that reach Nessie after later-dated ones.
+        Purchases dated before not_before are skipped. Returns the new
+        purchases and the advanced mark.
+        """
+        last = None
+        if mark is not None:
+            last = _purchase_date({"purchase_date": mark.last_purchase_date})
+            seen_ids = seen_ids | set(mark.ids_at_last_date)
+
+        new_raw: list[dict] = []
+        latest: tuple[datetime, str] | None = None
+        for raw in raw_transactions:
+            date = _purchase_date(raw)
+            if date is not None and date < not_before:
+                continue
+            after_mark = last is None or (date is not None and date > last)
+            if not after_mark and raw.get("_id", "") in seen_ids:
+                continue
+            new_raw.append(raw)
+            if date is not None and (latest is None or date > latest[0]):
+                latest = (date, raw.get("purchase_date", raw.get("transaction_date")))
+
+        if latest is None or (last is not None and latest[0] < last):
+            return new_raw, mark
+
+        ids = [raw.get("_id", "") for raw in new_raw if _purchase_date(raw) == latest[0]]
+        if mark is not None and latest[0] == last:
+            ids = mark.ids_at_last_date + ids
+        return new_raw, AccountHighWaterMark(
+            last_purchase_date=latest[1], ids_at_last_date=ids
+        )
+
+    def _merge_sync(
+        self,
+        state: NessieSyncState | None,
+        accounts: list[AccountSummary],
+        raw_by_account: dict[str, list[dict]],
+        days: int,
+        now: datetime | None = None,
+    ) -> tuple[FinancialSnapshot, NessieSyncState]:
+        """Merge new purchases into the stored history and build a snapshot."""
+        state = state or NessieSyncState()
+        account_ids = {a.account_id for a in accounts}
+        now = now or datetime.now(timezone.utc)
+        retention_cutoff = now - timedelta(days=max(days, HISTORY_RETENTION_DAYS))
+
+        seen: dict[str, set[str]] = {}
+        for t in state.transactions:
+            seen.setdefault(t.account_id, set()).add(t.id)
+
+        marks: dict[str, AccountHighWaterMark] = {}
+        new_transactions: list[Transaction] = []
+        for account_id, raw_transactions in raw_by_account.items():
+            new_raw, mark = self._new_purchases(
+                raw_transactions,
+                state.accounts.get(account_id),
+                seen.get(account_id, set()),
+                retention_cutoff,
+            )
+            if mark is not None:
+                marks[account_id] = mark
+            for raw in new_raw:
                 txn = self._normalize_transaction(raw, account_id)
-                if txn.date >= cutoff:
-                    transactions.append(txn)
-            return transactions
-        except httpx.HTTPError as e:
-            logger.error(
-                "Failed to fetch transactions from Nessie",
-                account_id=account_id,
-                error=str(e),
+                if txn.date >= retention_cutoff:
+                    new_transactions.append(txn)
+
+        new_ids = {t.id for t in new_transactions}
+        history: list[Transaction] = []
+        superseded: list[Transaction] = []  # Stored versions of re-sent purchases
+        dropped: list[Transaction] = []  # Aged out or from a dropped account
+        for t in state.transactions:
+            if t.id in new_ids:
+                superseded.append(t)
+            elif t.account_id in account_ids and t.date >= retention_cutoff:
+                history.append(t)
+            else:
+                dropped.append(t)
+        history.extend(new_transactions)
+        history.sort(key=lambda t: t.date, reverse=True)
+
+        # History months whose stored rows change; a state stored whole (or
+        # none at all) has every month written
+        if state.history_months is None:
+            history_months = {month_key(t.date) for t in history}
+        else:
+            history_months = {
+                month_key(t.date) for t in (*new_transactions, *superseded, *dropped)
+            }
+
+        # Only new purchases touch recurrence series (updated in place); a
+        # state saved before series were tracked is seeded from history once.
+        recurrence = state.recurrence
+        if recurrence.series:
+            touched = recurrence.observe(new_transactions)
+        else:
+            touched = recurrence.observe(history)
+        # Series expire on their own cadence, not with the purchase history
+        recurrence.prune(now)
+
+        window_cutoff = now - timedelta(days=days)
+        window = [t for t in history if t.date >= window_cutoff]
+        snapshot = self._assemble_snapshot(accounts, window, recurrence=recurrence)
+
+        # Budget aggregates follow the window: new purchases in, purchases
+        # that aged out since the last sync out. Seeding, a wider window or
+        # a dropped account falls back to a full diff against the window.
+        # The same delta is handed on to consumers of the window.
+        budget = state.budget
+        if (
+            state.window_start is None
+            or window_cutoff < state.window_start
+            or not account_ids.issuperset(state.accounts)
+        ):
+            budget_changed = budget.sync(window)
+            delta = SyncDelta(until=now)
+        else:
+            aged_out = _dated_between(state.transactions, state.window_start, window_cutoff)
+            left = {t.id: t for t in aged_out}
+            left.update((t.id, t) for t in superseded if t.date >= state.window_start)
+            inserted = [t for t in new_transactions if t.date >= window_cutoff]
+            budget_changed = budget.apply(inserted=inserted, removed=list(left))
+            delta = SyncDelta(
+                since=state.synced_at,
+                until=now,
+                inserted=inserted,
+                removed=list(left.values()),
             )
-            raise NessieApiError(f"Failed to fetch transactions: {e}") from e
+
+        # Monthly rollups to rewrite; a first sync materializes every month
+        if state.synced_at is None:
+            rollup_months = {month_key(t.date) for t in history} | {month_key(now)}
+        else:
+            rollup_months = touched_months(
+                new_transactions, now, state.synced_at, retention_cutoff
+            )
+
+        logger.info(
+            "Nessie incremental sync",
+            new_transactions=len(new_transactions),
+            history_size=len(history),
+            recurrence_series=len(recurrence.series),
+            recurrence_updated=len(touched),
+            budget_changed=budget_changed,
+            rollup_months=len(rollup_months),
+            history_months=len(history_months),
+        )
+
+        new_state = NessieSyncState(
+            accounts=marks,
+            transactions=history,
+            recurrence=recurrence,
+            budget=budget,
+            synced_at=now,
+            window_start=window_cutoff,
+            rollup_months=sorted(rollup_months),
+            history_months=sorted(history_months),
+            delta=delta,
+        )
+        return snapshot, new_state
 
     def _normalize_account(self, raw: dict) -> AccountSummary:
         """Map Nessie account format to AccountSummary model."""
@@ -156,18 +374,14 @@ class NessieService:
         if "description" in raw:
             merchant_name = raw["description"]
 
-        # Determine category from merchant or Nessie data
-        category = MERCHANT_CATEGORY_MAP.get(
-            merchant_name, raw.get("category", "shopping")
+        # Determine category from merchant patterns, else Nessie data
+        category = self.merchants.categorize(
+            merchant_name, fallback=raw.get("category")
         )
-        bucket = categorize_transaction(category)
+        bucket = self.categories.bucket(category)
 
         # Parse date - Nessie uses purchase_date field
-        date_str = raw.get("purchase_date", raw.get("transaction_date", ""))
-        try:
-            txn_date = datetime.fromisoformat(date_str).replace(tzinfo=timezone.utc)
-        except (ValueError, TypeError):
-            txn_date = datetime.now(timezone.utc)
+        txn_date = _purchase_date(raw) or datetime.now(timezone.utc)
 
         amount = raw.get("amount", 0)
         # Purchases are expenses (negative)
@@ -181,70 +395,205 @@ class NessieService:
             merchant=merchant_name,
             category=category,
             amount=amount,
-            is_recurring=False,  # Will be set by _detect_recurring
+            is_recurring=False,  # Set from shared.recurrence at assembly
             bucket=bucket,
         )
 
-    def _detect_recurring(
-        self, transactions: list[Transaction]
-    ) -> list[Transaction]:
-        """
-        Detect recurring transactions by grouping by merchant.
 
-        Flags as recurring if 2+ transactions from the same merchant within
-        30 days with +/-10% amount variance. Estimates next_expected_date.
-        """
-        # Group by merchant
-        by_merchant: dict[str, list[Transaction]] = defaultdict(list)
-        for txn in transactions:
-            by_merchant[txn.merchant].append(txn)
-
-        updated: list[Transaction] = []
-        for merchant, txns in by_merchant.items():
-            if len(txns) < 2:
-                updated.extend(txns)
-                continue
+class NessieService(_NessieBase):
+    """Client for Capital One Nessie sandbox API."""
 
-            # Sort by date
-            txns.sort(key=lambda t: t.date)
+    def __init__(
+        self,
+        api_key: str,
+        categories: CategoryIndex | None = None,
+        merchants: MerchantCategorizer | None = None,
+    ):
+        super().__init__(api_key, categories, merchants)
+        self.client = httpx.Client(
+            base_url=NESSIE_BASE_URL,
+            timeout=HTTP_TIMEOUT,
+        )
 
-            # Check if amounts are consistent (within 10% variance)
-            amounts = [abs(t.amount) for t in txns]
-            avg_amount = sum(amounts) / len(amounts)
-            if avg_amount == 0:
-                updated.extend(txns)
-                continue
+    def build_snapshot(self, days: int = 90) -> FinancialSnapshot:
+        """Build a complete financial snapshot from Nessie data."""
+        accounts = self.get_accounts()
+        all_transactions: list[Transaction] = []
 
-            consistent = all(
-                abs(a - avg_amount) / avg_amount <= 0.10 for a in amounts
+        for account in accounts:
+            txns = self.get_transactions(account.account_id, days=days)
+            all_transactions.extend(txns)
+
+        return self._assemble_snapshot(accounts, all_transactions)
+
+    def sync_snapshot(
+        self, state: NessieSyncState | None = None, days: int = 90
+    ) -> tuple[FinancialSnapshot, NessieSyncState]:
+        """Incrementally refresh from Nessie, merging only new purchases."""
+        accounts = self.get_accounts()
+        raw_by_account = {
+            a.account_id: self._fetch_purchases(a.account_id) for a in accounts
+        }
+        return self._merge_sync(state, accounts, raw_by_account, days)
+
+    def get_accounts(self) -> list[AccountSummary]:
+        """Fetch all accounts from Nessie API."""
+        try:
+            response = self.client.get(
+                "/accounts", params={"key": self.api_key}
             )
+            response.raise_for_status()
+            return self._parse_accounts(response.json())
+        except httpx.HTTPError as e:
+            logger.error("Failed to fetch accounts from Nessie", error=str(e))
+            raise NessieApiError(f"Failed to fetch accounts: {e}") from e
 
-            if not consistent:
-                updated.extend(txns)
-                continue
+    def get_transactions(
+        self, account_id: str, days: int = 90
+    ) -> list[Transaction]:
+        """Fetch purchases for an account from Nessie API."""
+        raw_transactions = self._fetch_purchases(account_id)
+        return self._parse_transactions(raw_transactions, account_id, days)
 
-            # Check if they occur within roughly monthly intervals
-            intervals = []
-            for i in range(1, len(txns)):
-                delta = (txns[i].date - txns[i - 1].date).days
-                intervals.append(delta)
-
-            avg_interval = sum(intervals) / len(intervals) if intervals else 30
-
-            # Flag as recurring if average interval is roughly monthly (7-45 days)
-            if 7 <= avg_interval <= 45:
-                last_date = txns[-1].date
-                next_date = last_date + timedelta(days=int(avg_interval))
-                for txn in txns:
-                    updated.append(
-                        txn.model_copy(
-                            update={
-                                "is_recurring": True,
-                                "next_expected_date": next_date,
-                            }
-                        )
-                    )
-            else:
-                updated.extend(txns)
+    def _fetch_purchases(self, account_id: str) -> list[dict]:
+        """Fetch raw purchase records for an account."""
+        try:
+            response = self.client.get(
+                f"/accounts/{account_id}/purchases",
+                params={"key": self.api_key},
+            )
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPError as e:
+            logger.error(
+                "Failed to fetch transactions from Nessie",
+                account_id=account_id,
+                error=str(e),
+            )
+            raise NessieApiError(f"Failed to fetch transactions: {e}") from e
+
+
+class AsyncNessieService(_NessieBase):
+    """
+    Async client for Capital One Nessie sandbox API.
+
+    Purchases for every account are fetched concurrently over one pooled
+    httpx.AsyncClient; max_concurrency caps in-flight requests. The client
+    is bound to the event loop it first runs on, so use it as an async
+    context manager (or call aclose()) within that loop.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        categories: CategoryIndex | None = None,
+        merchants: MerchantCategorizer | None = None,
+    ):
+        super().__init__(api_key, categories, merchants)
+        self.max_concurrency = max(1, max_concurrency)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.client = httpx.AsyncClient(
+            base_url=NESSIE_BASE_URL,
+            timeout=HTTP_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+            ),
+        )
+
+    async def __aenter__(self) -> "AsyncNessieService":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client."""
+        await self.client.aclose()
+
+    async def build_snapshot(self, days: int = 90) -> FinancialSnapshot:
+        """Build a complete financial snapshot, fetching accounts concurrently."""
+        accounts = await self.get_accounts()
+        per_account = await self._fetch_all(accounts)
+
+        def assemble() -> FinancialSnapshot:
+            all_transactions: list[Transaction] = []
+            for account, raw in zip(accounts, per_account):
+                all_transactions.extend(
+                    self._parse_transactions(raw, account.account_id, days)
+                )
+            return self._assemble_snapshot(accounts, all_transactions)
+
+        return await asyncio.to_thread(assemble)
+
+    async def sync_snapshot(
+        self, state: NessieSyncState | None = None, days: int = 90
+    ) -> tuple[FinancialSnapshot, NessieSyncState]:
+        """Incrementally refresh from Nessie, merging only new purchases."""
+        accounts = await self.get_accounts()
+        per_account = await self._fetch_all(accounts)
+        raw_by_account = {
+            a.account_id: raw for a, raw in zip(accounts, per_account)
+        }
+        # Normalization and aggregation are CPU-bound; keep them off the loop
+        return await asyncio.to_thread(
+            self._merge_sync, state, accounts, raw_by_account, days
+        )
+
+    async def get_accounts(self) -> list[AccountSummary]:
+        """Fetch all accounts from Nessie API."""
+        try:
+            async with self._semaphore:
+                response = await self.client.get(
+                    "/accounts", params={"key": self.api_key}
+                )
+            response.raise_for_status()
+            return self._parse_accounts(response.json())
+        except httpx.HTTPError as e:
+            logger.error("Failed to fetch accounts from Nessie", error=str(e))
+            raise NessieApiError(f"Failed to fetch accounts: {e}") from e
+
+    async def get_transactions(
+        self, account_id: str, days: int = 90
+    ) -> list[Transaction]:
+        """Fetch purchases for an account from Nessie API."""
+        raw_transactions = await self._fetch_purchases(account_id)
+        return self._parse_transactions(raw_transactions, account_id, days)
 
-        return updated
+    async def _fetch_all(self, accounts: list[AccountSummary]) -> list[list[dict]]:
+        """
+        Raw purchases for every account.
+
+        The first failure (or cancellation) cancels the other requests and
+        waits for them to unwind before propagating.
+        """
+        tasks = [
+            asyncio.create_task(self._fetch_purchases(a.account_id)) for a in accounts
+        ]
+        try:
+            return await asyncio.gather(*tasks)
+        finally:
+            pending = [task for task in tasks if not task.done()]
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _fetch_purchases(self, account_id: str) -> list[dict]:
+        """Fetch raw purchase records for an account."""
+        try:
+            async with self._semaphore:
+                response = await self.client.get(
+                    f"/accounts/{account_id}/purchases",
+                    params={"key": self.api_key},
+                )
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPError as e:
+            logger.error(
+                "Failed to fetch transactions from Nessie",
+                account_id=account_id,
+                error=str(e),
+            )
+            raise NessieApiError(f"Failed to fetch transactions: {e}") from e
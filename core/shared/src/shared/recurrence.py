@@ -0,0 +1,254 @@
+"""
+Incremental recurring-charge detection.
+
+Transactions are grouped into series by a normalized merchant key and the
+direction of money flow, so "NETFLIX.COM 8841" and "Netflix.com" land in
+the same series while a refund never joins its charge. Each series keeps a
+bounded window of its most recent observations and is re-scored only when
+a new observation arrives, so feeding in a sync delta costs O(new) series
+updates rather than a pass over the whole history.
+
+A series is scored against weekly, biweekly, monthly, quarterly and annual
+cadences. An interval counts toward a cadence when it lands within
+tolerance of a whole number of periods (up to MAX_SKIPPED_PERIODS missed
+charges); amounts may drift by up to AMOUNT_DRIFT between consecutive
+charges, so gradual price increases do not break a series.
+
+Series outlive the purchase history they were built from: one is dropped
+only once its next charge is more than MAX_SKIPPED_PERIODS periods overdue
+(see RecurringSeries.expires_at), so an annual charge is still matched a
+year later even though the sync state keeps six months of purchases.
+
+RecurrenceState is a Pydantic model so it can ride along in the persisted
+Nessie sync state.
+"""
+
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from typing import Iterable, Literal
+
+from pydantic import BaseModel
+
+from shared.merchants import merchant_tokens
+from shared.models import Transaction
+
+Cadence = Literal["weekly", "biweekly", "monthly", "quarterly", "annual"]
+
+# Cadence -> (period in days, allowed deviation in days per period)
+CADENCES: dict[str, tuple[float, float]] = {
+    "weekly": (7.0, 1.5),
+    "biweekly": (14.0, 2.0),
+    "monthly": (30.44, 4.0),
+    "quarterly": (91.31, 10.0),
+    "annual": (365.25, 20.0),
+}
+
+# Observations kept per series (two years of monthly charges)
+MAX_OBSERVATIONS = 24
+
+# Missed charges tolerated inside one interval
+MAX_SKIPPED_PERIODS = 2
+
+# Max relative amount change between consecutive charges
+AMOUNT_DRIFT = 0.15
+
+# Series at or above this confidence are flagged as recurring
+MIN_CONFIDENCE = 0.5
+
+def series_key(txn: Transaction) -> str:
+    """Normalized merchant plus flow direction, e.g. '-netflix'."""
+    tokens = merchant_tokens(txn.merchant)
+    sign = "+" if txn.amount > 0 else "-"
+    return sign + " ".join(tokens or [txn.merchant.lower()])
+
+
+class RecurringSeries(BaseModel):
+    """One merchant's charge history and its current cadence estimate."""
+
+    key: str
+    merchant: str  # Display name from the latest observation
+    dates: list[datetime] = []  # Ascending
+    amounts: list[float] = []  # Absolute amounts, aligned with dates
+    ids: list[str] = []  # Transaction ids, aligned with dates
+    cadence: Cadence | None = None
+    period_days: float | None = None  # Observed mean period for the cadence
+    confidence: float = 0.0
+    typical_amount: float = 0.0
+    next_expected_date: datetime | None = None
+
+    @property
+    def is_recurring(self) -> bool:
+        return self.cadence is not None and self.confidence >= MIN_CONFIDENCE
+
+    @property
+    def expires_at(self) -> datetime | None:
+        """
+        When the series lapses: the last charge plus as many periods (and
+        tolerance) as one interval may span. Series not yet recurring get
+        the longest cadence, so a yearly charge can find its second one.
+        """
+        if not self.dates:
+            return None
+        period, tolerance = CADENCES[self.cadence if self.is_recurring else "annual"]
+        if self.is_recurring and self.period_days:
+            period = self.period_days
+        return self.dates[-1] + timedelta(days=(period + tolerance) * (MAX_SKIPPED_PERIODS + 1))
+
+    def add(self, txn: Transaction) -> bool:
+        """Insert an observation in date order; False if already seen."""
+        if txn.id in self.ids:
+            return False
+        i = bisect_left(self.dates, txn.date)
+        self.dates.insert(i, txn.date)
+        self.amounts.insert(i, abs(txn.amount))
+        self.ids.insert(i, txn.id)
+        if i == len(self.dates) - 1:
+            self.merchant = txn.merchant
+
+        excess = len(self.dates) - MAX_OBSERVATIONS
+        if excess > 0:
+            del self.dates[:excess], self.amounts[:excess], self.ids[:excess]
+        return True
+
+    def rescore(self) -> None:
+        """Recompute cadence, confidence and next date from the window."""
+        self.cadence = None
+        self.period_days = None
+        self.confidence = 0.0
+        self.next_expected_date = None
+        self.typical_amount = round(_median(self.amounts), 2) if self.amounts else 0.0
+        if len(self.dates) < 2:
+            return
+
+        intervals = [
+            (b - a).total_seconds() / 86_400
+            for a, b in zip(self.dates, self.dates[1:])
+        ]
+        best = max(
+            (_fit_cadence(name, intervals) for name in CADENCES),
+            key=lambda fit: (fit[1], -fit[2]),
+        )
+        name, interval_score, skipped, period = best
+        if interval_score == 0:
+            return
+
+        stable = sum(
+            1 for a, b in zip(self.amounts, self.amounts[1:])
+            if abs(b - a) <= AMOUNT_DRIFT * max(a, b)
+        )
+        amount_score = stable / len(intervals)
+        # More evidence -> more confidence; skipped periods count against it
+        evidence = len(intervals) / (len(intervals) + 1)
+        skip_penalty = 1 - skipped / (2 * (skipped + len(intervals)))
+
+        self.cadence = name
+        self.period_days = round(period, 2)
+        self.confidence = round(interval_score * amount_score * evidence * skip_penalty, 3)
+        self.next_expected_date = self.dates[-1] + timedelta(days=round(period))
+
+
+def _median(values: list[float]) -> float:
+    ordered = sorted(values)
+    mid = len(ordered) // 2
+    if len(ordered) % 2:
+        return ordered[mid]
+    return (ordered[mid - 1] + ordered[mid]) / 2
+
+
+def _fit_cadence(
+    name: str, intervals: list[float]
+) -> tuple[str, float, int, float]:
+    """
+    Score intervals against one cadence.
+
+    Returns (name, fraction of intervals matching, skipped periods, mean
+    observed period). At least one interval must match a single period, so
+    two charges 60 days apart are not read as "monthly with a gap".
+    """
+    period, tolerance = CADENCES[name]
+    matched = 0
+    skipped = 0
+    single = 0
+    periods_total = 0
+    days_total = 0.0
+    for days in intervals:
+        k = round(days / period)
+        if k < 1 or k > MAX_SKIPPED_PERIODS + 1:
+            continue
+        if abs(days - k * period) > tolerance * k:
+            continue
+        matched += 1
+        skipped += k - 1
+        single += k == 1
+        periods_total += k
+        days_total += days
+    if not single:
+        return name, 0.0, 0, period
+    return name, matched / len(intervals), skipped, days_total / periods_total
+
+
+class RecurrenceState(BaseModel):
+    """All series for one user, keyed by series_key."""
+
+    series: dict[str, RecurringSeries] = {}
+
+    def observe(self, transactions: Iterable[Transaction]) -> set[str]:
+        """Add transactions and rescore the series they touch."""
+        touched: set[str] = set()
+        for txn in transactions:
+            key = series_key(txn)
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = RecurringSeries(key=key, merchant=txn.merchant)
+            if series.add(txn):
+                touched.add(key)
+
+        for key in touched:
+            self.series[key].rescore()
+        return touched
+
+    def prune(self, now: datetime) -> None:
+        """Drop series that have lapsed by now (see RecurringSeries.expires_at)."""
+        self.series = {
+            key: s for key, s in self.series.items()
+            if s.dates and s.expires_at >= now
+        }
+
+    def recurring(self) -> list[RecurringSeries]:
+        """Series currently flagged as recurring, most confident first."""
+        return sorted(
+            (s for s in self.series.values() if s.is_recurring),
+            key=lambda s: -s.confidence,
+        )
+
+    def flag(self, transactions: list[Transaction]) -> list[Transaction]:
+        """
+        Return transactions with recurring flags applied.
+
+        Transactions whose series is recurring are rebuilt with
+        is_recurring and next_expected_date set; everything else is passed
+        through unchanged. The inputs are never mutated.
+        """
+        flagged: list[Transaction] = []
+        for txn in transactions:
+            series = self.series.get(series_key(txn))
+            if series is None or not series.is_recurring:
+                flagged.append(txn)
+                continue
+            flagged.append(
+                Transaction(
+                    **{
+                        **txn.__dict__,
+                        "is_recurring": True,
+                        "next_expected_date": series.next_expected_date,
+                    }
+                )
+            )
+        return flagged
+
+
+def detect_recurring(transactions: list[Transaction]) -> list[Transaction]:
+    """One-shot detection over a full transaction list."""
+    state = RecurrenceState()
+    state.observe(transactions)
+    return state.flag(transactions)
@@ -0,0 +1,140 @@
+"""
+Materialized per-month transaction rollups.
+
+A MonthlyRollup holds one month's income, spending and per-category
+spending in exact cents. Rollups are rebuilt only for the months a sync
+touched (new purchases, the current month, and every month that closed
+since the previous sync) and persisted as small per-month items, so the
+monthly report is assembled from at most six rollups instead of the raw
+history. Months older than the retained history keep the rollup written
+while they were still covered.
+"""
+
+from datetime import datetime, timezone
+from typing import Iterable, Sequence
+
+import numpy as np
+from pydantic import BaseModel
+
+from shared.frame import TransactionFrame
+from shared.models import MonthlySummary, Transaction
+
+
+def month_key(value: datetime) -> str:
+    """YYYY-MM of a datetime (naive = UTC), matching TransactionFrame months."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.strftime("%Y-%m")
+
+
+class MonthlyRollup(BaseModel):
+    """One month of transactions, aggregated."""
+
+    month: str  # YYYY-MM
+    income_cents: int = 0
+    spending_cents: int = 0  # Needs + wants, absolute
+    categories: dict[str, int] = {}  # Spending cents per category, name order
+    transaction_count: int = 0
+    closed: bool = False  # Month had ended when the rollup was built
+
+    def to_summary(self) -> MonthlySummary:
+        income = self.income_cents / 100
+        spending = self.spending_cents / 100
+        spending_ratio = spending / income if income > 0 else 0
+        return MonthlySummary(
+            month=self.month,
+            income=round(income, 2),
+            spending=round(spending, 2),
+            net=round(income - spending, 2),
+            spending_ratio=round(spending_ratio, 2),
+            categories={k: round(v / 100, 2) for k, v in self.categories.items()},
+        )
+
+
+def build_rollups(
+    frame: TransactionFrame,
+    months: Iterable[str] | None = None,
+    now: datetime | None = None,
+) -> list[MonthlyRollup]:
+    """
+    Rollups for the frame's months (or just the given ones), oldest first.
+
+    Requested months without any transactions get an empty rollup so a
+    stale item is overwritten.
+    """
+    current = month_key(now or datetime.now(timezone.utc))
+    month_codes, month_keys = frame.month_codes()
+    n_months = len(month_keys)
+    n_categories = len(frame.categories)
+
+    income_mask = frame.bucket_mask("income")
+    spending_mask = frame.bucket_mask("needs", "wants")
+    income_cents = frame.group_sum(
+        month_codes[income_mask], frame.amount_cents[income_mask], n_months
+    )
+    spending_cents = frame.group_sum(
+        month_codes[spending_mask], frame.abs_cents[spending_mask], n_months
+    )
+    row_counts = np.bincount(month_codes, minlength=n_months)
+
+    # Category breakdown: one flat (month, category) grouping
+    cell = month_codes[spending_mask] * n_categories + frame.category_codes[spending_mask]
+    size = n_months * n_categories
+    cell_counts = np.bincount(cell, minlength=size).reshape(n_months, n_categories)
+    cell_cents = frame.group_sum(
+        cell, frame.abs_cents[spending_mask], size
+    ).reshape(n_months, n_categories)
+
+    index = {key: code for code, key in enumerate(month_keys)}
+    wanted = sorted(set(months)) if months is not None else list(month_keys)
+    rollups = []
+    for month in wanted:
+        code = index.get(month)
+        if code is None:
+            rollups.append(MonthlyRollup(month=month, closed=month < current))
+            continue
+        categories = {
+            frame.categories[c]: int(cell_cents[code, c])
+            for c in np.flatnonzero(cell_counts[code])
+        }
+        rollups.append(MonthlyRollup(
+            month=month,
+            income_cents=int(income_cents[code]),
+            spending_cents=int(spending_cents[code]),
+            categories=dict(sorted(categories.items())),
+            transaction_count=int(row_counts[code]),
+            closed=month < current,
+        ))
+    return rollups
+
+
+def touched_months(
+    new_transactions: Sequence[Transaction],
+    now: datetime,
+    previous_sync: datetime | None,
+    retention_cutoff: datetime,
+) -> set[str]:
+    """
+    Months whose rollups a sync must rewrite.
+
+    Every month from the previous sync's through the current one (so
+    months that ended since, with or without purchases, are written as
+    closed), plus every month a new purchase landed in. The month
+    containing retention_cutoff is only partly in the retained history and
+    keeps its stored rollup.
+    """
+    complete_from = _next_month(month_key(retention_cutoff))
+    current = month_key(now)
+    months = {current}
+    if previous_sync is not None:
+        month = max(month_key(previous_sync), complete_from)
+        while month < current:
+            months.add(month)
+            month = _next_month(month)
+    months.update(month_key(t.date) for t in new_transactions)
+    return {m for m in months if m >= complete_from}
+
+
+def _next_month(month: str) -> str:
+    year, mon = map(int, month.split("-"))
+    return f"{year + mon // 12}-{mon % 12 + 1:02d}"
@@ -0,0 +1,367 @@
+"""
+Streaming, mergeable spending statistics.
+
+SpendingStats summarizes one stream of amounts (typically one user's
+spending in one category) without keeping the raw values:
+
+- RunningMoments: count, mean and variance via Welford's update, with
+  batches and shards combined by Chan's parallel formula.
+- QuantileDigest: a merging t-digest for median and MAD. Values are
+  buffered and only compressed into centroids once the buffer outgrows
+  BUFFER_FACTOR * compression, so streams of a few hundred values (a
+  category's 90 days) give the exact median and MAD.
+- Ewma: exponentially time-decayed mean with a half-life in days. It is
+  kept as decayed sums relative to the newest timestamp, so it does not
+  depend on arrival order and merges exactly.
+
+Every part can be merged with the same part from another shard, and all
+are Pydantic models so they can be persisted with per-user state. Values
+can also be removed again (e.g. purchases aging out of a window): moments
+and the EWMA exactly up to rounding, the digest only while it still holds
+the raw values in its buffer.
+SpendingProfile keeps a SpendingStats per category.
+
+z_score() and robust_z_score() turn the numbers into anomaly scores; the
+agent's anomaly tool and the asteroid detector both use them.
+"""
+
+import math
+from collections import Counter
+from typing import Iterable, Sequence
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+from shared.frame import BUCKETS, TransactionFrame, to_epoch_us
+from shared.models import Transaction
+
+# Score reported when the spread is zero but the amount differs
+MAX_SCORE = 10.0
+
+# Scales MAD to a standard deviation for normally distributed data
+MAD_TO_SIGMA = 0.6745
+
+DEFAULT_COMPRESSION = 100.0
+BUFFER_FACTOR = 5
+
+DEFAULT_HALF_LIFE_DAYS = 30.0
+
+_US_PER_DAY = 86_400_000_000
+_INCOME = BUCKETS.index("income")
+
+
+def z_score(amount: float, mean: float, stddev: float) -> float:
+    """Distance from the mean in standard deviations."""
+    if stddev == 0:
+        return 0.0 if amount == mean else MAX_SCORE
+    return round(abs(amount - mean) / stddev, 2)
+
+
+def robust_z_score(amount: float, median: float, mad: float) -> float:
+    """Modified z-score (Iglewicz-Hoaglin): 0.6745 * |x - median| / MAD."""
+    if mad == 0:
+        return 0.0 if amount == median else MAX_SCORE
+    return round(MAD_TO_SIGMA * abs(amount - median) / mad, 2)
+
+
+class RunningMoments(BaseModel):
+    """Count, mean and sum of squared deviations (Welford)."""
+
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    @property
+    def variance(self) -> float:
+        """Population variance."""
+        return self.m2 / self.count if self.count else 0.0
+
+    @property
+    def stddev(self) -> float:
+        return math.sqrt(self.variance)
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def add_many(self, values: Sequence[float] | np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        if len(values):
+            mean = float(values.mean())
+            self._combine(len(values), mean, float(((values - mean) ** 2).sum()))
+
+    def remove_many(self, values: Sequence[float] | np.ndarray) -> None:
+        """Take previously added values back out (Chan's formula in reverse)."""
+        values = np.asarray(values, dtype=np.float64)
+        count = len(values)
+        if not count:
+            return
+        rest = self.count - count
+        if rest <= 0:
+            self.count, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        mean = float(values.mean())
+        m2 = float(((values - mean) ** 2).sum())
+        rest_mean = (self.count * self.mean - count * mean) / rest
+        delta = mean - rest_mean
+        self.m2 = max(0.0, self.m2 - m2 - delta * delta * rest * count / self.count)
+        self.mean = rest_mean
+        self.count = rest
+
+    def merge(self, other: "RunningMoments") -> None:
+        self._combine(other.count, other.mean, other.m2)
+
+    def _combine(self, count: int, mean: float, m2: float) -> None:
+        if not count:
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+
+
+class QuantileDigest(BaseModel):
+    """Merging t-digest (k1 scale function) over a buffered stream."""
+
+    compression: float = DEFAULT_COMPRESSION
+    means: list[float] = []  # Centroid means, ascending
+    weights: list[float] = []
+    buffer: list[float] = []
+
+    @property
+    def count(self) -> float:
+        return sum(self.weights) + len(self.buffer)
+
+    def add_many(self, values: Iterable[float]) -> None:
+        self.buffer.extend(values)
+        if len(self.buffer) > BUFFER_FACTOR * self.compression:
+            self._compress()
+
+    def remove_many(self, values: Iterable[float]) -> bool:
+        """
+        Remove values from the buffer; False (and unchanged) if the digest
+        has been compressed or a value is not buffered.
+        """
+        if self.means:
+            return False
+        remaining = Counter(self.buffer)
+        remaining.subtract(values)
+        if any(n < 0 for n in remaining.values()):
+            return False
+        # Keep the surviving values in arrival order
+        keep = dict(remaining)
+        buffer = []
+        for value in self.buffer:
+            if keep[value] > 0:
+                keep[value] -= 1
+                buffer.append(value)
+        self.buffer = buffer
+        return True
+
+    def merge(self, other: "QuantileDigest") -> None:
+        self.means = self.means + other.means
+        self.weights = self.weights + other.weights
+        self.add_many(other.buffer)
+        if len(self.means) > self.compression:
+            self._compress()
+
+    def _points(self) -> tuple[np.ndarray, np.ndarray]:
+        """Centroids and buffered values as (means, weights), sorted."""
+        means = np.concatenate([np.asarray(self.means), np.asarray(self.buffer)])
+        weights = np.concatenate([np.asarray(self.weights), np.ones(len(self.buffer))])
+        order = np.argsort(means, kind="stable")
+        return means[order], weights[order]
+
+    def _compress(self) -> None:
+        means, weights = self._points()
+        total = weights.sum()
+        merged_means: list[float] = []
+        merged_weights: list[float] = []
+        k_limit = self._k(0.0) + 1
+        so_far = 0.0
+        for mean, weight in zip(means.tolist(), weights.tolist()):
+            if merged_weights and self._k((so_far + weight) / total) <= k_limit:
+                w = merged_weights[-1] + weight
+                merged_means[-1] += (mean - merged_means[-1]) * weight / w
+                merged_weights[-1] = w
+            else:
+                if merged_weights:
+                    k_limit = self._k(so_far / total) + 1
+                merged_means.append(mean)
+                merged_weights.append(weight)
+            so_far += weight
+        self.means = merged_means
+        self.weights = merged_weights
+        self.buffer = []
+
+    def _k(self, q: float) -> float:
+        q = min(max(q, 0.0), 1.0)
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+    @staticmethod
+    def _interpolate(q: float, means: np.ndarray, weights: np.ndarray) -> float:
+        if not len(means):
+            return 0.0
+        # Each centroid sits at the middle of the rank range it covers
+        centers = np.cumsum(weights) - weights / 2
+        return float(np.interp(q * weights.sum(), centers, means))
+
+    def quantile(self, q: float) -> float:
+        means, weights = self._points()
+        return self._interpolate(q, means, weights)
+
+    def median(self) -> float:
+        return self.quantile(0.5)
+
+    def mad(self) -> float:
+        """Median absolute deviation from the median."""
+        means, weights = self._points()
+        deviations = np.abs(means - self._interpolate(0.5, means, weights))
+        order = np.argsort(deviations, kind="stable")
+        return self._interpolate(0.5, deviations[order], weights[order])
+
+
+class Ewma(BaseModel):
+    """Time-decayed mean; weights halve every half_life_days."""
+
+    half_life_days: float = DEFAULT_HALF_LIFE_DAYS
+    weighted_sum: float = 0.0
+    weight: float = 0.0
+    as_of_us: int | None = None  # Sums are decayed to this timestamp
+
+    @property
+    def value(self) -> float:
+        return self.weighted_sum / self.weight if self.weight else 0.0
+
+    def _decay(self, from_us: int | np.ndarray, to_us: int) -> float | np.ndarray:
+        return 0.5 ** ((to_us - from_us) / (self.half_life_days * _US_PER_DAY))
+
+    def _rebase(self, as_of_us: int) -> None:
+        if self.as_of_us is not None and as_of_us > self.as_of_us:
+            factor = self._decay(self.as_of_us, as_of_us)
+            self.weighted_sum *= factor
+            self.weight *= factor
+        if self.as_of_us is None or as_of_us > self.as_of_us:
+            self.as_of_us = as_of_us
+
+    def add_many(self, values: Sequence[float] | np.ndarray, times_us: Sequence[int] | np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        times_us = np.asarray(times_us, dtype=np.int64)
+        if not len(values):
+            return
+        self._rebase(int(times_us.max()))
+        w = self._decay(times_us, self.as_of_us)
+        self.weighted_sum += float((w * values).sum())
+        self.weight += float(w.sum())
+
+    def remove_many(self, values: Sequence[float] | np.ndarray, times_us: Sequence[int] | np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        times_us = np.asarray(times_us, dtype=np.int64)
+        if not len(values) or self.as_of_us is None:
+            return
+        w = self._decay(times_us, self.as_of_us)
+        self.weighted_sum -= float((w * values).sum())
+        self.weight -= float(w.sum())
+        if self.weight <= 1e-12:
+            self.weighted_sum = self.weight = 0.0
+
+    def merge(self, other: "Ewma") -> None:
+        if other.as_of_us is None:
+            return
+        self._rebase(other.as_of_us)
+        factor = self._decay(other.as_of_us, self.as_of_us)
+        self.weighted_sum += other.weighted_sum * factor
+        self.weight += other.weight * factor
+
+
+class SpendingStats(BaseModel):
+    """Moments, quantiles and trend for one stream of absolute amounts."""
+
+    moments: RunningMoments = Field(default_factory=RunningMoments)
+    digest: QuantileDigest = Field(default_factory=QuantileDigest)
+    ewma: Ewma = Field(default_factory=Ewma)
+
+    @property
+    def count(self) -> int:
+        return self.moments.count
+
+    def add_many(self, amounts: Sequence[float] | np.ndarray, times_us: Sequence[int] | np.ndarray) -> None:
+        amounts = np.abs(np.asarray(amounts, dtype=np.float64))
+        self.moments.add_many(amounts)
+        self.digest.add_many(amounts.tolist())
+        self.ewma.add_many(amounts, times_us)
+
+    def remove_many(self, amounts: Sequence[float] | np.ndarray, times_us: Sequence[int] | np.ndarray) -> bool:
+        """
+        Take previously added amounts back out. False, with nothing
+        changed, when the digest can no longer remove exactly; rebuild the
+        stats from the remaining amounts instead.
+        """
+        amounts = np.abs(np.asarray(amounts, dtype=np.float64))
+        if not self.digest.remove_many(amounts.tolist()):
+            return False
+        self.moments.remove_many(amounts)
+        self.ewma.remove_many(amounts, times_us)
+        return True
+
+    def merge(self, other: "SpendingStats") -> None:
+        self.moments.merge(other.moments)
+        self.digest.merge(other.digest)
+        self.ewma.merge(other.ewma)
+
+    def summary(self) -> dict[str, float]:
+        """Rounded numbers for reports and agent slices."""
+        return {
+            "count": self.count,
+            "mean": round(self.moments.mean, 2),
+            "stddev": round(self.moments.stddev, 2),
+            "median": round(self.digest.median(), 2),
+            "mad": round(self.digest.mad(), 2),
+            "ewma": round(self.ewma.value, 2),
+        }
+
+
+class SpendingProfile(BaseModel):
+    """Per-category SpendingStats for one user (or one shard of one)."""
+
+    categories: dict[str, SpendingStats] = {}
+
+    @classmethod
+    def from_frame(cls, frame: TransactionFrame) -> "SpendingProfile":
+        """Profile of a frame's spending (non-income) rows."""
+        profile = cls()
+        profile.observe_frame(frame)
+        return profile
+
+    def observe_frame(self, frame: TransactionFrame, rows: np.ndarray | None = None) -> None:
+        """Add spending rows (all of the frame's by default) per category."""
+        if rows is None:
+            rows = np.flatnonzero(frame.bucket_codes != _INCOME)
+        codes = frame.category_codes[rows]
+        for code in np.unique(codes).tolist():
+            selected = rows[codes == code]
+            stats = self.categories.setdefault(frame.categories[code], SpendingStats())
+            stats.add_many(frame.abs_cents[selected] / 100, frame.date_us[selected])
+
+    def observe(self, transactions: Iterable[Transaction]) -> None:
+        """Add spending transactions one category batch at a time."""
+        grouped: dict[str, tuple[list[float], list[int]]] = {}
+        for txn in transactions:
+            if txn.bucket == "income":
+                continue
+            amounts, times = grouped.setdefault(txn.category, ([], []))
+            amounts.append(txn.amount)
+            times.append(to_epoch_us(txn.date))
+        for category, (amounts, times) in grouped.items():
+            self.categories.setdefault(category, SpendingStats()).add_many(amounts, times)
+
+    def merge(self, other: "SpendingProfile") -> None:
+        for category, stats in other.categories.items():
+            mine = self.categories.setdefault(category, SpendingStats())
+            mine.merge(stats)
+
+    def summaries(self) -> dict[str, dict[str, float]]:
+        return {category: stats.summary() for category, stats in sorted(self.categories.items())}
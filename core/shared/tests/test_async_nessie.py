@@ -0,0 +1,96 @@
+"""Tests for AsyncNessieService request fan-out."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from shared.nessie_service import NESSIE_BASE_URL, AsyncNessieService, NessieApiError
+
+ACCOUNTS = [
+    {"_id": f"acc{i}", "type": "Credit Card", "balance": 10, "nickname": f"Card {i}"}
+    for i in range(10)
+]
+
+
+class FakeNessie:
+    """httpx transport handler that tracks in-flight and cancelled requests."""
+
+    def __init__(self, delay=0.01, fail=None):
+        self.delay = delay
+        self.fail = fail  # Account ID whose purchases request fails
+        self.in_flight = 0
+        self.peak = 0
+        self.cancelled = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/accounts":
+            return httpx.Response(200, json=ACCOUNTS)
+        account_id = request.url.path.split("/")[2]
+        if account_id == self.fail:
+            return httpx.Response(500, json={"message": "boom"})
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.in_flight -= 1
+        return httpx.Response(200, json=[{
+            "_id": f"{account_id}-p", "purchase_date": "2026-03-10",
+            "amount": 5.0, "description": "Kroger",
+        }])
+
+
+def _service(fake, max_concurrency=3):
+    service = AsyncNessieService(api_key="test", max_concurrency=max_concurrency)
+    service.client = httpx.AsyncClient(
+        base_url=NESSIE_BASE_URL, transport=httpx.MockTransport(fake)
+    )
+    return service
+
+
+def test_fan_out_stays_within_max_concurrency():
+    fake = FakeNessie()
+
+    async def run():
+        async with _service(fake) as service:
+            return await service.sync_snapshot(days=3650)
+
+    snapshot, state = asyncio.run(run())
+    assert 1 < fake.peak <= 3
+    assert len(snapshot.accounts) == len(ACCOUNTS)
+    assert len(state.transactions) == len(ACCOUNTS)
+
+
+def test_failed_account_raises_and_cancels_the_rest():
+    fake = FakeNessie(delay=1, fail="acc0")
+
+    async def run():
+        async with _service(fake, max_concurrency=len(ACCOUNTS)) as service:
+            with pytest.raises(NessieApiError):
+                await service.sync_snapshot()
+            # Siblings are already unwound when the error surfaces
+            assert fake.cancelled == len(ACCOUNTS) - 1
+            assert fake.in_flight == 0
+
+    asyncio.run(run())
+
+
+def test_cancelling_a_sync_cancels_in_flight_requests():
+    fake = FakeNessie(delay=1)
+
+    async def run():
+        async with _service(fake) as service:
+            task = asyncio.create_task(service.sync_snapshot())
+            while fake.in_flight < 3:
+                await asyncio.sleep(0.001)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            assert fake.cancelled == 3
+            assert fake.in_flight == 0
+
+    asyncio.run(run())
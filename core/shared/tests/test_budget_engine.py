@@ -0,0 +1,123 @@
+"""Property tests: the incremental budget matches the full calculation."""
+
+from datetime import datetime, timedelta, timezone
+
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from shared.budget_engine import BudgetAccumulator, calculate, calculate_many
+from shared.models import AccountSummary, FinancialSnapshot, Transaction
+from shared.nessie_service import NessieService
+
+NOW = datetime(2026, 3, 15, tzinfo=timezone.utc)
+
+CATEGORIES = ["rent", "groceries", "dining", "coffee", "investment", "salary", "misc"]
+
+transactions = st.builds(
+    lambda category, bucket, cents: (category, bucket, cents),
+    st.sampled_from(CATEGORIES),
+    st.sampled_from(["needs", "wants", "savings", "income", None]),
+    st.integers(min_value=-500_000, max_value=500_000),
+)
+
+# Each step inserts new rows, amends some existing ones and removes others
+steps = st.lists(
+    st.tuples(
+        st.lists(transactions, max_size=12),
+        st.lists(st.tuples(st.integers(min_value=0), transactions), max_size=4),
+        st.lists(st.integers(min_value=0), max_size=6),
+    ),
+    min_size=1,
+    max_size=6,
+)
+
+
+def _txn(txn_id, fields):
+    category, bucket, cents = fields
+    return Transaction(
+        id=txn_id,
+        account_id="acc",
+        date=NOW,
+        merchant="m",
+        category=category,
+        amount=cents / 100,
+        is_recurring=False,
+        bucket=bucket,
+    )
+
+
+def _snapshot(rows, income):
+    return FinancialSnapshot(
+        accounts=[
+            AccountSummary(account_id="cc", type="credit_card", balance=-1234.5, nickname="cc", source="mock")
+        ],
+        recent_transactions=list(rows.values()),
+        total_net_worth=0.0,
+        monthly_income=income,
+        monthly_spending=0.0,
+        snapshot_timestamp=NOW,
+    )
+
+
+@settings(max_examples=200, deadline=None)
+@given(steps, st.sampled_from([0.0, 850.0, 4200.0, 12000.0]))
+def test_apply_deltas_matches_full_calculation(steps, income):
+    rows: dict[str, Transaction] = {}
+    acc = BudgetAccumulator()
+    next_id = 0
+    for inserted, amended, removed in steps:
+        ids = list(rows)
+        delta = []
+        for fields in inserted:
+            txn = _txn(f"t{next_id}", fields)
+            next_id += 1
+            delta.append(txn)
+        for pick, fields in amended:
+            if ids:
+                delta.append(_txn(ids[pick % len(ids)], fields))
+        gone = {ids[pick % len(ids)] for pick in removed if ids}
+        delta = [t for t in delta if t.id not in gone]
+
+        for txn_id in gone:
+            del rows[txn_id]
+        rows.update((t.id, t) for t in delta)
+        acc.apply(inserted=delta, removed=gone)
+
+        snapshot = _snapshot(rows, income)
+        assert acc.report(snapshot) == calculate(snapshot)
+
+    # Persisted state round-trips and keeps agreeing after a full sync
+    restored = BudgetAccumulator.model_validate_json(acc.model_dump_json())
+    assert restored == acc
+    assert restored.sync(list(rows.values())) == 0
+
+
+def test_calculate_many_matches_per_snapshot():
+    snapshots = [
+        _snapshot({}, 3000.0),
+        _snapshot({f"a{i}": _txn(f"a{i}", (CATEGORIES[i % 7], "needs", -1000 - i)) for i in range(9)}, 3000.0),
+        _snapshot({f"b{i}": _txn(f"b{i}", (CATEGORIES[i % 3], ["wants", "savings", None][i % 3], -250 * i)) for i in range(7)}, 0.0),
+    ]
+    assert calculate_many(snapshots) == [calculate(s) for s in snapshots]
+
+
+def test_sync_deltas_follow_the_window():
+    # Weekly syncs over five months: new purchases enter the 90-day window
+    # while older ones age out, without a full diff after the first sync
+    service = NessieService(api_key="test")
+    account = AccountSummary(account_id="acc", type="credit_card", balance=0, nickname="Card", source="nessie")
+    purchases = []
+    state = None
+    for week in range(22):
+        day = NOW + timedelta(days=7 * week)
+        for i in range(3):
+            purchases.append({
+                "_id": f"w{week}-{i}",
+                "purchase_date": (day - timedelta(days=i)).date().isoformat(),
+                "amount": 10.0 * (i + 1) + week,
+                "description": ["Kroger", "Chipotle", "Netflix"][i],
+            })
+        snapshot, state = service._merge_sync(
+            state, [account], {"acc": list(purchases)}, days=90, now=day + timedelta(hours=12)
+        )
+        assert state.budget.report(snapshot) == calculate(snapshot)
@@ -0,0 +1,47 @@
+"""Tests for the category -> bucket index."""
+
+import pytest
+
+from shared.categories import (
+    DEFAULT_INDEX,
+    NEEDS,
+    WANTS,
+    categorize_many,
+    categorize_transaction,
+)
+
+
+def test_lists_map_to_buckets_case_insensitively():
+    assert all(categorize_transaction(c.upper()) == "needs" for c in NEEDS)
+    assert all(categorize_transaction(c) == "wants" for c in WANTS)
+    assert categorize_transaction("LOAN_PAYMENT") == "needs"
+    assert categorize_transaction("crypto") == "wants"
+
+
+def test_lookup_only_folds_case():
+    # Spelling variants stay unmapped, as they always have
+    assert categorize_transaction("Direct_Deposit") == "income"
+    assert categorize_transaction("Direct Deposit") == "wants"
+    assert categorize_transaction("direct-deposit") == "wants"
+    assert categorize_transaction(" rent") == "wants"
+    assert "Direct Deposit" not in DEFAULT_INDEX
+
+
+def test_aliases_and_overrides_layer_without_mutating_base():
+    tenant = DEFAULT_INDEX.extend(
+        aliases={"Netflix": "streaming", "pay": "salary"},
+        overrides={"gym": "needs"},
+    )
+    assert tenant.bucket("netflix") == "wants"
+    assert tenant.bucket("PAY") == "income"
+    assert tenant.bucket("gym") == "needs"
+    assert DEFAULT_INDEX.bucket("gym") == "wants"
+    assert "netflix" not in DEFAULT_INDEX
+
+    with pytest.raises(ValueError):
+        DEFAULT_INDEX.extend(overrides={"gym": "fun"})
+
+
+def test_categorize_many_matches_single_lookups():
+    categories = ["rent", "dining", "Salary", "unknown", "rent", "retirement"]
+    assert categorize_many(categories) == [categorize_transaction(c) for c in categories]
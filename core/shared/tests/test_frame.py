@@ -0,0 +1,69 @@
+"""Tests for the columnar TransactionFrame."""
+
+from datetime import datetime, timedelta, timezone
+
+from shared.frame import NO_DATE, TransactionFrame
+from shared.models import Transaction
+
+NOW = datetime(2026, 3, 15, 12, 0, tzinfo=timezone.utc)
+
+
+def _txn(i, category, amount, bucket, days_ago=0, recurring=False, next_in=None):
+    return Transaction(
+        id=f"t{i}",
+        account_id="acc",
+        date=NOW - timedelta(days=days_ago),
+        merchant=f"m{i % 3}",
+        category=category,
+        amount=amount,
+        is_recurring=recurring,
+        next_expected_date=NOW + timedelta(days=next_in) if next_in is not None else None,
+        bucket=bucket,
+    )
+
+
+FRAME = TransactionFrame([
+    _txn(0, "groceries", -10.10, "needs"),
+    _txn(1, "groceries", -20.20, "needs", days_ago=40),
+    _txn(2, "dining", -0.30, "wants", recurring=True, next_in=2),
+    _txn(3, "salary", 1000.00, "income", days_ago=20),
+])
+
+
+# --- Columns ---
+
+def test_amounts_are_integer_cents():
+    assert FRAME.amount_cents.tolist() == [-1010, -2020, -30, 100000]
+    assert FRAME.abs_cents.tolist() == [1010, 2020, 30, 100000]
+
+def test_labels_interned_in_first_appearance_order():
+    assert FRAME.categories == ("groceries", "dining", "salary")
+    assert FRAME.category_codes.tolist() == [0, 0, 1, 2]
+
+def test_missing_next_date_uses_sentinel():
+    assert (FRAME.next_expected_us == NO_DATE).tolist() == [True, True, False, True]
+
+def test_empty_frame():
+    empty = TransactionFrame([])
+    assert len(empty) == 0
+    assert empty.category_amounts(empty.bucket_mask("needs")) == {}
+
+
+# --- Aggregates ---
+
+def test_category_amounts_sum_exactly():
+    assert FRAME.category_amounts(FRAME.bucket_mask("needs", "wants")) == {
+        "groceries": 30.30,
+        "dining": 0.30,
+    }
+
+def test_since_mask():
+    assert FRAME.since_mask(NOW - timedelta(days=30)).tolist() == [True, False, True, True]
+
+def test_month_codes():
+    codes, labels = FRAME.month_codes()
+    assert labels == ("2026-02", "2026-03")
+    assert codes.tolist() == [1, 0, 1, 0]
+
+def test_days_until_floors_like_timedelta():
+    assert FRAME.days_until(FRAME.next_expected_us[[2]], NOW).tolist() == [2]
@@ -0,0 +1,44 @@
+"""Tests for merchant normalization and categorization."""
+
+from shared.merchants import (
+    DEFAULT_CATEGORIZER,
+    MerchantCategorizer,
+    merchant_tokens,
+)
+
+
+def test_tokens_drop_store_numbers_and_noise():
+    assert merchant_tokens("SQ *BLUE BOTTLE COFFEE #0042") == ("blue", "bottle", "coffee")
+    assert merchant_tokens("Trader Joe's 552") == ("trader", "joes")
+
+
+def test_longest_pattern_wins_anywhere_in_descriptor():
+    assert DEFAULT_CATEGORIZER.match("UBER   *TRIP HELP.UBER.COM").merchant == "Uber"
+    assert DEFAULT_CATEGORIZER.match("UBER EATS 8005928996").merchant == "Uber Eats"
+    found = DEFAULT_CATEGORIZER.match("POS DEBIT WHOLEFDS MKT 10234 AUSTIN")
+    assert (found.merchant, found.category, found.mct) == ("Whole Foods", "groceries", "MCT_GROCERY")
+
+
+def test_short_names_need_a_second_token_or_the_first_position():
+    for description in ("SHELL OIL 57444", "BP OIL #9434", "ATT*BILL PAYMENT",
+                        "TARGET 00012345", "AMC 9640 ONLINE"):
+        assert DEFAULT_CATEGORIZER.match(description).source == "pattern", description
+    for description in ("BP MEDICAL", "ATT LAW OFFICE", "SHELL BEACH CAFE",
+                        "ON TARGET FITNESS", "RIVERSIDE AMC CLINIC"):
+        assert DEFAULT_CATEGORIZER.match(description) is None, description
+    assert DEFAULT_CATEGORIZER.match("BP MEDICAL", mcc=8011).category == "medical"
+
+
+def test_mcc_then_fallback():
+    assert DEFAULT_CATEGORIZER.match("JOES BAR & GRILL", mcc="5813").category == "alcohol"
+    assert DEFAULT_CATEGORIZER.match("HOTEL CHAIN 123", mcc=3650).mct == "MCT_HOTEL_AND_LODGING"
+    assert DEFAULT_CATEGORIZER.categorize("Corner Store", fallback="groceries") == "groceries"
+    assert DEFAULT_CATEGORIZER.categorize("Corner Store") == "shopping"
+
+
+def test_custom_patterns_and_batch():
+    categorizer = MerchantCategorizer({"Local Gym": ("gym", 7997, ("iron temple",))})
+    descriptions = ["IRON TEMPLE LLC", "netflix.com", "unknown"]
+    assert categorizer.categorize_many(descriptions, fallbacks=[None, None, "dining"]) == [
+        "gym", "streaming", "dining",
+    ]
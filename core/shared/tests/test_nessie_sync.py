@@ -0,0 +1,112 @@
+"""Tests for the incremental Nessie sync merge."""
+
+from datetime import datetime, timedelta, timezone
+
+from shared.budget_engine import BudgetAccumulator
+from shared.models import AccountSummary
+from shared.nessie_service import HISTORY_RETENTION_DAYS, NessieService
+from shared.rollups import month_key
+
+NOW = datetime(2026, 3, 15, 12, 0, tzinfo=timezone.utc)
+
+ACCOUNT = AccountSummary(account_id="acc", type="credit_card", balance=0, nickname="Card", source="nessie")
+
+
+def _purchase(purchase_id, day, amount=12.5, description="Kroger"):
+    return {
+        "_id": purchase_id,
+        "purchase_date": day.date().isoformat(),
+        "amount": amount,
+        "description": description,
+    }
+
+
+def test_sync_delta_is_the_window_change():
+    service = NessieService(api_key="test")
+    purchases = []
+    state = None
+    window: dict[str, object] = {}
+    for week in range(20):
+        now = NOW + timedelta(days=7 * week)
+        purchases += [_purchase(f"w{week}-{i}", now - timedelta(days=2 * i)) for i in range(3)]
+        snapshot, state = service._merge_sync(state, [ACCOUNT], {"acc": list(purchases)}, days=90, now=now)
+        current = {t.id: t for t in snapshot.recent_transactions}
+
+        assert state.delta.until == now
+        if week == 0:
+            assert state.delta.since is None
+        else:
+            assert state.delta.since == now - timedelta(days=7)
+            assert {t.id for t in state.delta.inserted} == current.keys() - window.keys()
+            assert {t.id for t in state.delta.removed} == window.keys() - current.keys()
+        window = current
+
+
+def _sync(service, state, purchases, now, days=30):
+    return service._merge_sync(state, [ACCOUNT], {"acc": list(purchases)}, days=days, now=now)
+
+
+def _date(purchase):
+    return datetime.fromisoformat(purchase["purchase_date"]).replace(tzinfo=timezone.utc)
+
+
+def _window_entries(snapshot):
+    budget = BudgetAccumulator()
+    budget.sync(snapshot.recent_transactions)
+    return budget.entries
+
+
+def test_overlapping_resync_merges_each_purchase_once():
+    service = NessieService(api_key="test")
+    first = [_purchase(f"a{i}", NOW - timedelta(days=i)) for i in range(5)]
+    _, state = _sync(service, None, first, NOW)
+
+    later = NOW + timedelta(days=2)
+    second = first + [_purchase("b0", later), _purchase("b1", later - timedelta(days=1))]
+    snapshot, state = _sync(service, state, second, later)
+    ids = [t.id for t in state.transactions]
+    assert sorted(ids) == sorted({p["_id"] for p in second})
+    assert {t.id for t in state.delta.inserted} == {"b0", "b1"}
+    assert state.budget.entries == _window_entries(snapshot)
+    assert state.history_months == ["2026-03"]
+
+    # The same payload again changes nothing
+    snapshot, state = _sync(service, state, second, later)
+    assert len(state.transactions) == len(second)
+    assert not state.delta.inserted and not state.delta.removed
+    assert state.history_months == []
+
+
+def test_late_purchase_behind_the_mark_is_merged():
+    service = NessieService(api_key="test")
+    _, state = _sync(service, None, [_purchase("a0", NOW), _purchase("a1", NOW - timedelta(days=1))], NOW)
+    assert state.accounts["acc"].last_purchase_date == NOW.date().isoformat()
+
+    # Posted after the last sync but dated before its mark
+    late = _purchase("late", NOW - timedelta(days=3), amount=40.0)
+    later = NOW + timedelta(hours=6)
+    snapshot, state = _sync(service, state, [_purchase("a0", NOW), _purchase("a1", NOW - timedelta(days=1)), late], later)
+    assert "late" in {t.id for t in snapshot.recent_transactions}
+    assert [t.id for t in state.delta.inserted] == ["late"]
+    assert state.budget.entries == _window_entries(snapshot)
+    assert state.accounts["acc"].last_purchase_date == NOW.date().isoformat()
+
+
+def test_resync_across_the_retention_cutoff():
+    service = NessieService(api_key="test")
+    purchases = [_purchase(f"a{i}", NOW - timedelta(days=160 + i)) for i in range(10)]
+    purchases.append(_purchase("recent", NOW - timedelta(days=2)))
+    _, state = _sync(service, None, purchases, NOW)
+    assert len(state.transactions) == 11
+
+    # 20 days on, the oldest purchases fall out of the retained history;
+    # a late one dated past the cutoff is never merged
+    later = NOW + timedelta(days=20)
+    cutoff = later - timedelta(days=HISTORY_RETENTION_DAYS)
+    purchases.append(_purchase("ancient", later - timedelta(days=HISTORY_RETENTION_DAYS + 5)))
+    _, state = _sync(service, state, purchases, later)
+    kept = {t.id for t in state.transactions}
+    assert kept == {p["_id"] for p in purchases if _date(p) >= cutoff}
+    assert "ancient" not in kept
+    dropped_months = {month_key(_date(p)) for p in purchases[:-1] if _date(p) < cutoff}
+    assert dropped_months and set(state.history_months) == dropped_months
@@ -0,0 +1,97 @@
+"""Tests for incremental recurring-charge detection."""
+
+from datetime import datetime, timedelta, timezone
+
+from shared.models import AccountSummary, Transaction
+from shared.nessie_service import NessieService
+from shared.recurrence import RecurrenceState, detect_recurring, series_key
+
+START = datetime(2025, 1, 3, tzinfo=timezone.utc)
+
+
+def _txn(i, days, amount=-15.49, merchant="Netflix"):
+    return Transaction(
+        id=f"t{i}",
+        account_id="acc",
+        date=START + timedelta(days=days),
+        merchant=merchant,
+        category="subscriptions",
+        amount=amount,
+        is_recurring=False,
+        bucket="wants",
+    )
+
+
+def _series(transactions):
+    state = RecurrenceState()
+    state.observe(transactions)
+    return state.series[series_key(transactions[0])]
+
+
+def test_merchant_noise_and_direction_in_key():
+    assert series_key(_txn(0, 0, merchant="NETFLIX.COM 8841")) == series_key(_txn(1, 0))
+    assert series_key(_txn(0, 0, amount=15.49)) != series_key(_txn(1, 0))
+
+
+def test_cadences_detected():
+    for cadence, step in [("weekly", 7), ("biweekly", 14), ("monthly", 30), ("quarterly", 91), ("annual", 365)]:
+        series = _series([_txn(i, i * step) for i in range(4)])
+        assert series.cadence == cadence, cadence
+        assert series.is_recurring
+
+
+def test_amount_drift_and_skipped_period_tolerated():
+    # Price creeps up 5% a month and March's charge is missing
+    days = [0, 31, 90, 120, 151]
+    series = _series([_txn(i, d, amount=-10 * 1.05 ** i) for i, d in enumerate(days)])
+    assert series.cadence == "monthly"
+    assert series.is_recurring
+    assert series.next_expected_date == START + timedelta(days=151 + round(series.period_days))
+
+
+def test_irregular_merchant_not_flagged():
+    txns = [_txn(i, d, amount=-a) for i, (d, a) in enumerate([(0, 12), (3, 80), (17, 5), (60, 41)])]
+    assert not any(t.is_recurring for t in detect_recurring(txns))
+
+
+def test_incremental_matches_full_rescan():
+    txns = [_txn(i, i * 30) for i in range(8)]
+    full = RecurrenceState()
+    full.observe(txns)
+
+    state = RecurrenceState()
+    state.observe(txns[:5])
+    restored = RecurrenceState.model_validate(state.model_dump(mode="json"))
+    assert restored.observe(txns[5:] + txns[4:5]) == {series_key(txns[0])}
+    assert restored.series == full.series
+
+
+def test_lapsed_series_pruned():
+    state = RecurrenceState()
+    state.observe([_txn(i, i * 30) for i in range(4)])
+    series = state.series[series_key(_txn(0, 0))]
+    state.prune(series.expires_at)
+    assert state.series
+    state.prune(series.expires_at + timedelta(days=1))
+    assert not state.series
+
+
+def test_annual_series_survives_monthly_syncs():
+    # Twelve monthly syncs keep only 180 days of purchases; the yearly
+    # Amazon Prime charge must still be matched to last year's
+    service = NessieService(api_key="test")
+    account = AccountSummary(account_id="acc", type="credit_card", balance=0, nickname="Card", source="nessie")
+    purchases = []
+    state = None
+    for month in range(13):
+        day = START + timedelta(days=month * 30)
+        purchases.append({"_id": f"n{month}", "purchase_date": day.date().isoformat(), "amount": 15.49, "description": "Netflix"})
+        if month in (0, 12):
+            purchases.append({"_id": f"p{month}", "purchase_date": day.date().isoformat(), "amount": 139.0, "description": "Amazon Prime"})
+        snapshot, state = service._merge_sync(
+            state, [account], {"acc": list(purchases)}, days=90, now=day + timedelta(days=1)
+        )
+
+    prime = next(s for s in state.recurrence.series.values() if s.merchant == "Amazon Prime")
+    assert prime.cadence == "annual" and prime.is_recurring
+    assert all(t.is_recurring for t in snapshot.recent_transactions if t.merchant == "Amazon Prime")
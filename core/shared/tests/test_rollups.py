@@ -0,0 +1,100 @@
+"""Tests for materialized monthly rollups."""
+
+from datetime import datetime, timedelta, timezone
+
+from shared.frame import TransactionFrame
+from shared.models import Transaction
+from shared.rollups import build_rollups, month_key, touched_months
+
+NOW = datetime(2026, 3, 15, 12, 0, tzinfo=timezone.utc)
+
+
+def _txn(i, category, amount, bucket, days_ago=0):
+    return Transaction(
+        id=f"t{i}",
+        account_id="acc",
+        date=NOW - timedelta(days=days_ago),
+        merchant=f"m{i}",
+        category=category,
+        amount=amount,
+        is_recurring=False,
+        bucket=bucket,
+    )
+
+
+FRAME = TransactionFrame([
+    _txn(0, "groceries", -10.10, "needs"),
+    _txn(1, "groceries", -20.20, "needs", days_ago=40),
+    _txn(2, "dining", -0.30, "wants", days_ago=1),
+    _txn(3, "salary", 1000.00, "income", days_ago=5),
+    _txn(4, "savings_transfer", -50.00, "savings", days_ago=2),
+])
+
+
+# --- build_rollups ---
+
+def test_rollups_aggregate_exact_cents_per_month():
+    march, feb = None, None
+    for rollup in build_rollups(FRAME, now=NOW):
+        if rollup.month == "2026-03":
+            march = rollup
+        elif rollup.month == "2026-02":
+            feb = rollup
+    assert march.income_cents == 100000
+    assert march.spending_cents == 1040  # Savings are not spending
+    assert march.categories == {"dining": 30, "groceries": 1010}
+    assert march.transaction_count == 4
+    assert not march.closed
+    assert feb.spending_cents == 2020 and feb.closed
+
+def test_requested_month_without_rows_is_empty():
+    (rollup,) = build_rollups(FRAME, months=["2025-12"], now=NOW)
+    assert rollup.month == "2025-12"
+    assert rollup.transaction_count == 0 and rollup.categories == {}
+    assert rollup.closed
+
+def test_summary_matches_dollars():
+    (rollup,) = build_rollups(FRAME, months=["2026-03"], now=NOW)
+    summary = rollup.to_summary()
+    assert summary.income == 1000.0
+    assert summary.spending == 10.4
+    assert summary.net == 989.6
+    assert summary.categories == {"dining": 0.3, "groceries": 10.1}
+
+
+# --- touched_months ---
+
+def test_touched_months_covers_current_previous_and_new():
+    new = [_txn(9, "dining", -5.0, "wants", days_ago=70)]
+    months = touched_months(
+        new, NOW, previous_sync=NOW - timedelta(days=20),
+        retention_cutoff=NOW - timedelta(days=180),
+    )
+    assert months == {"2026-03", "2026-02", month_key(new[0].date)}
+
+def test_touched_months_covers_every_month_between_syncs():
+    months = touched_months(
+        [], NOW, previous_sync=NOW - timedelta(days=120),
+        retention_cutoff=NOW - timedelta(days=180),
+    )
+    assert months == {"2025-11", "2025-12", "2026-01", "2026-02", "2026-03"}
+
+def test_touched_months_clamps_a_long_gap_at_retention():
+    cutoff = NOW - timedelta(days=180)
+    months = touched_months(
+        [], NOW, previous_sync=NOW - timedelta(days=400), retention_cutoff=cutoff,
+    )
+    assert min(months) == "2025-10"
+    assert month_key(cutoff) not in months
+    assert len(months) == 6
+
+def test_touched_months_skips_partly_retained_month():
+    cutoff = NOW - timedelta(days=180)
+    new = [_txn(9, "dining", -5.0, "wants", days_ago=179)]
+    months = touched_months(new, NOW, previous_sync=None, retention_cutoff=cutoff)
+    assert month_key(cutoff) not in months
+    assert months == {"2026-03"}
+
+def test_month_key_normalizes_to_utc():
+    local = datetime(2026, 4, 1, 1, 0, tzinfo=timezone(timedelta(hours=5)))
+    assert month_key(local) == "2026-03"
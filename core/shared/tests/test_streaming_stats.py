@@ -0,0 +1,145 @@
+"""Tests for streaming, mergeable spending statistics."""
+
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from shared.frame import TransactionFrame
+from shared.models import Transaction
+from shared.streaming_stats import (
+    Ewma,
+    QuantileDigest,
+    RunningMoments,
+    SpendingProfile,
+    SpendingStats,
+    robust_z_score,
+    z_score,
+)
+
+NOW = datetime(2026, 3, 15, tzinfo=timezone.utc)
+_DAY_US = 86_400_000_000
+
+
+def _values(n, seed=7):
+    return np.random.default_rng(seed).lognormal(3.0, 1.0, n)
+
+
+def test_moments_match_numpy_across_batches_and_merge():
+    values = _values(500)
+    left = RunningMoments()
+    left.add_many(values[:120])
+    left.add_many(values[120:300])
+    right = RunningMoments()
+    for v in values[300:]:
+        right.add(v)
+    left.merge(right)
+    assert left.count == 500
+    assert left.mean == pytest.approx(values.mean())
+    assert left.variance == pytest.approx(values.var())
+
+
+def test_digest_is_exact_for_small_streams():
+    values = _values(301)
+    digest = QuantileDigest()
+    digest.add_many(values[:100].tolist())
+    digest.add_many(values[100:].tolist())
+    median = np.median(values)
+    assert digest.median() == pytest.approx(median)
+    assert digest.mad() == pytest.approx(np.median(np.abs(values - median)))
+
+
+def test_digest_compresses_and_merges_within_tolerance():
+    values = _values(60_000)
+    shards = [QuantileDigest() for _ in range(3)]
+    for i, shard in enumerate(shards):
+        for start in range(i * 20_000, (i + 1) * 20_000, 1_000):
+            shard.add_many(values[start:start + 1_000].tolist())
+    merged = shards[0]
+    merged.merge(shards[1])
+    merged.merge(shards[2])
+
+    assert len(merged.means) <= 2 * merged.compression
+    assert merged.count == 60_000
+    median = np.median(values)
+    assert merged.median() == pytest.approx(median, rel=0.01)
+    assert merged.mad() == pytest.approx(np.median(np.abs(values - median)), rel=0.02)
+
+
+def test_removal_matches_stats_of_the_rest():
+    values = _values(300)
+    times = np.arange(300, dtype=np.int64) * _DAY_US
+    stats = SpendingStats()
+    stats.add_many(values, times)
+    assert stats.remove_many(values[:80], times[:80])
+
+    rest = SpendingStats()
+    rest.add_many(values[80:], times[80:])
+    assert stats.count == 220
+    assert stats.moments.mean == pytest.approx(rest.moments.mean)
+    assert stats.moments.variance == pytest.approx(rest.moments.variance)
+    assert stats.digest.median() == rest.digest.median()
+    assert stats.digest.mad() == rest.digest.mad()
+    assert stats.ewma.value == pytest.approx(rest.ewma.value)
+
+
+def test_digest_refuses_inexact_removal():
+    digest = QuantileDigest()
+    digest.add_many([1.0, 2.0])
+    assert not digest.remove_many([3.0])
+    assert digest.buffer == [1.0, 2.0]
+
+    digest.add_many(_values(600).tolist())  # Compressed past the buffer
+    assert digest.means
+    assert not digest.remove_many([1.0])
+
+
+def test_ewma_merge_is_order_independent():
+    values = _values(200)
+    times = np.arange(200, dtype=np.int64) * _DAY_US
+    whole = Ewma()
+    whole.add_many(values, times)
+
+    late, early = Ewma(), Ewma()
+    late.add_many(values[100:], times[100:])
+    early.add_many(values[:100], times[:100])
+    late.merge(early)
+    assert late.value == pytest.approx(whole.value)
+    # Recent values dominate: the last half-life outweighs everything before
+    assert abs(whole.value - values[-30:].mean()) < abs(whole.value - values[:100].mean())
+
+
+def test_scores():
+    assert z_score(200.0, 50.0, 25.0) == 6.0
+    assert robust_z_score(50.0, 50.0, 0.0) == 0.0
+    assert robust_z_score(60.0, 50.0, 0.0) == 10.0
+    assert robust_z_score(100.0, 50.0, 10.0) == pytest.approx(3.37)
+
+
+def _txn(i, category, amount, bucket="wants"):
+    return Transaction(
+        id=f"t{i}",
+        account_id="acc",
+        date=NOW - timedelta(days=i),
+        merchant="m",
+        category=category,
+        amount=amount,
+        is_recurring=False,
+        bucket=bucket,
+    )
+
+
+def test_profile_from_frame_matches_observe_and_merge():
+    txns = [_txn(i, ("dining", "coffee")[i % 2], -5.0 - i) for i in range(40)]
+    txns.append(_txn(99, "salary", 4000.0, bucket="income"))
+
+    from_frame = SpendingProfile.from_frame(TransactionFrame(txns))
+    sharded = SpendingProfile()
+    sharded.observe(txns[:15])
+    rest = SpendingProfile()
+    rest.observe(txns[15:])
+    sharded.merge(rest)
+
+    assert set(from_frame.categories) == {"dining", "coffee"}
+    assert from_frame.summaries() == sharded.summaries()
+    assert from_frame.summaries()["dining"]["median"] == pytest.approx(24.0)
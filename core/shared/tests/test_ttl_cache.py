@@ -0,0 +1,79 @@
+"""Tests for the in-process TTL cache."""
+
+import pytest
+
+from shared.ttl_cache import TTLCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_ttl():
+    clock = Clock()
+    cache = TTLCache(ttl_seconds=10, clock=clock)
+    cache.set("k", "v")
+    clock.now += 9.9
+    assert cache.get("k") == "v"
+    clock.now += 0.1
+    assert cache.get("k", "gone") == "gone"
+    assert len(cache) == 0
+
+
+def test_explicit_expires_at_overrides_ttl():
+    clock = Clock()
+    cache = TTLCache(ttl_seconds=10, clock=clock)
+    cache.set("row", {"a": 1}, expires_at=clock.now + 100)
+    clock.now += 50
+    assert cache.get("row") == {"a": 1}
+    cache.set("stale", 1, expires_at=clock.now)
+    assert cache.get("stale") is None
+
+
+def test_least_recently_used_is_evicted():
+    cache = TTLCache(max_entries=2, clock=Clock())
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # b is now least recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    # Re-setting an entry refreshes it too
+    cache.set("a", 10)
+    cache.set("d", 4)
+    assert cache.get("c") is None and cache.get("a") == 10
+
+
+def test_stats_count_hits_misses_evictions_and_expirations():
+    clock = Clock()
+    cache = TTLCache(max_entries=1, ttl_seconds=5, clock=clock)
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("missing")
+    cache.set("b", 2)  # evicts a
+    clock.now += 5
+    cache.get("b")  # expired
+    assert cache.stats() == {"size": 0, "hits": 1, "misses": 2, "evictions": 1, "expirations": 1}
+
+    cache.set("c", 3)
+    cache.invalidate("c")
+    cache.set("d", 4)
+    cache.clear()
+    assert cache.stats()["size"] == 0 and cache.stats()["hits"] == 1
+
+
+def test_falsy_values_are_cached():
+    cache = TTLCache(clock=Clock())
+    cache.set("none", None)
+    cache.set("empty", [])
+    assert cache.get("none", "default") is None
+    assert cache.get("empty", "default") == []
+
+
+def test_max_entries_must_be_positive():
+    with pytest.raises(ValueError):
+        TTLCache(max_entries=0)
@@ -111,6 +111,14 @@ export class ApiStack extends cdk.Stack {
             timeout: cdk.Duration.seconds(30),
         });
 
+        // Allow async self-invoke for background snapshot refreshes
+        dataLambdaFn.addToRolePolicy(new iam.PolicyStatement({
+            actions: ['lambda:InvokeFunction'],
+            resources: [
+                `arn:aws:lambda:${this.region}:${this.account}:function:${APP_NAME_LOWERCASE}-data-lambda`
+            ],
+        }));
+
         // =============================================================
         // Data API Resources and Methods
         // =============================================================
@@ -149,13 +157,16 @@ export class ApiStack extends cdk.Stack {
             name: 'captain-lambda',
             handler: 'handler.lambda_handler',
             description: 'Captain Nova AI agent for financial guidance',
-            additionalDeps: ['./shared', './agent'],
+            additionalDeps: ['./shared', './agent', './database'],
              additionalEnv: {
                 BEDROCK_MODEL_ID: 'us.anthropic.claude-sonnet-4-5-20250929-v1:0',
                 LOGFIRE_TOKEN: process.env.LOGFIRE_TOKEN || '',
                 NESSIE_API_KEY: process.env.NESSIE_API_KEY || '',
                 DATA_SOURCE: process.env.DATA_SOURCE || 'mock',
+                // Persistent tier of the specialist result cache
+                USERS_TABLE_NAME: props.usersTable.tableName,
              },
+             tableGrants: [props.usersTable],
              timeout: cdk.Duration.seconds(60),
          });
 
@@ -239,6 +250,7 @@ export class ApiStack extends cdk.Stack {
         asteroidIdResource.addResource('action').addMethod('POST', lambdaIntegration);
 
         apiResource.addResource('transactions').addMethod('GET', lambdaIntegration);
+        apiResource.addResource('dashboard').addMethod('GET', lambdaIntegration);
     }
 
     /**
@@ -276,7 +288,11 @@ export class ApiStack extends cdk.Stack {
         captainResource.addResource('query').addMethod('POST', lambdaIntegration);
 
         // Complete multi-agent analysis (no auth)
-        captainResource.addResource('complete-analysis').addMethod('POST', lambdaIntegration);
+        const completeAnalysisResource = captainResource.addResource('complete-analysis');
+        completeAnalysisResource.addMethod('POST', lambdaIntegration);
+
+        // Complete analysis as per-specialist NDJSON events (no auth)
+        completeAnalysisResource.addResource('stream').addMethod('POST', lambdaIntegration);
 
         // Individual specialist endpoints (no auth)
         const specialistsResource = captainResource.addResource('specialists');
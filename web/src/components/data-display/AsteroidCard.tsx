@@ -31,7 +31,7 @@ const severityStyles: Record<
   },
 };
 
-const threatTypeLabels: Record<Asteroid['threat_type'], string> = {
+const threatTypeLabels: Record<string, string> = {
   subscription_renewal: 'SUBSCRIPTION',
   budget_overrun: 'BUDGET BREACH',
   unused_service: 'UNUSED SERVICE',
@@ -39,6 +39,10 @@ const threatTypeLabels: Record<Asteroid['threat_type'], string> = {
   bill_due: 'BILL DUE',
 };
 
+// Rules can be added server-side without a label here
+const threatTypeLabel = (threatType: string) =>
+  threatTypeLabels[threatType] ?? threatType.replace(/_/g, ' ').toUpperCase();
+
 const actionLabels: Record<Asteroid['recommended_action'], { label: string; description: string }> = {
   deflect: { label: 'DEFLECT', description: 'Cancel or avoid this expense' },
   absorb: { label: 'ABSORB', description: 'Accept and budget for it' },
@@ -82,7 +86,7 @@ export function AsteroidCard({
               <span
                 className={`text-[9px] px-1.5 py-0.5 rounded border font-bold tracking-wider ${styles.badge}`}
               >
-                {threatTypeLabels[asteroid.threat_type]}
+                {threatTypeLabel(asteroid.threat_type)}
               </span>
               {asteroid.days_until <= 3 && asteroid.days_until > 0 && (
                 <span className="text-[9px] px-1.5 py-0.5 rounded bg-red-500/30 text-red-300 font-bold animate-pulse">
@@ -20,7 +20,7 @@ export interface AccountSummary {
  */
 export interface Asteroid {
   id: string;
-  threat_type: "subscription_renewal" | "budget_overrun" | "unused_service" | "spending_spike" | "bill_due";
+  threat_type: string;
   severity: "danger" | "warning" | "info";
   title: string;
   detail: string;